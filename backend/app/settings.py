@@ -55,6 +55,9 @@ MEDIA_ROOT = BASE_DIR / 'media'       # где физически хранить
 
 
 MIDDLEWARE = [
+    'utils.tracing.TracingMiddleware',
+    'utils.admission.AdmissionControlMiddleware',
+    'utils.dbrouter.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -62,8 +65,19 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'utils.querybudget.QueryBudgetMiddleware',
 ]
 
+# Детектор N+1: "off" | "warn" (лог) | "raise" (исключение, для тестов).
+# Бюджеты объявляются на action вьюсетов, см. utils/querybudget.py.
+# Включается явно: DEBUG здесь всегда True, а в проде заголовок
+# X-Query-Count и предупреждения не нужны
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "off")
+
+# Трассировка запросов в JSONL (span-ы БД, сериализации, рендеринга).
+# Пусто — выключено. trace_id берётся из X-Request-ID от nginx.
+TRACING_EXPORT_PATH = os.getenv("TRACING_EXPORT_PATH")
+
 ROOT_URLCONF = 'app.urls'
 
 TEMPLATES = [
@@ -91,6 +105,11 @@ AUTH_TOKEN_COOKIE_HTTPONLY = True                  # JS не видит
 AUTH_TOKEN_COOKIE_SAMESITE = "Lax"                 # "None" если фронт на др. домене
 AUTH_TOKEN_COOKIE_PATH     = "/"
 
+# Подписанные токены (utils.authentication.SignedTokenAuthentication)
+SIGNED_TOKEN_MAX_AGE        = AUTH_TOKEN_COOKIE_AGE
+# сколько секунд воркер может не знать об отзыве токена в другом воркере
+SIGNED_TOKEN_REVOCATION_TTL = int(os.getenv("SIGNED_TOKEN_REVOCATION_TTL", 30))
+
 DJOSER = {
     "LOGIN_FIELD": "email",
     "USER_CREATE_PASSWORD_RETYPE": False,
@@ -104,7 +123,16 @@ REST_FRAMEWORK = {
     # Use Django's standard `django.contrib.auth` permissions,
     # or allow read-only access for unauthenticated users.
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
+        "utils.authentication.SignedTokenAuthentication",
+    ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "utils.renderers.JSONRenderer",                 # orjson
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "utils.renderers.JSONParser",                   # orjson
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
@@ -113,11 +141,129 @@ REST_FRAMEWORK = {
         'django_filters.rest_framework.DjangoFilterBackend'
     ],
     "SEARCH_PARAM": "name",
+    # лимиты частоты (utils/throttling.py): scope → "N/период";
+    # scope задаётся на вьюхе (throttle_scope) или action (throttle_scopes)
+    "DEFAULT_THROTTLE_CLASSES": (
+        "utils.throttling.TokenBucketThrottle",
+    ),
+    "DEFAULT_THROTTLE_RATES": {
+        "favorite":      os.getenv("THROTTLE_FAVORITE", "120/min"),
+        "shopping_cart": os.getenv("THROTTLE_SHOPPING_CART", "120/min"),
+        "subscribe":     os.getenv("THROTTLE_SUBSCRIBE", "60/min"),
+        "recipe_write":  os.getenv("THROTTLE_RECIPE_WRITE", "20/min"),
+        "login":         os.getenv("THROTTLE_LOGIN", "10/min"),
+        "signup":        os.getenv("THROTTLE_SIGNUP", "5/min"),
+        "password":      os.getenv("THROTTLE_PASSWORD", "5/min"),
+    },
+    # перед бэкендом — nginx: IP клиента берётся из X-Forwarded-For
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", 1)),
 }
 
+# Таблица вёдер лимитов в разделяемой памяти (utils/throttling.py):
+# файл общий для всех воркеров хоста, ячейка — 16 байт
+THROTTLE_SHM_PATH = os.getenv(
+    "THROTTLE_SHM_PATH",
+    "/dev/shm/foodgram-throttle" if os.path.isdir("/dev/shm") else "/tmp/foodgram-throttle",
+)
+THROTTLE_SLOTS = int(os.getenv("THROTTLE_SLOTS", 65_536))
+
+# Кеш (utils/cache.py): LRU процесса перед общим кешем Django.
+# Общий уровень — Redis, если задан CACHE_REDIS_URL (нужен пакет redis),
+# иначе файлы в CACHE_DIR: общие для воркеров одного контейнера.
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": CACHE_REDIS_URL,
+    } if CACHE_REDIS_URL else {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("CACHE_DIR", BASE_DIR / "cache"),
+        "OPTIONS": {"MAX_ENTRIES": 100_000},
+    },
+}
+CACHE_TIMEOUT       = int(os.getenv("CACHE_TIMEOUT", 300))
+CACHE_LOCAL_MAXSIZE = int(os.getenv("CACHE_LOCAL_MAXSIZE", 10_000))
+# сколько секунд воркер может не знать о сбросе тега в другом воркере
+CACHE_LOCAL_TTL     = float(os.getenv("CACHE_LOCAL_TTL", 5))
+
+# Снимок справочника ингредиентов (recipes/catalog.py): каталог внутри
+# MEDIA_ROOT, файлы отдаёт nginx из /media/<каталог>/
+INGREDIENT_SNAPSHOT_DIR = "catalog"
+
+# Async-обработчики горячих чтений под ASGI (utils/asyncviews.py);
+# False — все вьюхи синхронные, как раньше
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "True") == "True"
+
+# Admission control (utils/admission.py): сколько запросов класса маршрутов
+# воркер обрабатывает одновременно, сколько ждут в очереди и сколько секунд;
+# дальше — 503 с Retry-After. ADMISSION_CONTROL=False — без ограничений
+ADMISSION_CLASSES = {
+    "heavy": {
+        "limit":   int(os.getenv("ADMISSION_HEAVY_LIMIT", 4)),
+        "queue":   int(os.getenv("ADMISSION_HEAVY_QUEUE", 16)),
+        "timeout": float(os.getenv("ADMISSION_HEAVY_TIMEOUT", 2)),
+        "retry_after": 5,
+    },
+    "default": {
+        "limit":   int(os.getenv("ADMISSION_DEFAULT_LIMIT", 64)),
+        "queue":   int(os.getenv("ADMISSION_DEFAULT_QUEUE", 256)),
+        "timeout": float(os.getenv("ADMISSION_DEFAULT_TIMEOUT", 5)),
+        "retry_after": 1,
+    },
+} if os.getenv("ADMISSION_CONTROL", "True") == "True" else {}
+
+# Мульти-запрос ?ids=1,2,3 на /api/recipes/ и /api/users/ (utils/multiget.py)
+MULTI_GET_MAX_IDS = int(os.getenv("MULTI_GET_MAX_IDS", 100))
+
+# Лента подписок /api/recipes/feed/ (recipes/feed.py)
+# больше подписчиков — рецепты автора не раскладываются по лентам (fan-in)
+FEED_FANOUT_MAX_FOLLOWERS = int(os.getenv("FEED_FANOUT_MAX_FOLLOWERS", 10_000))
+# сколько последних рецептов автора добавить в ленту при подписке
+FEED_BACKFILL_SIZE = int(os.getenv("FEED_BACKFILL_SIZE", 50))
+
+# Outbox побочных эффектов записи (recipes/outbox.py), выполняет
+# `manage.py drain_outbox`. True — ещё и сразу после коммита в процессе
+# запроса, для runserver без воркера
+OUTBOX_INLINE          = os.getenv("OUTBOX_INLINE", "False") == "True"
+# после стольких неудач событие остаётся в таблице со статусом dead
+OUTBOX_MAX_ATTEMPTS    = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 8))
+OUTBOX_MAX_RETRY_DELAY = int(os.getenv("OUTBOX_MAX_RETRY_DELAY", 600))
+
+# Дельта-синхронизация /api/sync/ (recipes/sync.py): изменений за ответ;
+# журнал старше SYNC_RETENTION_DAYS подчищает `manage.py prune_sync_changes`
+SYNC_PAGE_SIZE      = int(os.getenv("SYNC_PAGE_SIZE", 1000))
+SYNC_RETENTION_DAYS = int(os.getenv("SYNC_RETENTION_DAYS", 30))
+
+# Топ /api/recipes/popular/ (recipes/popular.py): сколько рецептов
+# хранить на окно и сколько секунд воркер держит топ в памяти
+POPULAR_SIZE          = int(os.getenv("POPULAR_SIZE", 100))
+POPULAR_CACHE_SECONDS = int(os.getenv("POPULAR_CACHE_SECONDS", 60))
+
+# Короткие ссылки /s/<code>/: сколько кодов держать в LRU воркера и сколько
+# секунд; за это время удалённый рецепт перестаёт открываться во всех воркерах
+SHORT_LINK_CACHE_SIZE = int(os.getenv("SHORT_LINK_CACHE_SIZE", 100_000))
+SHORT_LINK_CACHE_TTL  = int(os.getenv("SHORT_LINK_CACHE_TTL", 60))
+
+# «Что приготовить» /api/recipes/pantry/ (recipes/pantry.py)
+PANTRY_MAX_INGREDIENTS    = int(os.getenv("PANTRY_MAX_INGREDIENTS", 200))
+# как часто воркер сверяется с журналом RecipeChange и когда пересобирает индекс
+PANTRY_INDEX_POLL_SECONDS = float(os.getenv("PANTRY_INDEX_POLL_SECONDS", 2))
+PANTRY_INDEX_MAX_AGE      = int(os.getenv("PANTRY_INDEX_MAX_AGE", 3600))
+
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Пул соединений psycopg 3, размер — на каждый воркер.
+# DB_POOL_MAX_SIZE=0 выключает пул: тогда постоянные соединения
+# с CONN_MAX_AGE. Счётчики пула — в /api/metrics/ (utils/dbpool.py)
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 8))
+DB_POOL_OPTIONS = {
+    "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 1)),
+    "max_size": DB_POOL_MAX_SIZE,
+    "timeout":  float(os.getenv("DB_POOL_TIMEOUT", 5)),    # ожидание соединения, сек
+    "max_idle": 300,
+}
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -126,6 +272,10 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
         "HOST":     os.getenv("POSTGRES_HOST", "db"),
         "PORT":     os.getenv("POSTGRES_PORT", "5432"),
+        "CONN_HEALTH_CHECKS": True,
+        # пул и CONN_MAX_AGE взаимоисключающие
+        "CONN_MAX_AGE": 0 if DB_POOL_MAX_SIZE else int(os.getenv("DB_CONN_MAX_AGE", 60)),
+        "OPTIONS": {"pool": DB_POOL_OPTIONS} if DB_POOL_MAX_SIZE else {},
     }
     # 'default': {
     #     'ENGINE': 'django.db.backends.sqlite3',
@@ -133,6 +283,24 @@ DATABASES = {
     # }
 }
 
+# Реплики только для чтения: POSTGRES_REPLICA_HOSTS="replica1,replica2:5433"
+# Маршрутизация и read-your-writes — utils/dbrouter.py
+DATABASE_REPLICAS = []
+for i, host in enumerate(filter(None, os.getenv("POSTGRES_REPLICA_HOSTS", "").split(",")), 1):
+    host, _, port = host.strip().partition(":")
+    alias = f"replica_{i}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["utils.dbrouter.ReplicaRouter"]
+# сколько секунд после записи чтения клиента идут в primary
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", 5))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -0,0 +1,36 @@
+"""
+Настройки для тестов: `python manage.py test --settings=app.test_settings`.
+
+SQLite вместо Postgres, кеш и вёдра лимитов — в памяти / во временном
+каталоге, бюджеты запросов (utils/querybudget.py) — строго.
+"""
+import tempfile
+
+from .settings import *  # noqa: F401,F403
+
+_TMP = tempfile.mkdtemp(prefix="foodgram-test-")
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": f"{_TMP}/db.sqlite3",
+    },
+    # реплика — второе соединение к той же тестовой базе; маршрутизация
+    # на неё включается в тестах utils/dbrouter.py через DATABASE_REPLICAS
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": f"{_TMP}/db.sqlite3",
+        "TEST": {"MIRROR": "default"},
+    },
+}
+DATABASE_REPLICAS = []
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+MEDIA_ROOT = f"{_TMP}/media"
+THROTTLE_SHM_PATH = f"{_TMP}/throttle"
+
+QUERY_BUDGET_MODE = "raise"
+
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
@@ -15,14 +15,21 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 
+from recipes.shortlinks import redirect as short_link_redirect
 from users.urls import router
+from utils import dbpool  # noqa: F401  регистрирует метрики пула БД
+from .views import MetricsView
 
 urlpatterns = [
+    path('api/metrics/', MetricsView.as_view()),
     path('api/auth/', include("users.auth_urls")),
     path('api/users/', include(router.urls)),
     path('api/', include("recipes.urls")), # /api/recipes, /api/ingredients
 
+    # короткие ссылки на рецепты, слэш в конце необязателен
+    re_path(r'^s/(?P<code>[0-9A-Za-z]{1,16})/?$', short_link_redirect),
+
     path('admin/', admin.site.urls),
 ]
@@ -0,0 +1,15 @@
+import os
+
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from utils import metrics
+
+
+class MetricsView(APIView):
+    """GET /api/metrics/ — метрики воркера, обработавшего запрос (utils/metrics.py)."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({"pid": os.getpid(), **metrics.collect()})
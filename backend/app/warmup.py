@@ -0,0 +1,59 @@
+"""
+Прогрев Django в мастер-процессе gunicorn (gunicorn.conf.py) до fork-а
+воркеров.
+
+С preload_app мастер один раз импортирует приложение, а воркеры
+получают его готовым через fork (copy-on-write). Чтобы воркеру не
+пришлось доделывать ленивую инициализацию на первых запросах, мастер
+прогоняет несколько запросов через весь стек: URL-резолвер, middleware,
+сериализаторы и их поля, рендерер, снимок справочника ингредиентов
+(recipes/catalog.py) и его кеш (utils/cache.py).
+
+После прогрева соединения с БД и пулы закрываются — сокет, унаследованный
+несколькими процессами, испортил бы протокол, — а объекты переносятся в
+постоянное поколение GC (gc.freeze), чтобы сборщик в воркерах не трогал
+их страницы и не копировал их.
+"""
+import gc
+import logging
+import time
+
+from django.db import connections
+from django.test import Client
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+# запросы, которые проходят все «тяжёлые» пути чтения
+WARMUP_URLS = (
+    "/api/ingredients/",
+    "/api/ingredients/snapshot/",
+    "/api/recipes/?limit=1",
+    "/api/users/?limit=1",
+)
+
+
+def warm_up():
+    started = time.perf_counter()
+    get_resolver()._populate()
+    client = Client()
+    for url in WARMUP_URLS:
+        try:
+            status = client.get(url).status_code
+        except Exception:           # прогрев не должен мешать старту
+            logger.exception("warm-up: %s", url)
+            continue
+        if status >= 400:
+            logger.warning("warm-up: %s → %s", url, status)
+    close_connections()
+    gc.collect()
+    gc.freeze()
+    logger.info("warm-up: %.2f s", time.perf_counter() - started)
+
+
+def close_connections():
+    """Закрывает соединения и пулы psycopg: после fork они не должны быть общими."""
+    for conn in connections.all(initialized_only=True):
+        conn.close()
+        if hasattr(conn, "close_pool"):         # postgresql
+            conn.close_pool()
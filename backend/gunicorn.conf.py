@@ -0,0 +1,83 @@
+# gunicorn.conf.py
+"""
+Продовый профиль сервера: gunicorn + воркеры uvicorn (ASGI).
+
+    gunicorn app.asgi:application            # конфиг подхватывается из cwd
+
+* воркеров — по числу доступных процессу CPU (WEB_CONCURRENCY — явно);
+* preload_app: мастер импортирует и прогревает Django (app/warmup.py),
+  воркеры получают его через fork — быстрый старт и общие страницы памяти;
+* воркер перезапускается после MAX_REQUESTS запросов (± джиттер, чтобы
+  не все сразу) или когда его RSS превысил WORKER_MAX_RSS_MB.
+
+Замер старта и памяти воркеров — `manage.py bench_server`.
+"""
+import logging
+import os
+import signal
+import threading
+import time
+
+logger = logging.getLogger("gunicorn.error")
+
+
+def _cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))     # учитывает cpuset контейнера
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = "uvicorn_worker.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", _cpus()))
+preload_app = os.getenv("GUNICORN_PRELOAD", "True") == "True"
+
+max_requests = int(os.getenv("MAX_REQUESTS", 5000))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", 500))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+# 0 — без ограничения; проверка раз в WORKER_RSS_CHECK_SECONDS
+WORKER_MAX_RSS_MB = int(os.getenv("WORKER_MAX_RSS_MB", 512))
+WORKER_RSS_CHECK_SECONDS = float(os.getenv("WORKER_RSS_CHECK_SECONDS", 10))
+
+
+def rss_mb(pid="self") -> float:
+    """Текущий RSS процесса по /proc (Linux)."""
+    with open(f"/proc/{pid}/statm") as file:
+        resident = int(file.read().split()[1])
+    return resident * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+# ---------- хуки ----------
+def when_ready(server):
+    # приложение уже импортировано (preload_app), воркеры ещё не созданы
+    if preload_app:
+        from app.warmup import warm_up
+        warm_up()
+
+
+def post_worker_init(worker):
+    if WORKER_MAX_RSS_MB:
+        threading.Thread(
+            target=_watch_rss, args=(worker,), name="rss-watch", daemon=True
+        ).start()
+
+
+def _watch_rss(worker):
+    """
+    Превысил лимит — SIGTERM себе: воркер доотвечает на начатые запросы
+    и выйдет, мастер поднимет новый.
+    """
+    while True:
+        time.sleep(WORKER_RSS_CHECK_SECONDS)
+        rss = rss_mb()
+        if rss > WORKER_MAX_RSS_MB:
+            logger.warning(
+                "worker %s: RSS %.0f MB > %s MB, restarting",
+                worker.pid, rss, WORKER_MAX_RSS_MB,
+            )
+            os.kill(worker.pid, signal.SIGTERM)
+            return
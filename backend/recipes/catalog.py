@@ -0,0 +1,153 @@
+"""
+Статический снимок справочника ингредиентов.
+
+Весь справочник (~2200 строк) фронтенд грузит при каждом открытии
+приложения. Вместо сериализации через DRF на каждый запрос он
+публикуется файлом в MEDIA_ROOT/catalog/:
+
+* ingredients.<версия>.json — тот же JSON, что GET /api/ingredients/;
+  версия — хеш содержимого, поэтому файл кешируется навсегда (immutable);
+* рядом .json.gz (и .json.br, если установлен пакет brotli) — nginx
+  отдаёт их как есть (gzip_static), без сжатия на лету;
+* manifest.json — текущая версия; его читает
+  GET /api/ingredients/snapshot/ → {"version", "url", "count"}.
+
+Публикация — после импорта (import_ingredients), при старте (boot, если
+манифеста нет) и после коммита любого изменения Ingredient
+(recipes/signals.py). Запрос снимок не публикует никогда: без манифеста
+snapshot/ отдаёт ссылку на обычный список /api/ingredients/. Тот же справочник — тот же
+хеш: файлы не переписываются. Старые версии хранятся KEEP_VERSIONS штук,
+чтобы клиент, получивший ссылку до публикации, успел скачать файл.
+"""
+import gzip
+import hashlib
+import os
+import tempfile
+import threading
+from contextvars import ContextVar
+
+import orjson
+from django.conf import settings
+from django.db import transaction
+
+from .models import Ingredient
+from .serializers import IngredientSerializer
+
+try:
+    import brotli
+except ImportError:                 # необязательная зависимость
+    brotli = None
+
+KEEP_VERSIONS = 3
+MANIFEST = "manifest.json"
+PREFIX = "ingredients."
+
+# изменения справочника ждут публикации после коммита (schedule_publish)
+_publish_requested: ContextVar[bool] = ContextVar("catalog_publish_requested", default=False)
+
+
+def snapshot_dir():
+    return os.path.join(settings.MEDIA_ROOT, settings.INGREDIENT_SNAPSHOT_DIR)
+
+
+def snapshot_url(name: str) -> str:
+    return f"{settings.MEDIA_URL}{settings.INGREDIENT_SNAPSHOT_DIR}/{name}"
+
+
+# ---------- публикация ----------
+def publish() -> dict:
+    """Публикует снимок текущего справочника; возвращает манифест."""
+    items = IngredientSerializer(Ingredient.objects.all(), many=True).data
+    body = orjson.dumps(items)
+    version = hashlib.sha256(body).hexdigest()[:16]
+    name = f"{PREFIX}{version}.json"
+
+    directory = snapshot_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):
+        # сжатые копии — раньше основного файла: он сигнал «версия готова»
+        _write(path + ".gz", gzip.compress(body, compresslevel=9, mtime=0))
+        if brotli is not None:
+            _write(path + ".br", brotli.compress(body, quality=11))
+        _write(path, body)
+
+    manifest = {"version": version, "file": name, "count": len(items)}
+    _write(os.path.join(directory, MANIFEST), orjson.dumps(manifest))
+    _prune(directory, keep=name)
+    return manifest
+
+
+def schedule_publish():
+    """
+    Публикация после коммита; одна на транзакцию, сколько ни меняй строк.
+    Колбэк ставится на каждое изменение — при откате транзакции Django его
+    выбросит, а флаг остался бы, — но публикует только первый из них.
+    """
+    _publish_requested.set(True)
+    transaction.on_commit(_publish_after_commit)
+
+
+def _publish_after_commit():
+    if _publish_requested.get():
+        _publish_requested.set(False)
+        publish()
+
+
+def _write(path, data: bytes):
+    """Атомарно: nginx не должен увидеть недописанный файл."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _prune(directory, keep: str):
+    """Удаляет версии старше KEEP_VERSIONS последних (по времени записи)."""
+    versions = sorted(
+        (
+            entry for entry in os.scandir(directory)
+            if entry.name.startswith(PREFIX) and entry.name.endswith(".json")
+        ),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    stale = [entry.name for entry in versions if entry.name != keep][KEEP_VERSIONS - 1:]
+    for name in stale:
+        for suffix in ("", ".gz", ".br"):
+            try:
+                os.unlink(os.path.join(directory, name + suffix))
+            except FileNotFoundError:
+                pass
+
+
+# ---------- чтение ----------
+class ManifestCache:
+    """Манифест, перечитываемый только при смене mtime файла; общий на процесс."""
+
+    def __init__(self):
+        self._data = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def get(self) -> dict | None:
+        """Текущий манифест; None — снимок ещё не опубликован."""
+        path = os.path.join(snapshot_dir(), MANIFEST)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            if mtime != self._mtime:
+                with open(path, "rb") as file:
+                    self._data = orjson.loads(file.read())
+                self._mtime = mtime
+            return self._data
+
+
+manifest = ManifestCache()
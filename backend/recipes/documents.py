@@ -0,0 +1,98 @@
+"""
+Денормализованный документ рецепта (Recipe.document, JSONB).
+
+В документе — всё, ради чего чтение рецепта ходит в другие таблицы:
+краткие данные автора и разрешённый список ингредиентов. Так
+RecipeReadProjection читает одну строку на рецепт и дописывает только
+флаги текущего пользователя.
+
+Документ пересобирается в той же транзакции, что и изменение-источник
+(сигналы в recipes/signals.py); заодно пишется RecipeChange для индексов
+в памяти воркеров (recipes/pantry.py) и ставится в outbox (recipes/outbox.py)
+обновление индекса похожих рецептов (recipes/similar.py). Массовые изменения оборачиваются в
+deferred_rebuild(): id рецептов копятся и пересобираются один раз на выходе.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+
+from . import outbox, similar  # noqa: F401 — similar: обработчик "similar.refresh"
+from .models import Recipe, RecipeChange, RecipeIngredient
+
+# поля автора, которые попадают в документ; смена других — не повод пересобирать
+AUTHOR_FIELDS = ("id", "username", "email", "avatar", "first_name", "last_name")
+
+_pending: ContextVar = ContextVar("recipe_documents_pending", default=None)
+
+
+def build_documents(recipe_ids) -> dict[int, dict]:
+    """recipe_id → документ; два запроса на любое число рецептов."""
+    recipe_ids = list(recipe_ids)
+    docs = {
+        row["id"]: {
+            "author": {
+                name: row[f"author__{name}"] for name in AUTHOR_FIELDS
+            },
+            "ingredients": [],
+        }
+        for row in Recipe.objects.filter(pk__in=recipe_ids).values(
+            "id", *(f"author__{name}" for name in AUTHOR_FIELDS)
+        )
+    }
+    items = (
+        RecipeIngredient.objects
+        .filter(recipe_id__in=docs)
+        .order_by("pk")
+        .values_list(
+            "recipe_id", "ingredient_id", "ingredient__title",
+            "ingredient__measurement_unit", "amount",
+        )
+    )
+    for recipe_id, ingredient_id, title, unit, amount in items:
+        docs[recipe_id]["ingredients"].append({
+            "id": ingredient_id,
+            "name": title,
+            "measurement_unit": unit,
+            "amount": str(amount),        # Decimal без потери точности
+        })
+    return docs
+
+
+def rebuild_documents(recipe_ids, batch_size: int = 500):
+    """Пересобирает и сохраняет документы (без сигналов, через bulk_update)."""
+    recipe_ids = set(recipe_ids)
+    pending = _pending.get()
+    if pending is not None:
+        pending.update(recipe_ids)
+        return
+    if not recipe_ids:
+        return
+
+    with transaction.atomic():
+        docs = build_documents(recipe_ids)
+        Recipe.objects.bulk_update(
+            [Recipe(pk=pk, document=doc) for pk, doc in docs.items()],
+            ["document"], batch_size=batch_size,
+        )
+        if docs:
+            outbox.emit("similar.refresh", recipe_ids=sorted(docs))
+        RecipeChange.objects.bulk_create(
+            [RecipeChange(recipe_id=pk) for pk in docs], batch_size=batch_size
+        )
+
+
+@contextmanager
+def deferred_rebuild():
+    """Копит пересборки внутри блока и выполняет их одной пачкой в конце."""
+    if _pending.get() is not None:          # вложенный блок — копит внешний
+        yield
+        return
+
+    pending = set()
+    token = _pending.set(pending)
+    try:
+        yield
+    finally:
+        _pending.reset(token)
+    rebuild_documents(pending)
@@ -0,0 +1,165 @@
+"""
+Лента подписок /api/recipes/feed/: свежие рецепты авторов, на которых
+подписан пользователь.
+
+Fan-out on write: новый рецепт раскладывается строкой FeedEntry в ленту
+каждого подписчика (событием outbox, вне запроса — recipes/outbox.py),
+а чтение ленты — диапазон по индексу (user, -created_at, -recipe) без
+JOIN-а подписок.
+
+Автора, у которого подписчиков больше FEED_FANOUT_MAX_FOLLOWERS, раскладывать
+слишком дорого: он один раз попадает в FeedFanInAuthor, и его рецепты лента
+дочитывает напрямую из Recipe (fan-in) и сливает с таблицей. Обратно автор
+не переводится — иначе в лентах остались бы дыры за время fan-in.
+
+Подписка дозаполняет ленту последними FEED_BACKFILL_SIZE рецептами автора,
+отписка удаляет его строки (тоже через outbox, сигналы в recipes/signals.py);
+события могут выполниться не по порядку, поэтому обработчики сверяются с
+текущей подпиской. Пагинация — по
+ключу (created_at, id) через непрозрачный ?cursor=, без OFFSET.
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from users.models import Subscription
+from . import outbox
+from .models import FeedEntry, FeedFanInAuthor, Recipe
+
+BATCH_SIZE = 1000
+
+
+# ---------- запись (обработчики outbox) ----------
+@outbox.handler("feed.fan_out")
+def fan_out(recipe_id: int):
+    recipe = (
+        Recipe.objects.filter(pk=recipe_id)
+        .values("author_id", "created_at")
+        .first()
+    )
+    if recipe is None:                   # удалён раньше, чем дошла очередь
+        return
+    author_id = recipe["author_id"]
+    if FeedFanInAuthor.objects.filter(author_id=author_id).exists():
+        return
+
+    followers = list(
+        Subscription.objects.filter(author_id=author_id)
+        .order_by()
+        .values_list("follower_id", flat=True)
+    )
+    if len(followers) > settings.FEED_FANOUT_MAX_FOLLOWERS:
+        FeedFanInAuthor.objects.get_or_create(author_id=author_id)
+        return
+
+    FeedEntry.objects.bulk_create(
+        [
+            FeedEntry(
+                user_id=follower_id, recipe_id=recipe_id,
+                author_id=author_id, created_at=recipe["created_at"],
+            )
+            for follower_id in followers
+        ],
+        batch_size=BATCH_SIZE, ignore_conflicts=True,
+    )
+
+
+def _subscribed(follower_id: int, author_id: int) -> bool:
+    return Subscription.objects.filter(follower_id=follower_id, author_id=author_id).exists()
+
+
+@outbox.handler("feed.backfill")
+def backfill(follower_id: int, author_id: int):
+    """Последние рецепты автора — в ленту нового подписчика."""
+    if not _subscribed(follower_id, author_id):
+        return                          # уже отписался
+    if FeedFanInAuthor.objects.filter(author_id=author_id).exists():
+        return
+    recent = (
+        Recipe.objects.filter(author_id=author_id)
+        .order_by("-created_at", "-id")
+        .values_list("id", "created_at")[:settings.FEED_BACKFILL_SIZE]
+    )
+    FeedEntry.objects.bulk_create(
+        [
+            FeedEntry(
+                user_id=follower_id, recipe_id=recipe_id,
+                author_id=author_id, created_at=created_at,
+            )
+            for recipe_id, created_at in recent
+        ],
+        ignore_conflicts=True,
+    )
+
+
+@outbox.handler("feed.drop")
+def drop(follower_id: int, author_id: int):
+    if _subscribed(follower_id, author_id):
+        return                          # подписался снова
+    FeedEntry.objects.filter(user_id=follower_id, author_id=author_id).delete()
+
+
+# ---------- чтение ----------
+def encode_cursor(created_at: datetime, pk: int) -> str:
+    raw = f"{created_at.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(value: str | None) -> tuple[datetime, int] | None:
+    if not value:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode()
+        created_at, pk = raw.split("|")
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationError({"cursor": ["Некорректный курсор."]})
+
+
+def _after(cursor, time_field: str, pk_field: str) -> Q:
+    """Строки строго после курсора в порядке (-time, -pk)."""
+    if cursor is None:
+        return Q()
+    created_at, pk = cursor
+    return (
+        Q(**{f"{time_field}__lt": created_at})
+        | Q(**{time_field: created_at, f"{pk_field}__lt": pk})
+    )
+
+
+def feed_page(user, cursor, limit: int):
+    """
+    (id рецептов страницы по порядку, ключ следующей страницы или None).
+    Два-три запроса независимо от числа подписок.
+    """
+    fan_in = list(
+        FeedFanInAuthor.objects
+        .filter(author__follower_relations__follower=user)
+        .values_list("author_id", flat=True)
+    )
+
+    entries = FeedEntry.objects.filter(user=user)
+    if fan_in:
+        # строки, разложенные до перевода автора в fan-in, читаем из Recipe
+        entries = entries.exclude(author_id__in=fan_in)
+    keys = list(
+        entries.filter(_after(cursor, "created_at", "recipe_id"))
+        .order_by("-created_at", "-recipe_id")
+        .values_list("created_at", "recipe_id")[:limit + 1]
+    )
+    if fan_in:
+        keys += (
+            Recipe.objects.filter(author_id__in=fan_in)
+            .filter(_after(cursor, "created_at", "id"))
+            .order_by("-created_at", "-id")
+            .values_list("created_at", "id")[:limit + 1]
+        )
+        keys.sort(reverse=True)
+
+    page = keys[:limit]
+    next_key = page[-1] if len(keys) > limit else None
+    return [pk for _, pk in page], next_key
@@ -0,0 +1,164 @@
+import asyncio
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from .bench_server import Command as ServerBench
+
+
+class Command(BaseCommand):
+    """
+    Пропускная способность горячих GET под нагрузкой: async-обработчики
+    (utils/asyncviews.py, ASYNC_VIEWS=True) против прежнего sync-пути.
+
+    Поднимает продовый профиль (gunicorn.conf.py) в каждом режиме и держит
+    --concurrency одновременных запросов (keep-alive соединения) в течение
+    --duration секунд на каждый URL. Нагрузка — голый HTTP/1.1 на asyncio,
+    без сторонних клиентов.
+
+        python manage.py bench_async_views --token <ключ>
+        python manage.py bench_async_views --concurrency 64,512 --workers 2
+    """
+
+    help = "Бенчмарк async- и sync-обработчиков под высокой конкурентностью."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--concurrency", default="32,256,1024",
+                            help="Через запятую: запросов в полёте")
+        parser.add_argument("--duration", type=float, default=10)
+        parser.add_argument("--modes", default="sync,async")
+        parser.add_argument(
+            "--url", action="append", dest="urls",
+            help="Можно несколько раз; по умолчанию — list/retrieve рецептов, "
+                 "ингредиенты и users/me (с --token)",
+        )
+        parser.add_argument("--token", help="Ключ для Authorization: Token …")
+        parser.add_argument("--timeout", type=float, default=60)
+
+    def handle(self, *args, **options):
+        urls = options["urls"] or [
+            "/api/recipes/?limit=6", "/api/recipes/1/", "/api/ingredients/?name=%D1%81",
+            *(["/api/users/me/"] if options["token"] else []),
+        ]
+        levels = [int(level) for level in options["concurrency"].split(",")]
+        self.stdout.write(
+            f"{'режим':<6} {'в полёте':>8} {'req/s':>9} {'p50, мс':>8} "
+            f"{'p99, мс':>8} {'ошибки':>7}  url"
+        )
+        for mode in options["modes"].split(","):
+            with self._server(mode.strip(), options) as port:
+                for url in urls:
+                    for level in levels:
+                        result = asyncio.run(self._load(port, url, level, options))
+                        self._report(mode, level, url, result)
+
+    # --------------------------------------------------------------------- #
+    # Сервер                                                                #
+    # --------------------------------------------------------------------- #
+    @contextmanager
+    def _server(self, mode, options):
+        port = ServerBench._free_port()
+        env = {
+            **os.environ,
+            "ASYNC_VIEWS": str(mode == "async"),
+            "WEB_CONCURRENCY": str(options["workers"]),
+            "GUNICORN_BIND": f"127.0.0.1:{port}",
+            # перезапуск воркера посреди замера исказил бы цифры
+            "MAX_REQUESTS": "0",
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "app.asgi:application",
+             "--config", str(settings.BASE_DIR / "gunicorn.conf.py")],
+            cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            self._wait_ready(server, port, options)
+            yield port
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=options["timeout"])
+
+    def _wait_ready(self, process, port, options):
+        deadline = time.perf_counter() + options["timeout"]
+        while time.perf_counter() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"gunicorn завершился с кодом {process.returncode}")
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/api/ingredients/", timeout=5)
+                return
+            except OSError:
+                time.sleep(0.05)
+        raise CommandError("Сервер не поднялся за отведённое время.")
+
+    # --------------------------------------------------------------------- #
+    # Нагрузка                                                              #
+    # --------------------------------------------------------------------- #
+    async def _load(self, port, url, concurrency, options) -> dict:
+        headers = f"GET {url} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+        if options["token"]:
+            headers += f"Authorization: Token {options['token']}\r\n"
+        request = (headers + "\r\n").encode()
+        deadline = time.perf_counter() + options["duration"]
+        latencies, errors = [], [0]
+
+        async def client():
+            reader = writer = None
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    if writer is None:
+                        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                    writer.write(request)
+                    status = await self._read_response(reader)
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    errors[0] += 1
+                    writer = None
+                    continue
+                if status == 200:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors[0] += 1
+            if writer is not None:
+                writer.close()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        return {"latencies": latencies, "errors": errors[0], "elapsed": elapsed}
+
+    @staticmethod
+    async def _read_response(reader) -> int:
+        """Статус ответа; тело дочитывается по Content-Length."""
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split()[1])
+        length = 0
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        await reader.readexactly(length)
+        return status
+
+    def _report(self, mode, level, url, result):
+        latencies = sorted(result["latencies"])
+        if not latencies:
+            self.stdout.write(f"{mode:<6} {level:8d} {'—':>9} {'—':>8} {'—':>8} "
+                              f"{result['errors']:7d}  {url}")
+            return
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        self.stdout.write(
+            f"{mode:<6} {level:8d} {len(latencies) / result['elapsed']:9.0f} "
+            f"{statistics.median(latencies) * 1000:8.1f} {p99 * 1000:8.1f} "
+            f"{result['errors']:7d}  {url}"
+        )
@@ -0,0 +1,129 @@
+import statistics
+import time
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import RequestFactory
+
+from recipes.models import Ingredient
+from utils.dbpool import pool_stats
+
+
+class Command(BaseCommand):
+    """
+    Сравнивает режимы соединений с Postgres на реальном цикле запроса
+    (request_started/finished закрывают или возвращают соединение так же,
+    как под uvicorn):
+
+        python manage.py bench_db_connections
+        python manage.py bench_db_connections -n 500 --modes none,pool
+        python manage.py bench_db_connections --path "/api/recipes/?author=1"
+
+    По умолчанию — GET /api/ingredients/<id>/: карточка ингредиента не
+    кешируется (utils/cache.py), каждый запрос идёт в БД. Список
+    ингредиентов, рецепт, профиль отдаются из кеша — на них бенчмарк
+    мерил бы попадания в кеш, а не соединения.
+    """
+
+    help = "Бенчмарк установки соединений с БД на некешируемом GET."
+
+    MODES = ("none", "persistent", "pool")
+
+    def add_arguments(self, parser):
+        parser.add_argument("-n", "--requests", type=int, default=200,
+                            help="Запросов на режим (по умолчанию 200)")
+        parser.add_argument("--modes", default=",".join(self.MODES),
+                            help="Режимы через запятую: none, persistent, pool")
+        parser.add_argument("--path",
+                            help="Запрашиваемый URL, некешируемый "
+                                 "(по умолчанию /api/ingredients/<первый id>/)")
+
+    def handle(self, *args, **options):
+        modes = [m.strip() for m in options["modes"].split(",") if m.strip()]
+        unknown = set(modes) - set(self.MODES)
+        if unknown:
+            raise CommandError(f"Неизвестные режимы: {', '.join(sorted(unknown))}")
+
+        base = dict(connections.settings[DEFAULT_DB_ALIAS])
+        if base["ENGINE"] != "django.db.backends.postgresql":
+            raise CommandError("Бенчмарк рассчитан на PostgreSQL.")
+
+        path, _, query = (options["path"] or self._default_path()).partition("?")
+        environ = RequestFactory()._base_environ(
+            PATH_INFO=path, QUERY_STRING=query, REQUEST_METHOD="GET"
+        )
+        handler = WSGIHandler()
+
+        try:
+            for mode in modes:
+                self._use_config(self._config(base, mode))
+                timings = self._run(handler, environ, options["requests"])
+                self._report(mode, timings)
+        finally:
+            self._use_config(base)
+
+    # --------------------------------------------------------------------- #
+    # Вспомогательные методы                                                #
+    # --------------------------------------------------------------------- #
+    @staticmethod
+    def _default_path() -> str:
+        pk = Ingredient.objects.order_by("pk").values_list("pk", flat=True).first()
+        if pk is None:
+            raise CommandError("Справочник ингредиентов пуст: import_ingredients или --path.")
+        return f"/api/ingredients/{pk}/"
+
+    @staticmethod
+    def _config(base: dict, mode: str) -> dict:
+        """Настройки default-БД для режима."""
+        options = {k: v for k, v in base["OPTIONS"].items() if k != "pool"}
+        config = {**base, "OPTIONS": options, "CONN_MAX_AGE": 0}
+        if mode == "persistent":
+            config["CONN_MAX_AGE"] = 600
+        elif mode == "pool":
+            options["pool"] = base["OPTIONS"].get("pool") or {"max_size": 4}
+        return config
+
+    @staticmethod
+    def _use_config(config: dict):
+        """Подменяет соединение default на новое с указанными настройками."""
+        old = connections[DEFAULT_DB_ALIAS]
+        old.close()
+        if hasattr(old, "close_pool"):
+            old.close_pool()
+        connections.settings[DEFAULT_DB_ALIAS] = config
+        connections[DEFAULT_DB_ALIAS] = connections.create_connection(DEFAULT_DB_ALIAS)
+
+    def _run(self, handler, environ, count: int) -> list[float]:
+        def start_response(status, headers):
+            if not status.startswith("200"):
+                raise CommandError(f"{environ['PATH_INFO']} ответил {status}")
+
+        def request():
+            response = handler(dict(environ), start_response)
+            b"".join(response)
+            response.close()          # → request_finished, как у WSGI-сервера
+
+        request()                     # прогрев: URL-резолвер, сериализаторы
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            request()
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    def _report(self, mode: str, timings: list[float]):
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        total_s = sum(timings) / 1000
+        self.stdout.write(
+            f"{mode:<10} median {statistics.median(timings):7.2f} ms   "
+            f"p95 {p95:7.2f} ms   {len(timings) / total_s:7.1f} req/s"
+        )
+        stats = pool_stats()[DEFAULT_DB_ALIAS]
+        if stats["mode"] == "pool":
+            self.stdout.write(
+                f"{'':<10} pool: checkouts {stats['checkouts']}, "
+                f"waits {stats['waits']}, timeouts {stats['timeouts']}, "
+                f"opened {stats['connections_opened']}"
+            )
@@ -0,0 +1,103 @@
+import io
+import timeit
+import tracemalloc
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import parsers, renderers
+
+from utils import renderers as fast
+
+
+class Command(BaseCommand):
+    """
+    Сравнивает стандартные JSONRenderer/JSONParser DRF с orjson-версиями
+    из utils/renderers.py на странице рецептов в формате RecipeReadSerializer:
+
+        python manage.py bench_json_render
+        python manage.py bench_json_render --page-size 100 --repeat 500
+    """
+
+    help = "Бенчмарк рендеринга/парсинга JSON на страницах рецептов."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=100,
+                            help="Рецептов на странице (по умолчанию 100)")
+        parser.add_argument("--ingredients", type=int, default=10,
+                            help="Ингредиентов в рецепте (по умолчанию 10)")
+        parser.add_argument("--repeat", type=int, default=200,
+                            help="Повторов для замера времени")
+
+    def handle(self, *args, **options):
+        page = self._page(options["page_size"], options["ingredients"])
+        stock, orjson_ = renderers.JSONRenderer(), fast.JSONRenderer()
+
+        stock_body = stock.render(page)
+        if orjson_.render(page) != stock_body:
+            self.stderr.write(self.style.WARNING("Вывод рендереров отличается!"))
+        self.stdout.write(
+            f"Страница: {options['page_size']} рецептов, {len(stock_body) / 1024:.1f} КиБ\n"
+        )
+
+        self.stdout.write("render")
+        for name, renderer in (("DRF", stock), ("orjson", orjson_)):
+            self._measure(name, lambda r=renderer: r.render(page), options["repeat"])
+
+        # парсер получает уже готовое тело; Decimal/lazy/datetime там — строки
+        body = fast.dumps(page)
+        self.stdout.write("parse")
+        for name, parser in (("DRF", parsers.JSONParser()), ("orjson", fast.JSONParser())):
+            self._measure(
+                name, lambda p=parser: p.parse(io.BytesIO(body)), options["repeat"]
+            )
+
+    # --------------------------------------------------------------------- #
+    # Вспомогательные методы                                                #
+    # --------------------------------------------------------------------- #
+    @staticmethod
+    def _page(page_size: int, ingredients: int) -> dict:
+        """Страница пагинатора с рецептами как у RecipeReadSerializer."""
+        now = timezone.now()
+        author = {
+            "id": 1, "username": "recipes_bot", "email": "recipes_bot@example.com",
+            "avatar": "http://localhost/media/users/avatars/default.png",
+            "first_name": "Recipes", "last_name": "Bot", "is_subscribed": False,
+        }
+        results = [
+            {
+                "id": i,
+                "author": author,
+                "ingredients": [
+                    {
+                        "id": j, "name": f"Ингредиент №{j}",
+                        "measurement_unit": "г", "amount": Decimal("12.50"),
+                    }
+                    for j in range(ingredients)
+                ],
+                "is_favorited": i % 3 == 0,
+                "is_in_shopping_cart": i % 5 == 0,
+                "name": f"Рецепт №{i}",
+                "image": f"http://localhost/media/users/recipes/1/{i:016x}.png",
+                "text": "Нарезать, перемешать, запечь при 180 °C. " * 8,
+                "cooking_time": 30 + i % 60,
+                "created_at": now,
+                "difficulty": gettext_lazy("средне"),
+            }
+            for i in range(page_size)
+        ]
+        return {"count": 10_000, "next": None, "previous": None, "results": results}
+
+    def _measure(self, name: str, func, repeat: int):
+        best = min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+        # пик выделенной памяти за один вызов
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.stdout.write(
+            f"  {name:<7} {best:8.3f} ms   пик памяти {peak / 1024:8.1f} КиБ"
+        )
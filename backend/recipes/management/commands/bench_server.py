@@ -0,0 +1,125 @@
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """
+    Замер продового профиля сервера (gunicorn.conf.py): время от запуска
+    до готовности всех воркеров и память воркера — с preload_app и без.
+
+    RSS считает и общие с мастером страницы, поэтому рядом PSS (общие
+    страницы поделены между процессами) и private — сколько воркер
+    действительно добавляет к памяти контейнера. Только Linux (/proc).
+
+        python manage.py bench_server
+        python manage.py bench_server --workers 8 --modes preload
+    """
+
+    help = "Бенчмарк старта и памяти воркеров gunicorn."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--modes", default="preload,no-preload",
+                            help="Через запятую: preload, no-preload")
+        parser.add_argument("--requests", type=int, default=200,
+                            help="Запросов после старта, до замера памяти")
+        parser.add_argument("--url", default="/api/recipes/?limit=6")
+        parser.add_argument("--timeout", type=float, default=60)
+
+    def handle(self, *args, **options):
+        if not os.path.exists("/proc/self/smaps_rollup"):
+            raise CommandError("Нужен Linux с /proc/<pid>/smaps_rollup.")
+        self.stdout.write(
+            f"{'режим':<11} {'старт, с':>8} {'RSS, MB':>8} {'PSS, MB':>8} "
+            f"{'private':>8} {'мастер':>8}"
+        )
+        for mode in options["modes"].split(","):
+            self._bench(mode.strip(), options)
+
+    def _bench(self, mode, options):
+        port = self._free_port()
+        env = {
+            **os.environ,
+            "WEB_CONCURRENCY": str(options["workers"]),
+            "GUNICORN_PRELOAD": str(mode == "preload"),
+            "GUNICORN_BIND": f"127.0.0.1:{port}",
+            "DJANGO_SETTINGS_MODULE": os.environ["DJANGO_SETTINGS_MODULE"],
+        }
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "app.asgi:application",
+             "--config", str(settings.BASE_DIR / "gunicorn.conf.py")],
+            cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            url = f"http://127.0.0.1:{port}{options['url']}"
+            workers = self._wait_ready(server, url, options)
+            boot = time.perf_counter() - started
+
+            for _ in range(options["requests"]):
+                urllib.request.urlopen(url).read()
+            memory = [self._memory(pid) for pid in workers]
+            master = self._memory(server.pid)
+            self.stdout.write(
+                f"{mode:<11} {boot:8.2f} "
+                f"{statistics.mean(m['Rss'] for m in memory):8.1f} "
+                f"{statistics.mean(m['Pss'] for m in memory):8.1f} "
+                f"{statistics.mean(m['Private'] for m in memory):8.1f} "
+                f"{master['Rss']:8.1f}"
+            )
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=options["timeout"])
+
+    # --------------------------------------------------------------------- #
+    # Вспомогательные методы                                                #
+    # --------------------------------------------------------------------- #
+    def _wait_ready(self, server, url, options) -> list[int]:
+        """Ждёт всех воркеров и по ответу от каждого (подряд N·2 успешных)."""
+        deadline = time.perf_counter() + options["timeout"]
+        while time.perf_counter() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"gunicorn завершился с кодом {server.returncode}")
+            workers = self._children(server.pid)
+            if len(workers) == options["workers"]:
+                try:
+                    for _ in range(options["workers"] * 2):
+                        urllib.request.urlopen(url, timeout=5).read()
+                    return workers
+                except OSError:
+                    pass
+            time.sleep(0.05)
+        raise CommandError("Сервер не поднялся за отведённое время.")
+
+    @staticmethod
+    def _children(pid) -> list[int]:
+        with open(f"/proc/{pid}/task/{pid}/children") as file:
+            return [int(child) for child in file.read().split()]
+
+    @staticmethod
+    def _memory(pid) -> dict:
+        """Rss / Pss / Private из smaps_rollup, в MB."""
+        values = {}
+        with open(f"/proc/{pid}/smaps_rollup") as file:
+            for line in file:
+                name, _, rest = line.partition(":")
+                if rest.strip().endswith("kB"):
+                    values[name] = int(rest.split()[0]) / 1024
+        values["Private"] = values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)
+        return values
+
+    @staticmethod
+    def _free_port() -> int:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
@@ -0,0 +1,131 @@
+import statistics
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from recipes import similar
+
+
+class Command(BaseCommand):
+    """
+    Замер индекса похожих рецептов (recipes/similar.py) на синтетическом
+    каталоге — без БД, тем же алгоритмом: сигнатуры пачками NumPy, поиск
+    кандидатов по совпавшим полосам, точный Жаккар по кандидатам.
+    Полосы в памяти отсортированы, как B-tree индекс (band, bucket) в Postgres.
+
+        python manage.py bench_similar_recipes
+        python manage.py bench_similar_recipes --recipes 1000000 --queries 200
+    """
+
+    help = "Бенчмарк LSH-индекса похожих рецептов на синтетике."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipes", type=int, default=1_000_000)
+        parser.add_argument("--ingredients", type=int, default=2200,
+                            help="Размер справочника ингредиентов")
+        parser.add_argument("--per-recipe", type=int, default=10,
+                            help="Среднее число ингредиентов в рецепте")
+        parser.add_argument("--queries", type=int, default=100)
+        parser.add_argument("--top", type=int, default=10)
+        parser.add_argument("--batch-size", type=int, default=50_000)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        indptr, indices = self._catalog(rng, options)
+        n = len(indptr) - 1
+        self.stdout.write(f"Каталог: {n} рецептов, {len(indices)} связей с ингредиентами")
+
+        # 1. сигнатуры пачками
+        started = time.perf_counter()
+        buckets = np.empty((n, similar.NUM_BANDS), dtype=np.int64)
+        batch = options["batch_size"]
+        for lo in range(0, n, batch):
+            hi = min(lo + batch, n)
+            part = indptr[lo:hi + 1]
+            buckets[lo:hi] = similar.band_buckets(
+                similar.minhash_signatures(part - part[0], indices[part[0]:part[-1]])
+            )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"сигнатуры   {elapsed:8.2f} s   ({n / elapsed:,.0f} рецептов/с)")
+
+        # 2. «индекс»: по каждой полосе — bucket-ы по возрастанию
+        started = time.perf_counter()
+        order = np.argsort(buckets, axis=0, kind="stable")
+        sorted_buckets = np.take_along_axis(buckets, order, axis=0)
+        self.stdout.write(f"индекс      {time.perf_counter() - started:8.2f} s")
+
+        # 3. запросы и полнота относительно точного перебора
+        queries = rng.choice(n, size=min(options["queries"], n), replace=False)
+        timings, recalls = [], []
+        for q in queries:
+            started = time.perf_counter()
+            found = self._query(q, buckets, order, sorted_buckets, indptr, indices, options["top"])
+            timings.append((time.perf_counter() - started) * 1000)
+            exact = self._brute_force(q, indptr, indices, options["ingredients"], options["top"])
+            if exact:
+                # при равных оценках любой из равных — верный ответ
+                threshold = exact[-1][1]
+                good = sum(1 for _, score in found if score >= threshold - 1e-9)
+                recalls.append(min(good, len(exact)) / len(exact))
+
+        timings.sort()
+        self.stdout.write(
+            f"запрос      median {statistics.median(timings):7.2f} ms   "
+            f"p95 {timings[int(len(timings) * 0.95) - 1]:7.2f} ms"
+        )
+        if recalls:
+            self.stdout.write(f"recall@{options['top']}   {statistics.mean(recalls):8.3f}")
+
+    # --------------------------------------------------------------------- #
+    # Вспомогательные методы                                                #
+    # --------------------------------------------------------------------- #
+    @staticmethod
+    def _catalog(rng, options):
+        """CSR-каталог без повторов в рецепте; популярность ингредиентов по Ципфу."""
+        n, vocab = options["recipes"], options["ingredients"]
+        sizes = np.clip(rng.poisson(options["per_recipe"], n), 1, None)
+        weights = 1.0 / np.arange(1, vocab + 1) ** 0.8
+        weights /= weights.sum()
+        rows = np.repeat(np.arange(n, dtype=np.int64), sizes)
+        cols = rng.choice(vocab, size=len(rows), p=weights).astype(np.int64)
+        keys = np.unique(rows * vocab + cols)           # убираем повторы, порядок по рецептам
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.bincount(keys // vocab, minlength=n))
+        return indptr, keys % vocab
+
+    @staticmethod
+    def _query(q, buckets, order, sorted_buckets, indptr, indices, top):
+        parts = []
+        for band in range(similar.NUM_BANDS):
+            column = sorted_buckets[:, band]
+            lo = np.searchsorted(column, buckets[q, band], side="left")
+            hi = np.searchsorted(column, buckets[q, band], side="right")
+            parts.append(order[lo:hi, band])
+        hits = np.concatenate(parts)
+        hits = hits[hits != q]
+        if not len(hits):
+            return []
+        ids, shared = np.unique(hits, return_counts=True)
+        # как ORDER BY shared DESC, recipe_id LIMIT MAX_CANDIDATES
+        best = np.lexsort((ids, -shared))[:similar.MAX_CANDIDATES]
+        own = set(indices[indptr[q]:indptr[q + 1]].tolist())
+        scored = [
+            (int(pk), similar.jaccard(own, set(indices[indptr[pk]:indptr[pk + 1]].tolist())))
+            for pk in ids[best]
+        ]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return [item for item in scored[:top] if item[1] > 0]
+
+    @staticmethod
+    def _brute_force(q, indptr, indices, vocab, top):
+        """Точный Жаккар со всем каталогом — эталон для recall."""
+        mask = np.zeros(vocab, dtype=np.int64)
+        mask[indices[indptr[q]:indptr[q + 1]]] = 1
+        inter = np.add.reduceat(mask[indices], indptr[:-1])   # рецептов без ингредиентов нет
+        sizes = np.diff(indptr)
+        scores = inter / (sizes + sizes[q] - inter)
+        scores[q] = 0
+        best = np.argsort(-scores, kind="stable")[:top]
+        return [(int(pk), scores[pk]) for pk in best if scores[pk] > 0]
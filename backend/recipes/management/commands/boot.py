@@ -0,0 +1,166 @@
+import hashlib
+import os
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.staticfiles.finders import get_finders
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from recipes import catalog
+from recipes.models import SeedStamp
+
+# ключ pg_advisory_lock: одна загрузка на базу, сколько бы реплик ни стартовало
+LOCK_KEY = zlib.crc32(b"foodgram:boot")
+# отпечаток собранной статики — рядом с ней: том статики живёт отдельно от БД
+STATIC_STAMP = ".boot-fingerprint"
+# как collectstatic по умолчанию
+STATIC_IGNORE = ["CVS", ".*", "*~"]
+
+
+class Command(BaseCommand):
+    """
+    Подготовка при старте контейнера (entrypoint.sh) — только то, что
+    действительно изменилось:
+
+    * миграции — если есть непримененные;
+    * collectstatic --clear — если изменился отпечаток исходников статики
+      (содержимое файлов, найденных finder-ами);
+    * суперпользователь — если его ещё нет;
+    * import_ingredients / create_recipes — если изменился отпечаток
+      файла данных (SeedStamp в БД);
+    * снимок справочника ингредиентов (recipes/catalog.py) — если его
+      манифеста нет в MEDIA_ROOT (новый том).
+
+    Всё выполняется под pg_advisory_lock: параллельные реплики ждут первую
+    и затем пропускают уже сделанные шаги.
+
+        python manage.py boot --ingredients data/ingredients.csv --recipes data/recipes.json
+        python manage.py boot --force        # выполнить все шаги
+    """
+
+    help = "Миграции, статика и начальные данные — с пропуском неизменившихся шагов."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ingredients", type=Path, help="CSV для import_ingredients")
+        parser.add_argument("--recipes", type=Path, help="JSON для create_recipes")
+        parser.add_argument("--force", action="store_true",
+                            help="Не пропускать шаги")
+
+    def handle(self, *args, **options):
+        self.force = options["force"]
+        started = time.perf_counter()
+        with self._lock():
+            self._step("миграции", self._migrate)
+            self._step("статика", self._collectstatic)
+            self._step("суперпользователь", self._superuser)
+            if options["ingredients"]:
+                self._step("ингредиенты", lambda: self._seed(
+                    "import_ingredients", options["ingredients"]))
+            self._step("снимок справочника", self._catalog)
+            if options["recipes"]:
+                self._step("рецепты", lambda: self._seed(
+                    "create_recipes", options["recipes"],
+                    then=[("rebuild_similarity_index", "--missing")]))
+        self.stdout.write(f"Готово за {time.perf_counter() - started:.2f} с")
+
+    # --------------------------------------------------------------------- #
+    # Шаги: возвращают текст «что сделано» или None — пропущено             #
+    # --------------------------------------------------------------------- #
+    def _migrate(self):
+        executor = MigrationExecutor(connection)
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+        if not plan and not self.force:
+            return None
+        call_command("migrate", interactive=False, verbosity=0)
+        return f"применено {len(plan)}"
+
+    def _collectstatic(self):
+        fingerprint = self._static_fingerprint()
+        stamp = Path(settings.STATIC_ROOT) / STATIC_STAMP
+        if not self.force and stamp.exists() and stamp.read_text() == fingerprint:
+            return None
+        call_command("collectstatic", interactive=False, clear=True, verbosity=0)
+        stamp.write_text(fingerprint)
+        return "собрана заново"
+
+    def _superuser(self):
+        User = get_user_model()
+        username = os.getenv("DJANGO_SUPERUSER_USERNAME", "admin")
+        email    = os.getenv("DJANGO_SUPERUSER_EMAIL",    "admin@example.com")
+        password = os.getenv("DJANGO_SUPERUSER_PASSWORD", "1234")
+        if User.objects.filter(username=username).exists() or User.objects.filter(email=email).exists():
+            return None
+        User.objects.create_superuser(username=username, email=email, password=password)
+        return f"создан «{username}»"
+
+    def _catalog(self):
+        if not self.force and catalog.manifest.get() is not None:
+            return None
+        return f"опубликован {catalog.publish()['file']}"
+
+    def _seed(self, command, path: Path, then=()):
+        if not path.exists():
+            raise CommandError(f"Файл {path} не найден")
+        fingerprint = hashlib.sha256(path.read_bytes()).hexdigest()
+        if not self.force and SeedStamp.objects.filter(
+            step=command, fingerprint=fingerprint
+        ).exists():
+            return None
+        call_command(command, str(path), stdout=self.stdout)
+        for args in then:
+            call_command(*args, stdout=self.stdout)
+        SeedStamp.objects.update_or_create(
+            step=command, defaults={"fingerprint": fingerprint}
+        )
+        return f"загружено из {path}"
+
+    # --------------------------------------------------------------------- #
+    # Вспомогательные методы                                                #
+    # --------------------------------------------------------------------- #
+    def _step(self, title, run):
+        started = time.perf_counter()
+        done = run()
+        elapsed = time.perf_counter() - started
+        if done is None:
+            self.stdout.write(f"▶ {title}: без изменений, пропуск ({elapsed:.2f} с)")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"▶ {title}: {done} ({elapsed:.2f} с)"))
+
+    @contextmanager
+    def _lock(self):
+        """Сессионный advisory lock; снимается и при падении процесса."""
+        if connection.vendor != "postgresql":
+            yield
+            return
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", [LOCK_KEY])
+            if not cursor.fetchone()[0]:
+                self.stdout.write("Другая реплика выполняет загрузку — жду…")
+                cursor.execute("SELECT pg_advisory_lock(%s)", [LOCK_KEY])
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", [LOCK_KEY])
+
+    @staticmethod
+    def _static_fingerprint() -> str:
+        """Хеш путей и содержимого всех исходных файлов статики."""
+        files = {}
+        for finder in get_finders():
+            for path, storage in finder.list(STATIC_IGNORE):
+                # как collectstatic: первый найденный файл с этим путём побеждает
+                files.setdefault(path, storage)
+        digest = hashlib.sha256()
+        for path in sorted(files):
+            digest.update(path.encode() + b"\0")
+            with files[path].open(path) as file:
+                digest.update(hashlib.sha256(file.read()).digest())
+        return digest.hexdigest()
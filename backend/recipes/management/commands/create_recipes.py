@@ -5,7 +5,10 @@ from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth import get_user_model
 from django.db import transaction
 
+from recipes import catalog, outbox
+from recipes.documents import rebuild_documents
 from recipes.models import Ingredient, Recipe, RecipeIngredient
+from utils.cache import cache
 
 
 class Command(BaseCommand):
@@ -61,38 +64,46 @@ class Command(BaseCommand):
         )
 
         # 3. Создаём ----------------------------------------------------------
-        created, skipped = 0, 0
+        # рецепт бота с таким названием уже есть — пропускаем (как раньше
+        # get_or_create, но одним запросом на весь файл)
+        titles = set(
+            Recipe.objects.filter(author=author).values_list("title", flat=True)
+        )
+        fresh = []
         for data in recipes_data:
-            recipe, is_created = Recipe.objects.get_or_create(
+            if data["title"] not in titles:
+                titles.add(data["title"])
+                fresh.append(data)
+        created, skipped = len(fresh), len(recipes_data) - len(fresh)
+
+        ingredient_ids = self._ingredient_ids(
+            (ing["name"], ing["measurement_unit"])      # поправь, если у тебя поле `name`
+            for data in fresh for ing in data["ingredients"]
+        )
+        recipes = Recipe.objects.bulk_create(
+            Recipe(
                 author=author,
                 title=data["title"],
-                defaults={
-                    "description": data["description"],
-                    "cooking_time": data["cooking_time"],
-                    "image": data["image"],
-                },
+                description=data["description"],
+                cooking_time=data["cooking_time"],
+                image=data["image"],
+            )
+            for data in fresh
+        )
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe,
+                ingredient_id=ingredient_ids[ing["name"], ing["measurement_unit"]],
+                amount=ing["amount"],
             )
-            if not is_created:
-                skipped += 1
-                continue
-
-            # ингредиенты
-            bulk = []
-            for ing in data["ingredients"]:
-                ingredient, _ = Ingredient.objects.get_or_create(
-                    title=ing["name"],          # поправь, если у тебя поле `name`
-                    measurement_unit=ing["measurement_unit"],
-                )
-                bulk.append(
-                    RecipeIngredient(
-                        recipe=recipe,
-                        ingredient=ingredient,
-                        amount=ing["amount"],
-                    )
-                )
-            RecipeIngredient.objects.bulk_create(bulk)
-
-            created += 1
+            for recipe, data in zip(recipes, fresh)
+            for ing in data["ingredients"]
+        )
+
+        # 4. bulk_create сигналов не шлёт — то же, что recipe_saved -----------
+        rebuild_documents(recipe.pk for recipe in recipes)
+        for recipe in recipes:
+            outbox.emit("feed.fan_out", recipe_id=recipe.pk)
             self.stdout.write(f"✓ {recipe.title}")
 
         # 5. Итог -------------------------------------------------------------
@@ -103,6 +114,27 @@ class Command(BaseCommand):
     # --------------------------------------------------------------------- #
     # Вспомогательные методы                                                #
     # --------------------------------------------------------------------- #
+    @staticmethod
+    def _ingredient_ids(pairs) -> dict:
+        """(название, ед. изм.) → id; недостающие ингредиенты создаёт пачкой."""
+        known = {
+            (title, unit): pk
+            for pk, title, unit in Ingredient.objects.values_list(
+                "id", "title", "measurement_unit"
+            )
+        }
+        missing = {pair for pair in pairs if pair not in known}
+        if missing:
+            for ingredient in Ingredient.objects.bulk_create(
+                Ingredient(title=title, measurement_unit=unit)
+                for title, unit in sorted(missing)
+            ):
+                known[ingredient.title, ingredient.measurement_unit] = ingredient.pk
+            # как ingredient_saved: справочник изменился
+            transaction.on_commit(lambda: cache.invalidate("ingredients"))
+            catalog.schedule_publish()
+        return known
+
     def _resolve_json_path(self, cli_path: str | None) -> Path:
         """
         Возвращает Path к JSON-файлу.
@@ -0,0 +1,63 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from recipes import outbox
+from recipes.models import OutboxEvent
+
+
+class Command(BaseCommand):
+    """
+    Воркер outbox (recipes/outbox.py): выполняет отложенные побочные
+    эффекты записей. Отдельным процессом, их можно запустить несколько —
+    пачки не пересекаются (SKIP LOCKED):
+
+        python manage.py drain_outbox
+        python manage.py drain_outbox --once            # до пустой очереди и выйти
+        python manage.py drain_outbox --requeue-dead    # вернуть dead в очередь
+
+    SIGTERM / SIGINT — дорабатывает текущую пачку и выходит.
+    """
+
+    help = "Выполняет события outbox пачками."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--poll", type=float, default=1.0,
+                            help="Пауза, когда очередь пуста, секунд")
+        parser.add_argument("--once", action="store_true",
+                            help="Выйти, когда очередь опустеет")
+        parser.add_argument("--requeue-dead", action="store_true",
+                            help="Вернуть события со статусом dead в очередь и выйти")
+        parser.add_argument("--topic", help="Для --requeue-dead: только эта тема")
+
+    def handle(self, *args, **options):
+        if options["requeue_dead"]:
+            count = outbox.requeue_dead(options["topic"])
+            self.stdout.write(f"Возвращено в очередь: {count}")
+            return
+
+        self._stopping = False
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self._stop)
+
+        while not self._stopping:
+            result = outbox.drain(options["batch_size"])
+            if any(result.values()):
+                self.stdout.write(
+                    "выполнено {done}, повтор {retried}, dead {dead}".format(**result)
+                )
+                continue
+            if options["once"]:
+                break
+            close_old_connections()
+            time.sleep(options["poll"])
+
+        dead = OutboxEvent.objects.filter(status=OutboxEvent.Status.DEAD).count()
+        if dead:
+            self.stderr.write(f"Событий со статусом dead: {dead}")
+
+    def _stop(self, signum, frame):
+        self._stopping = True
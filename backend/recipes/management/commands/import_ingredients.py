@@ -5,7 +5,9 @@ from pathlib import Path
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
+from recipes import catalog
 from recipes.models import Ingredient
+from utils.cache import cache
 
 
 class Command(BaseCommand):
@@ -42,22 +44,32 @@ class Command(BaseCommand):
             rows.extend(reader)
 
         objs = []
-        for title, unit, *_ in rows:
-            title = title.strip()
-            unit = unit.strip()
+        with transaction.atomic():
+            # названия без учёта регистра — один запрос, а не по строке CSV
+            known = {
+                title.casefold()
+                for title in Ingredient.objects.values_list("title", flat=True)
+            }
+            for title, unit, *_ in rows:
+                title = title.strip()
+                unit = unit.strip()
 
-            if Ingredient.objects.filter(title__iexact=title).exists():
-                skipped += 1
-                continue
+                if title.casefold() in known:
+                    skipped += 1
+                    continue
 
-            objs.append(Ingredient(title=title, measurement_unit=unit))
+                known.add(title.casefold())
+                objs.append(Ingredient(title=title, measurement_unit=unit))
 
-        with transaction.atomic():
             Ingredient.objects.bulk_create(objs)
             created = len(objs)
+        # bulk_create сигналов не шлёт — сбрасываем кеш справочника сами
+        cache.invalidate("ingredients")
+        snapshot = catalog.publish()
 
         self.stdout.write(
             self.style.SUCCESS(
                 f"Импорт завершён: добавлено {created}, пропущено {skipped}"
             )
         )
+        self.stdout.write(f"Снимок справочника: {snapshot['file']}")
@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from recipes.models import RecipeChange
+
+
+class Command(BaseCommand):
+    """
+    Чистит журнал RecipeChange (запускать по cron). Хранить дольше
+    PANTRY_INDEX_MAX_AGE незачем: индекс такого возраста воркер
+    пересобирает целиком.
+
+        python manage.py prune_recipe_changes
+        python manage.py prune_recipe_changes --older-than 86400
+    """
+
+    help = "Удаляет старые записи журнала изменений рецептов."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than", type=int, default=24 * 60 * 60,
+                            help="Возраст записей в секундах (по умолчанию сутки)")
+
+    def handle(self, *args, **options):
+        border = timezone.now() - timedelta(seconds=options["older_than"])
+        deleted, _ = RecipeChange.objects.filter(created_at__lt=border).delete()
+        self.stdout.write(self.style.SUCCESS(f"Удалено записей: {deleted}"))
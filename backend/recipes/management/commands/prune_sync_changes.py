@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from recipes.models import SyncChange, SyncState
+
+
+class Command(BaseCommand):
+    """
+    Чистит журнал SyncChange (запускать по cron). У каждого затронутого
+    пользователя floor поднимается до последней удалённой версии: клиент
+    с версией ниже получит полный состав ("reset": true), а не дельту
+    с дырой.
+
+        python manage.py prune_sync_changes
+        python manage.py prune_sync_changes --older-than 604800
+    """
+
+    help = "Удаляет старые записи журнала синхронизации."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than", type=int,
+                            default=settings.SYNC_RETENTION_DAYS * 24 * 60 * 60,
+                            help="Возраст записей в секундах (по умолчанию SYNC_RETENTION_DAYS)")
+
+    def handle(self, *args, **options):
+        border = timezone.now() - timedelta(seconds=options["older_than"])
+        old = SyncChange.objects.filter(created_at__lt=border)
+        with transaction.atomic():
+            floors = old.values("user_id").annotate(floor=Max("version"))
+            for row in floors:
+                SyncState.objects.filter(
+                    user_id=row["user_id"], floor__lt=row["floor"]
+                ).update(floor=row["floor"])
+            deleted, _ = old.delete()
+        self.stdout.write(self.style.SUCCESS(f"Удалено записей: {deleted}"))
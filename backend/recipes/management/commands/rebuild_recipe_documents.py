@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from recipes.documents import rebuild_documents
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    """
+    Пример:
+        python manage.py rebuild_recipe_documents             # все рецепты
+        python manage.py rebuild_recipe_documents 12 15 40    # выбранные
+    """
+
+    help = "Пересобирает денормализованные документы рецептов (Recipe.document)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("ids", nargs="*", type=int, help="id рецептов")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        ids = options["ids"] or Recipe.objects.values_list("id", flat=True)
+        ids = list(ids)
+        batch = options["batch_size"]
+        for start in range(0, len(ids), batch):
+            rebuild_documents(ids[start:start + batch], batch_size=batch)
+        self.stdout.write(self.style.SUCCESS(f"Пересобрано документов: {len(ids)}"))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+
+from recipes import similar
+from recipes.models import Recipe, RecipeSimilarityBand
+
+
+class Command(BaseCommand):
+    """
+    Пример:
+        python manage.py rebuild_similarity_index              # все рецепты
+        python manage.py rebuild_similarity_index --missing    # только без полос
+        python manage.py rebuild_similarity_index 12 15 40     # выбранные
+    """
+
+    help = "Пересчитывает MinHash-полосы рецептов для /api/recipes/{id}/similar/."
+
+    def add_arguments(self, parser):
+        parser.add_argument("ids", nargs="*", type=int, help="id рецептов")
+        parser.add_argument("--missing", action="store_true",
+                            help="Только рецепты, которых ещё нет в индексе")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.order_by("pk")
+        if options["ids"]:
+            recipes = recipes.filter(pk__in=options["ids"])
+        if options["missing"]:
+            recipes = recipes.exclude(
+                Exists(RecipeSimilarityBand.objects.filter(recipe=OuterRef("pk")))
+            )
+        ids = list(recipes.values_list("id", flat=True))
+
+        batch = options["batch_size"]
+        for start in range(0, len(ids), batch):
+            # сигнатуры пачки считаются NumPy за раз, пишутся только изменившиеся
+            similar.refresh_index(similar.ingredient_sets(ids[start:start + batch]))
+        self.stdout.write(self.style.SUCCESS(f"Проиндексировано рецептов: {len(ids)}"))
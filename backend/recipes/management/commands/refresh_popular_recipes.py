@@ -0,0 +1,56 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from recipes.popular import rebuild_leaderboards, refresh_activity
+
+
+class Command(BaseCommand):
+    """
+    Обновляет топы /api/recipes/popular/ (recipes/popular.py). Запускать
+    по расписанию, например из cron раз в 5 минут:
+
+        */5 * * * * python manage.py refresh_popular_recipes
+
+    или отдельным процессом:
+
+        python manage.py refresh_popular_recipes --every 300
+        python manage.py refresh_popular_recipes --full    # пересчитать всю историю
+
+    В docker-compose его запускает сервис scheduler (infra/): сначала
+    --full — сводка HISTORY_SENTINEL для окна «всё время», — потом по кругу.
+    """
+
+    help = "Пересчитывает почасовые сводки и топы популярных рецептов."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lookback-hours", type=int, default=3,
+                            help="Сколько последних часов пересчитывать")
+        parser.add_argument("--full", action="store_true",
+                            help="Пересчитать сводки за всё время")
+        parser.add_argument("--every", type=int, default=0,
+                            help="Повторять каждые N секунд (0 — один раз)")
+
+    def handle(self, *args, **options):
+        while True:
+            self._refresh(options)
+            if not options["every"]:
+                return
+            close_old_connections()
+            time.sleep(options["every"])
+
+    def _refresh(self, options):
+        started = time.perf_counter()
+        since = None
+        if not options["full"]:
+            since = timezone.now() - timedelta(hours=options["lookback_hours"])
+        buckets = refresh_activity(since)
+        rebuild_leaderboards(settings.POPULAR_SIZE)
+        self.stdout.write(
+            f"Сводок пересчитано: {buckets}, "
+            f"за {time.perf_counter() - started:.2f} с"
+        )
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.3 on 2026-10-19 09:09
+
+from django.db import migrations, models
+
+AUTHOR_FIELDS = ("id", "username", "email", "avatar", "first_name", "last_name")
+
+
+def build_documents(apps, schema_editor):
+    """Первичное заполнение Recipe.document (логика — recipes/documents.py)."""
+    Recipe = apps.get_model("recipes", "Recipe")
+    RecipeIngredient = apps.get_model("recipes", "RecipeIngredient")
+
+    docs = {
+        row["id"]: {
+            "author": {name: row[f"author__{name}"] for name in AUTHOR_FIELDS},
+            "ingredients": [],
+        }
+        for row in Recipe.objects.values(
+            "id", *(f"author__{name}" for name in AUTHOR_FIELDS)
+        )
+    }
+    items = RecipeIngredient.objects.order_by("pk").values_list(
+        "recipe_id", "ingredient_id", "ingredient__title",
+        "ingredient__measurement_unit", "amount",
+    )
+    for recipe_id, ingredient_id, title, unit, amount in items:
+        docs[recipe_id]["ingredients"].append({
+            "id": ingredient_id,
+            "name": title,
+            "measurement_unit": unit,
+            "amount": str(amount),
+        })
+    Recipe.objects.bulk_update(
+        [Recipe(pk=pk, document=doc) for pk, doc in docs.items()],
+        ["document"], batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0002_alter_ingredient_title_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='document',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(build_documents, migrations.RunPython.noop),
+    ]
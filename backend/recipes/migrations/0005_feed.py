@@ -0,0 +1,63 @@
+# Generated by Django 5.2.3 on 2026-10-19 09:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BACKFILL_SIZE = 50
+
+
+def backfill_feeds(apps, schema_editor):
+    """Ленты для подписок, созданных до появления таблицы."""
+    Subscription = apps.get_model("users", "Subscription")
+    Recipe = apps.get_model("recipes", "Recipe")
+    FeedEntry = apps.get_model("recipes", "FeedEntry")
+
+    for follower_id, author_id in Subscription.objects.values_list("follower_id", "author_id").iterator():
+        recent = (
+            Recipe.objects.filter(author_id=author_id)
+            .order_by("-created_at", "-id")
+            .values_list("id", "created_at")[:BACKFILL_SIZE]
+        )
+        FeedEntry.objects.bulk_create(
+            [
+                FeedEntry(user_id=follower_id, recipe_id=recipe_id,
+                          author_id=author_id, created_at=created_at)
+                for recipe_id, created_at in recent
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_recipe_list_indexes'),
+        ('users', '0002_user_token_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedFanInAuthor',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='recipes.recipe')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-created_at', '-recipe'], name='feed_user_keyset_idx'), models.Index(fields=['user', 'author'], name='feed_user_author_idx')],
+                'unique_together': {('user', 'recipe')},
+            },
+        ),
+        migrations.RunPython(backfill_feeds, migrations.RunPython.noop),
+    ]
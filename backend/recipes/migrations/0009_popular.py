@@ -0,0 +1,68 @@
+# Generated by Django 5.2.3 on 2026-10-19 09:25
+
+from datetime import datetime, timezone
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+# момент добавления для строк, которые старше колонки: он неизвестен.
+# Час 1970-01-01 не попадает ни в одно окно, кроме «всё время»
+# (recipes/popular.py: HISTORY_SENTINEL)
+HISTORY_SENTINEL = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def mark_history(apps, schema_editor):
+    # AddField проставил бы существующим строкам время деплоя, и топы за
+    # сутки и неделю первую неделю показывали бы счёт за всё время
+    for name in ("Favorite", "ShoppingCart"):
+        apps.get_model("recipes", name).objects.update(created_at=HISTORY_SENTINEL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_shortlink'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='favorite',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='shoppingcart',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.RunPython(mark_history, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='PopularRecipe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window', models.CharField(choices=[('day', 'сутки'), ('week', 'неделя'), ('all', 'всё время')], max_length=8)),
+                ('rank', models.PositiveIntegerField()),
+                ('score', models.PositiveIntegerField()),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='recipes.recipe')),
+            ],
+            options={
+                'ordering': ('window', 'rank'),
+                'unique_together': {('window', 'rank')},
+            },
+        ),
+        migrations.CreateModel(
+            name='RecipeActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('favorites', models.PositiveIntegerField(default=0)),
+                ('cart_adds', models.PositiveIntegerField(default=0)),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='recipes.recipe')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hour'], name='activity_hour_idx')],
+                'unique_together': {('recipe', 'hour')},
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-19 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_popular'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeedStamp',
+            fields=[
+                ('step', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('finished_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.db import models
 from django.core.validators import MinValueValidator
+from django.utils import timezone
 
 from users.models import User
 
@@ -73,10 +74,19 @@ class Recipe(models.Model):
         default='users/recipes/default.png'
     )
 
+    # автор + ингредиенты для чтения одной строкой (recipes/documents.py)
+    document = models.JSONField(default=dict, blank=True, editable=False)
+
     class Meta:
         ordering = ("-created_at",)
         verbose_name = "рецепт"
         verbose_name_plural = "рецепты"
+        indexes = [
+            # лента и ?author= идут в порядке -created_at с LIMIT —
+            # индекс отдаёт первую страницу без сортировки всей таблицы
+            models.Index(fields=["-created_at"], name="recipe_created_idx"),
+            models.Index(fields=["author", "-created_at"], name="recipe_author_created_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -89,6 +99,8 @@ class Favorite(models.Model):
     recipe  = models.ForeignKey(
         Recipe, on_delete=models.CASCADE,
         related_name='favorited_by')
+    # для почасовых сводок популярности (recipes/popular.py)
+    created_at = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
 
     class Meta:
         unique_together = ('user', 'recipe')
@@ -101,6 +113,8 @@ class ShoppingCart(models.Model):
     recipe  = models.ForeignKey(
         Recipe, on_delete=models.CASCADE,
         related_name='in_shopping_carts')
+    # для почасовых сводок популярности (recipes/popular.py)
+    created_at = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
 
     class Meta:
         unique_together = ('user', 'recipe')
@@ -133,4 +147,195 @@ class RecipeIngredient(models.Model):
         verbose_name_plural = "ингредиенты в рецепте"
 
     def __str__(self):
-        return f"{self.ingredient} — {self.amount}"
\ No newline at end of file
+        return f"{self.ingredient} — {self.amount}"
+
+class FeedEntry(models.Model):
+    """Строка ленты подписок: рецепт автора, на которого подписан user (recipes/feed.py)."""
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE,
+        related_name="feed_entries")
+    recipe = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE,
+        related_name="+")
+    # автор рецепта — чтобы отписка чистила ленту без JOIN
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE,
+        related_name="+")
+    # копия Recipe.created_at — ключ сортировки ленты
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("user", "recipe")
+        indexes = [
+            models.Index(fields=["user", "-created_at", "-recipe"], name="feed_user_keyset_idx"),
+            models.Index(fields=["user", "author"], name="feed_user_author_idx"),
+        ]
+
+
+class FeedFanInAuthor(models.Model):
+    """
+    Автор, чьи рецепты не раскладываются по лентам (слишком много
+    подписчиков): лента читает их напрямую из Recipe.
+    """
+
+    author = models.OneToOneField(
+        User, on_delete=models.CASCADE,
+        primary_key=True, related_name="+")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class RecipeSimilarityBand(models.Model):
+    """Полоса MinHash-сигнатуры рецепта для поиска похожих (recipes/similar.py)."""
+
+    recipe = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE,
+        related_name="+")
+    band   = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        unique_together = ("recipe", "band")
+        indexes = [
+            models.Index(fields=["band", "bucket"], name="similarity_bucket_idx"),
+        ]
+
+
+class RecipeChange(models.Model):
+    """
+    Журнал изменений состава рецептов: id рецепта, чьи ингредиенты могли
+    измениться или который удалён. По нему воркеры дообновляют свои
+    индексы в памяти (recipes/pantry.py). Старые записи чистит
+    `manage.py prune_recipe_changes`.
+    """
+
+    # без FK: запись об удалении переживает сам рецепт
+    recipe_id  = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+
+class ShortLink(models.Model):
+    """Короткая ссылка /s/<code>/ на рецепт (recipes/shortlinks.py)."""
+
+    code   = models.CharField(max_length=16, unique=True)
+    recipe = models.OneToOneField(
+        Recipe, on_delete=models.CASCADE,
+        related_name="short_link")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class RecipeActivity(models.Model):
+    """Почасовая сводка: сколько раз рецепт добавили в избранное / корзину."""
+
+    recipe    = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE,
+        related_name="+")
+    hour      = models.DateTimeField()
+    favorites = models.PositiveIntegerField(default=0)
+    cart_adds = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("recipe", "hour")
+        indexes = [models.Index(fields=["hour"], name="activity_hour_idx")]
+
+
+class PopularRecipe(models.Model):
+    """Готовый топ рецептов за окно; пересобирается refresh_popular_recipes."""
+
+    class Window(models.TextChoices):
+        DAY  = "day",  "сутки"
+        WEEK = "week", "неделя"
+        ALL  = "all",  "всё время"
+
+    window = models.CharField(max_length=8, choices=Window.choices)
+    rank   = models.PositiveIntegerField()
+    recipe = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE,
+        related_name="+")
+    score  = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ("window", "rank")
+        ordering = ("window", "rank")
+
+
+class SeedStamp(models.Model):
+    """
+    Отпечаток входных данных шага запуска (manage.py boot): при том же
+    отпечатке шаг при следующем старте контейнера пропускается.
+    """
+
+    step        = models.CharField(max_length=64, primary_key=True)
+    fingerprint = models.CharField(max_length=64)
+    finished_at = models.DateTimeField(auto_now=True)
+
+
+class OutboxEvent(models.Model):
+    """
+    Побочный эффект записи, отложенный до воркера (recipes/outbox.py):
+    пишется в одной транзакции с самой записью, выполняется
+    `manage.py drain_outbox`. Выполненные удаляются, исчерпавшие
+    попытки остаются со статусом dead.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "ожидает"
+        DEAD    = "dead",    "не выполнено"
+
+    topic        = models.CharField(max_length=64)
+    payload      = models.JSONField(default=dict)
+    status       = models.CharField(max_length=8, choices=Status.choices,
+                                    default=Status.PENDING)
+    attempts     = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    last_error   = models.TextField(blank=True)
+    created_at   = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # очередь воркера: только ожидающие, по времени готовности
+            models.Index(
+                fields=["available_at", "id"], name="outbox_pending_idx",
+                condition=models.Q(status="pending"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.topic} #{self.pk} ({self.status})"
+
+
+class SyncState(models.Model):
+    """
+    Версия журнала изменений пользователя (recipes/sync.py): растёт на
+    каждое изменение; строка блокируется на время записи, так что версии
+    одного пользователя коммитятся по порядку.
+    """
+
+    user    = models.OneToOneField(
+        User, on_delete=models.CASCADE,
+        primary_key=True, related_name="+")
+    version = models.PositiveBigIntegerField(default=0)
+    # изменения с версией не выше floor удалены из журнала (prune_sync_changes)
+    floor   = models.PositiveBigIntegerField(default=0)
+
+
+class SyncChange(models.Model):
+    """Добавление / удаление в избранном, корзине или подписках (recipes/sync.py)."""
+
+    class Kind(models.TextChoices):
+        FAVORITES     = "favorites",     "избранное"
+        SHOPPING_CART = "shopping_cart", "корзина"
+        SUBSCRIPTIONS = "subscriptions", "подписки"
+
+    user      = models.ForeignKey(
+        User, on_delete=models.CASCADE,
+        related_name="+")
+    version   = models.PositiveBigIntegerField()
+    kind      = models.CharField(max_length=16, choices=Kind.choices)
+    # id рецепта или автора; без FK — запись переживает удаление объекта
+    object_id = models.BigIntegerField()
+    deleted   = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = ("user", "version")
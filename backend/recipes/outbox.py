@@ -0,0 +1,121 @@
+"""
+Transactional outbox: побочные эффекты записи — вне запроса.
+
+Раскладка рецепта по лентам, дозаполнение ленты при подписке, индекс
+похожих рецептов — всё это не нужно клиенту в ответе на запись, но
+стоит времени. Запрос только добавляет событие в OutboxEvent в той же
+транзакции, что и саму запись:
+
+    outbox.emit("feed.fan_out", recipe_id=recipe.pk)
+
+— откат записи откатывает и событие, коммит гарантирует, что событие
+будет выполнено. Обработчики регистрируются по теме:
+
+    @outbox.handler("feed.fan_out")
+    def fan_out(recipe_id): ...
+
+и выполняются `manage.py drain_outbox`: пачка ожидающих событий
+выбирается SELECT … FOR UPDATE SKIP LOCKED (несколько воркеров не
+мешают друг другу), каждое — в своей точке сохранения, выполненные
+удаляются в той же транзакции. Упавшее событие повторяется с
+экспоненциальной задержкой, после OUTBOX_MAX_ATTEMPTS попыток
+остаётся в таблице со статусом dead (dead letter) до разбора.
+
+Доставка — «хотя бы раз»: обработчики должны быть идемпотентны.
+Порядок событий не гарантирован, поэтому обработчик сверяется с
+текущим состоянием базы, а не с тем, что было при записи.
+
+OUTBOX_INLINE=True (разработка без воркера) — событие так же пишется в
+таблицу, но сразу после коммита выполняется в процессе запроса тем же
+drain(): повторы и dead letter те же, а ошибка обработчика не превращает
+уже закоммиченную запись в 500.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from utils.dbrouter import use_primary
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+
+def handler(topic: str):
+    """Декоратор: регистрирует обработчик событий темы."""
+    def decorator(func):
+        _handlers[topic] = func
+        return func
+    return decorator
+
+
+def emit(topic: str, **payload):
+    """Ставит событие в outbox текущей транзакции."""
+    if topic not in _handlers:
+        raise LookupError(f"outbox: нет обработчика для {topic!r}")
+    event = OutboxEvent.objects.create(topic=topic, payload=payload)
+    if settings.OUTBOX_INLINE:
+        transaction.on_commit(lambda: drain(ids=[event.pk]), robust=True)
+
+
+def drain(batch_size: int = 100, ids=None) -> dict:
+    """
+    Выполняет одну пачку готовых событий (ids — только эти).
+    → {"done": …, "retried": …, "dead": …}; все нули — очередь пуста.
+    """
+    result = dict.fromkeys(("done", "retried", "dead"), 0)
+    # обработчики читают только что записанное — не с реплики
+    with use_primary(), transaction.atomic():
+        pending = OutboxEvent.objects.filter(
+            status=OutboxEvent.Status.PENDING, available_at__lte=timezone.now()
+        )
+        if ids is not None:
+            pending = pending.filter(pk__in=ids)
+        events = list(
+            pending
+            .select_for_update(skip_locked=True)
+            .order_by("available_at", "id")[:batch_size]
+        )
+        done, failed = [], []
+        for event in events:
+            try:
+                with transaction.atomic():
+                    _handlers[event.topic](**event.payload)
+            except Exception as exc:
+                logger.exception("outbox: %s не выполнено", event)
+                _schedule_retry(event, exc)
+                failed.append(event)
+                result["dead" if event.status == OutboxEvent.Status.DEAD else "retried"] += 1
+            else:
+                done.append(event.pk)
+        OutboxEvent.objects.filter(pk__in=done).delete()
+        OutboxEvent.objects.bulk_update(
+            failed, ["status", "attempts", "available_at", "last_error"]
+        )
+        result["done"] = len(done)
+    return result
+
+
+def _schedule_retry(event, exc):
+    event.attempts += 1
+    event.last_error = f"{type(exc).__name__}: {exc}"[:2000]
+    if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        event.status = OutboxEvent.Status.DEAD
+        return
+    # 2, 4, 8 … секунд, не дольше OUTBOX_MAX_RETRY_DELAY
+    delay = min(2 ** event.attempts, settings.OUTBOX_MAX_RETRY_DELAY)
+    event.available_at = timezone.now() + timedelta(seconds=delay)
+
+
+def requeue_dead(topic: str | None = None) -> int:
+    """Возвращает dead-события в очередь (после исправления причины)."""
+    dead = OutboxEvent.objects.filter(status=OutboxEvent.Status.DEAD)
+    if topic:
+        dead = dead.filter(topic=topic)
+    return dead.update(
+        status=OutboxEvent.Status.PENDING, attempts=0, available_at=timezone.now()
+    )
@@ -0,0 +1,188 @@
+"""
+«Что приготовить»: рецепты по набору ингредиентов, которые есть у пользователя.
+
+SQL по RecipeIngredient (GROUP BY рецепт, COUNT совпавших) на каждый
+запрос читает все строки популярных ингредиентов. Вместо этого каждый
+воркер держит в памяти инвертированный индекс:
+
+* ids / sizes — id рецептов по возрастанию и число их ингредиентов;
+* postings[ingredient_id] — позиции рецептов с этим ингредиентом (int32);
+* indptr / indices — обратное отображение (CSR), чтобы назвать недостающее.
+
+Запрос: склеиваем posting-и ингредиентов из кладовой и считаем совпадения
+одним np.bincount; недостаёт = sizes − совпало. Сначала готовые целиком,
+потом с 1–2 недостающими.
+
+Индекс дообновляется по журналу RecipeChange (пишется вместе с документом
+рецепта и при удалении): раз в PANTRY_INDEX_POLL_SECONDS воркер читает новые
+записи и перечитывает состав только этих рецептов в «оверлей» поверх базы.
+Оверлей больше OVERLAY_LIMIT или база старше PANTRY_INDEX_MAX_AGE — полная
+перестройка. Памяти — порядка 8 байт на строку RecipeIngredient на воркер.
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from utils.tracing import span
+from .models import RecipeChange, RecipeIngredient
+
+OVERLAY_LIMIT = 5000
+# транзакции коммитятся не по порядку id: последние секунды журнала перечитываем
+LOOKBACK = timedelta(seconds=30)
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    ids: np.ndarray                         # id рецептов, по возрастанию
+    sizes: np.ndarray                       # число ингредиентов рецепта
+    indptr: np.ndarray
+    indices: np.ndarray
+    postings: dict                          # ingredient_id → позиции рецептов
+    last_change: int                        # последний учтённый RecipeChange.id
+    built_at: float
+    # рецепт → актуальный состав (пустой — удалён) для изменённых после сборки
+    overlay: dict = field(default_factory=dict)
+
+
+class PantryIndex:
+    """Инвертированный индекс ингредиент → рецепты; один на процесс."""
+
+    def __init__(self):
+        self._snapshot: _Snapshot | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    # ---------- обновление ----------
+    def snapshot(self) -> _Snapshot:
+        now = time.monotonic()
+        snapshot = self._snapshot
+        if snapshot is not None and now - self._checked_at < settings.PANTRY_INDEX_POLL_SECONDS:
+            return snapshot
+        with self._lock:
+            if self._snapshot is snapshot:          # другой поток не успел обновить
+                self._snapshot = self._refresh(snapshot, now)
+                self._checked_at = now
+            return self._snapshot
+
+    def _refresh(self, snapshot, now) -> _Snapshot:
+        if snapshot is None or now - snapshot.built_at > settings.PANTRY_INDEX_MAX_AGE:
+            return self._build(now)
+
+        changes = list(
+            RecipeChange.objects
+            .filter(
+                Q(pk__gt=snapshot.last_change)
+                | Q(created_at__gte=timezone.now() - LOOKBACK)
+            )
+            .order_by("pk")
+            .values_list("pk", "recipe_id")[:OVERLAY_LIMIT + 1]
+        )
+        if not changes:
+            return snapshot
+        recipe_ids = {recipe_id for _, recipe_id in changes}
+        if len(changes) > OVERLAY_LIMIT or len(snapshot.overlay) + len(recipe_ids) > OVERLAY_LIMIT:
+            return self._build(now)
+
+        with span("pantry.refresh", recipes=len(recipe_ids)):
+            overlay = dict(snapshot.overlay)
+            overlay.update({pk: frozenset() for pk in recipe_ids})
+            for recipe_id, ingredient_id in (
+                RecipeIngredient.objects
+                .filter(recipe_id__in=recipe_ids)
+                .values_list("recipe_id", "ingredient_id")
+            ):
+                overlay[recipe_id] = overlay[recipe_id] | {ingredient_id}
+        return _Snapshot(
+            snapshot.ids, snapshot.sizes, snapshot.indptr, snapshot.indices,
+            snapshot.postings,
+            last_change=max(snapshot.last_change, changes[-1][0]),
+            built_at=snapshot.built_at,
+            overlay=overlay,
+        )
+
+    @staticmethod
+    def _build(now) -> _Snapshot:
+        with span("pantry.build"):
+            # отметка журнала — до чтения: изменения во время сборки дочитаем
+            last_change = RecipeChange.objects.aggregate(last=Max("pk"))["last"] or 0
+            pairs = np.array(
+                RecipeIngredient.objects
+                .order_by("recipe_id", "ingredient_id")
+                .values_list("recipe_id", "ingredient_id"),
+                dtype=np.int64,
+            ).reshape(-1, 2)
+            recipe_col, ingredients = pairs[:, 0], pairs[:, 1]
+
+            ids, starts, sizes = np.unique(recipe_col, return_index=True, return_counts=True)
+            indptr = np.append(starts, len(recipe_col)).astype(np.int64)
+            positions = np.repeat(np.arange(len(ids), dtype=np.int32), sizes)
+
+            # posting-и: позиции рецептов, сгруппированные по ингредиенту
+            order = np.argsort(ingredients, kind="stable")
+            by_ingredient = ingredients[order]
+            keys, key_starts = np.unique(by_ingredient, return_index=True)
+            postings = dict(zip(keys.tolist(), np.split(positions[order], key_starts[1:])))
+
+            return _Snapshot(
+                ids, sizes, indptr, ingredients.astype(np.int32),
+                postings, last_change=last_change, built_at=now,
+            )
+
+    # ---------- поиск ----------
+    def search(self, pantry, max_missing: int, offset: int, limit: int):
+        """
+        (всего подходящих, [(id рецепта, id недостающих ингредиентов)] для
+        среза offset:offset+limit). Порядок: меньше недостающих, больше
+        совпавших, новее (больший id).
+        """
+        snapshot = self.snapshot()
+        pantry = set(pantry)
+        with span("pantry.search", ingredients=len(pantry)):
+            lists = [snapshot.postings[i] for i in pantry if i in snapshot.postings]
+            hits = np.concatenate(lists) if lists else np.empty(0, dtype=np.int32)
+            covered = np.bincount(hits, minlength=len(snapshot.ids))
+            missing = snapshot.sizes - covered
+            matched = (covered > 0) & (missing <= max_missing)
+            if snapshot.overlay:
+                # устаревшие строки базы — их заменяет оверлей
+                stale = np.isin(snapshot.ids, np.fromiter(snapshot.overlay, dtype=np.int64))
+                matched &= ~stale
+            positions = np.flatnonzero(matched)
+
+            # оверлей — в хвост массивов с позицией -1 (состав берём из него)
+            extra = []
+            for recipe_id, ingredients in snapshot.overlay.items():
+                have = len(ingredients & pantry)
+                if have and len(ingredients) - have <= max_missing:
+                    extra.append((recipe_id, len(ingredients) - have, have))
+            extra = np.array(extra, dtype=np.int64).reshape(-1, 3)
+            ids = np.concatenate([snapshot.ids[positions], extra[:, 0]])
+            lack = np.concatenate([missing[positions], extra[:, 1]])
+            have = np.concatenate([covered[positions], extra[:, 2]])
+            source = np.concatenate([positions, np.full(len(extra), -1)])
+
+            order = np.lexsort((-ids, -have, lack))[offset:offset + limit]
+            page = [
+                (int(ids[i]), self._lacking(snapshot, int(ids[i]), int(source[i]), pantry)
+                 if lack[i] else [])
+                for i in order
+            ]
+        return len(ids), page
+
+    @staticmethod
+    def _lacking(snapshot, recipe_id, position, pantry) -> list[int]:
+        if position < 0:
+            ingredients = snapshot.overlay[recipe_id]
+        else:
+            start, end = snapshot.indptr[position], snapshot.indptr[position + 1]
+            ingredients = snapshot.indices[start:end].tolist()
+        return sorted(i for i in ingredients if i not in pantry)
+
+
+pantry_index = PantryIndex()
@@ -0,0 +1,129 @@
+"""
+Топ рецептов по добавлениям в избранное и корзину:
+GET /api/recipes/popular/?window=day|week|all.
+
+Считать Favorite / ShoppingCart на каждый запрос — полный проход по
+большим таблицам. Вместо этого `manage.py refresh_popular_recipes` (по
+расписанию) делает две вещи:
+
+1. пересчитывает почасовые сводки RecipeActivity за последние часы —
+   обычные SELECT-ы по индексу created_at, без блокировок, так что
+   _handle_add_remove пишет не дожидаясь их;
+2. пересобирает из сводок готовые топы PopularRecipe для всех окон
+   (замена в одной транзакции: читатели видят либо старый топ, либо новый).
+
+Запрос читает только PopularRecipe, а сам топ ещё и кешируется в процессе
+на POPULAR_CACHE_SECONDS. Удаление из избранного попадает в сводку, только
+пока его час пересчитывается (--lookback-hours); старые часы выравнивает
+`refresh_popular_recipes --full`.
+
+Избранное и корзина, добавленные до появления created_at, помечены
+HISTORY_SENTINEL (миграция 0009): их сводка — час 1970-01-01, она входит
+только в окно «всё время» и пересчитывается только с --full.
+"""
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .models import Favorite, PopularRecipe, RecipeActivity, ShoppingCart
+
+HISTORY_SENTINEL = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+WINDOWS = {
+    PopularRecipe.Window.DAY:  timedelta(days=1),
+    PopularRecipe.Window.WEEK: timedelta(days=7),
+    PopularRecipe.Window.ALL:  None,
+}
+
+
+# ---------- пересчёт (команда по расписанию) ----------
+def refresh_activity(since=None) -> int:
+    """Пересчитывает сводки с часа, в который попадает since (None — все)."""
+    if since is not None:
+        since = since.replace(minute=0, second=0, microsecond=0)
+
+    counts = defaultdict(lambda: [0, 0])
+    for column, model in enumerate((Favorite, ShoppingCart)):
+        rows = model.objects.all()
+        if since is not None:
+            rows = rows.filter(created_at__gte=since)
+        for recipe_id, hour, added in (
+            rows.annotate(hour=TruncHour("created_at"))
+            .values("recipe_id", "hour")
+            .annotate(added=Count("id"))
+            .values_list("recipe_id", "hour", "added")
+        ):
+            counts[recipe_id, hour][column] = added
+
+    with transaction.atomic():
+        stale = RecipeActivity.objects.all()
+        if since is not None:
+            stale = stale.filter(hour__gte=since)
+        stale.delete()
+        RecipeActivity.objects.bulk_create(
+            [
+                RecipeActivity(recipe_id=recipe_id, hour=hour,
+                               favorites=favorites, cart_adds=cart_adds)
+                for (recipe_id, hour), (favorites, cart_adds) in counts.items()
+            ],
+            batch_size=1000,
+        )
+    return len(counts)
+
+
+def rebuild_leaderboards(size: int):
+    now = timezone.now()
+    entries = []
+    for window, span in WINDOWS.items():
+        activity = RecipeActivity.objects.all()
+        if span is not None:
+            activity = activity.filter(hour__gte=now - span)
+        top = (
+            activity.values("recipe_id")
+            .annotate(score=Sum(F("favorites") + F("cart_adds")))
+            .order_by("-score", "-recipe_id")
+            .values_list("recipe_id", "score")[:size]
+        )
+        entries += [
+            PopularRecipe(window=window, rank=rank, recipe_id=recipe_id, score=score)
+            for rank, (recipe_id, score) in enumerate(top, start=1)
+        ]
+    with transaction.atomic():
+        PopularRecipe.objects.all().delete()
+        PopularRecipe.objects.bulk_create(entries)
+
+
+# ---------- чтение ----------
+class LeaderboardCache:
+    """window → [(recipe_id, score)] с TTL; общий на процесс."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, window: str) -> list[tuple[int, int]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(window)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+
+        top = list(
+            PopularRecipe.objects.filter(window=window)
+            .order_by("rank")
+            .values_list("recipe_id", "score")
+        )
+        with self._lock:
+            self._data[window] = (top, now + self.ttl)
+        return top
+
+
+leaderboards = LeaderboardCache(ttl=settings.POPULAR_CACHE_SECONDS)
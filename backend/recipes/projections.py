@@ -0,0 +1,170 @@
+"""
+Быстрый read-only путь для list/retrieve рецептов.
+
+RecipeReadProjection отдаёт тот же JSON, что RecipeReadSerializer, но без
+моделей и объектов-полей DRF: рецепт читается одной строкой .values()
+вместе с денормализованным документом (автор + ингредиенты, см.
+recipes/documents.py), сверху дописываются флаги текущего пользователя.
+Порядок ключей и типы значений повторяют сериализатор один в один —
+при изменении RecipeReadSerializer (или UserShortSerializer /
+IngredientInRecipeSerializer) правим и здесь.
+
+Поддерживает разреженные наборы полей (utils/fieldsets.py): чего нет в
+`fields`, того нет ни в ответе, ни в SELECT — документ, описание и
+подписки читаются, только если они нужны.
+"""
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+
+from users.models import Subscription, User
+from utils.tracing import span
+from .documents import build_documents
+from .models import Recipe
+
+# поля ответа в порядке RecipeReadSerializer
+RECIPE_FIELDS = (
+    "id", "author", "ingredients", "is_favorited", "is_in_shopping_cart",
+    "name", "image", "text", "cooking_time",
+)
+FLAG_VALUES = ("is_favorited", "is_in_shopping_cart")
+# поле ответа → колонка, из которой оно берётся
+COLUMNS = {
+    "author": "document", "ingredients": "document",
+    "name": "title", "image": "image", "text": "description",
+    "cooking_time": "cooking_time",
+}
+
+
+class RecipeReadProjection:
+    """Сериализует рецепты в формате RecipeReadSerializer без моделей."""
+
+    image_storage  = Recipe._meta.get_field("image").storage
+    avatar_storage = User._meta.get_field("avatar").storage
+
+    def __init__(self, request, fields=RECIPE_FIELDS):
+        self.request = request
+        self.user = request.user
+        self.fields = frozenset(fields)
+
+    # ---------- выборка ----------
+    def rows(self, queryset):
+        """
+        QS словарей для пагинатора. Ожидает QS из RecipeViewSet.get_queryset:
+        флаги is_favorited / is_in_shopping_cart там уже аннотированы
+        (для авторизованного пользователя и только запрошенные).
+        """
+        # id нужен всегда: по нему достраивается недостающий документ
+        columns = ["id"]
+        for name, column in COLUMNS.items():
+            if name in self.fields and column not in columns:
+                columns.append(column)
+        if self.user.is_authenticated:
+            columns += [flag for flag in FLAG_VALUES if flag in self.fields]
+        # prefetch не совместим с .values(), а связанное лежит в документе
+        return queryset.prefetch_related(None).values(*columns)
+
+    # ---------- представление ----------
+    def render(self, rows) -> list[dict]:
+        rows = list(rows)
+        with span("serialize.RecipeReadProjection", count=len(rows)):
+            # документ ещё не собран (например, сразу после миграции) —
+            # собираем на лету, без записи
+            missing = self._missing_documents(rows)
+            if missing:
+                self._fill_documents(rows, build_documents(missing))
+            following = (
+                self._following_ids() if "author" in self.fields else set()
+            )
+            return [self._recipe(row, following) for row in rows]
+
+    async def arender(self, rows) -> list[dict]:
+        """render() для async-вьюх: запросы — через async ORM."""
+        with span("serialize.RecipeReadProjection", count=len(rows)):
+            missing = self._missing_documents(rows)
+            if missing:
+                self._fill_documents(rows, await sync_to_async(build_documents)(missing))
+            following = (
+                await self._afollowing_ids() if "author" in self.fields else set()
+            )
+            return [self._recipe(row, following) for row in rows]
+
+    @staticmethod
+    def _missing_documents(rows) -> list[int]:
+        return [
+            row["id"] for row in rows
+            if "document" in row and not row["document"]
+        ]
+
+    @staticmethod
+    def _fill_documents(rows, built):
+        for row in rows:
+            if "document" in row:
+                row["document"] = row["document"] or built.get(row["id"])
+
+    def _recipe(self, row, following) -> dict:
+        # ключи добавляются в порядке RECIPE_FIELDS
+        fields, data = self.fields, {}
+        if "id" in fields:
+            data["id"] = row["id"]
+        if "author" in fields:
+            author = row["document"]["author"]
+            data["author"] = {
+                "id": author["id"],
+                "username": author["username"],
+                "email": author["email"],
+                "avatar": self._url(self.avatar_storage, author["avatar"]),
+                "first_name": author["first_name"],
+                "last_name": author["last_name"],
+                "is_subscribed": author["id"] in following,
+            }
+        if "ingredients" in fields:
+            data["ingredients"] = [
+                {
+                    "id": item["id"],
+                    "name": item["name"],
+                    "measurement_unit": item["measurement_unit"],
+                    "amount": int(Decimal(item["amount"])),   # IntegerField
+                }
+                for item in row["document"]["ingredients"]
+            ]
+        for flag in FLAG_VALUES:
+            if flag in fields:
+                data[flag] = row.get(flag, False)
+        if "name" in fields:
+            data["name"] = row["title"]
+        if "image" in fields:
+            data["image"] = self._url(self.image_storage, row["image"])
+        if "text" in fields:
+            data["text"] = row["description"]
+        if "cooking_time" in fields:
+            data["cooking_time"] = row["cooking_time"]
+        return data
+
+    def _following_ids(self) -> set[int]:
+        """Как SubscriptionMixin: на себя «подписки» не бывает."""
+        if not self.user.is_authenticated:
+            return set()
+        ids = set(self._following_query())
+        ids.discard(self.user.pk)
+        return ids
+
+    async def _afollowing_ids(self) -> set[int]:
+        if not self.user.is_authenticated:
+            return set()
+        ids = {pk async for pk in self._following_query()}
+        ids.discard(self.user.pk)
+        return ids
+
+    def _following_query(self):
+        return (
+            Subscription.objects
+            .filter(follower=self.user)
+            .values_list("author_id", flat=True)
+        )
+
+    def _url(self, storage, name):
+        """Как ImageField.to_representation: абсолютный URL или None."""
+        if not name:
+            return None
+        return self.request.build_absolute_uri(storage.url(name))
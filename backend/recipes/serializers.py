@@ -1,7 +1,10 @@
+from django.db import transaction
 from rest_framework import serializers
 
+from .documents import deferred_rebuild
 from .models import Recipe, Ingredient, RecipeIngredient
 from utils.fields import Base64ImageField
+from utils.mixins import TracedRepresentationMixin
 from users.serializers import UserShortSerializer
 
 class IngredientAmountSerializer(serializers.Serializer):
@@ -38,7 +41,7 @@ class RecipeMinified(serializers.ModelSerializer):
         fields = ("id", "name", "image", "cooking_time")   # только 4 поля
         read_only_fields = fields
 
-class RecipeReadSerializer(serializers.ModelSerializer):
+class RecipeReadSerializer(TracedRepresentationMixin, serializers.ModelSerializer):
 
     author = UserShortSerializer(read_only=True)
 
@@ -67,11 +70,16 @@ class RecipeReadSerializer(serializers.ModelSerializer):
         return manager.filter(user=user).exists()
 
     def get_is_favorited(self, obj) -> bool:
+        # флаг уже посчитан подзапросом в RecipeViewSet.get_queryset
+        if hasattr(obj, "is_favorited"):
+            return obj.is_favorited
         user = self.context["request"].user
         # obj.favorited_by — related_name модели Favorite
         return self._exists_for_user(user, obj.favorited_by)
 
     def get_is_in_shopping_cart(self, obj) -> bool:
+        if hasattr(obj, "is_in_shopping_cart"):
+            return obj.is_in_shopping_cart
         user = self.context["request"].user
         # obj.in_shopping_carts — related_name модели ShoppingCart
         return self._exists_for_user(user, obj.in_shopping_carts)
@@ -131,20 +139,23 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
             seen.add(ing)
         return value
 
+    @transaction.atomic
     def create(self, validated_data):
         ingredients_data = validated_data.pop("ingredients")
         user = self.context["request"].user
-        recipe = Recipe.objects.create(author=user, **validated_data)
-
-        bulk = [
-            RecipeIngredient(
-                recipe=recipe,
-                ingredient=item["id"],   # это уже экземпляр Ingredient
-                amount=item["amount"]
-            )
-            for item in ingredients_data
-        ]
-        RecipeIngredient.objects.bulk_create(bulk)
+        # документ рецепта соберётся один раз — после ингредиентов
+        with deferred_rebuild():
+            recipe = Recipe.objects.create(author=user, **validated_data)
+
+            bulk = [
+                RecipeIngredient(
+                    recipe=recipe,
+                    ingredient=item["id"],   # это уже экземпляр Ingredient
+                    amount=item["amount"]
+                )
+                for item in ingredients_data
+            ]
+            RecipeIngredient.objects.bulk_create(bulk)
         return recipe
 
     
@@ -162,24 +173,26 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         return attrs
     
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         ingredients_data = validated_data.pop("ingredients", None)
 
-        # Обновляем простые поля
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-
-        if ingredients_data is not None:
-            instance.recipe_ingredients.all().delete()
-            bulk = [
-                RecipeIngredient(
-                    recipe=instance,
-                    ingredient=item["id"],
-                    amount=item["amount"],
-                )
-                for item in ingredients_data
-            ]
-            RecipeIngredient.objects.bulk_create(bulk)
+        with deferred_rebuild():
+            # Обновляем простые поля
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
+
+            if ingredients_data is not None:
+                instance.recipe_ingredients.all().delete()
+                bulk = [
+                    RecipeIngredient(
+                        recipe=instance,
+                        ingredient=item["id"],
+                        amount=item["amount"],
+                    )
+                    for item in ingredients_data
+                ]
+                RecipeIngredient.objects.bulk_create(bulk)
 
         return instance
@@ -0,0 +1,111 @@
+"""
+Короткие ссылки на рецепты: GET /api/recipes/{id}/get-link/ → /s/<code>/.
+
+Код — id рецепта в base62 ("3d0" — рецепт 12 338), строка ShortLink
+создаётся при первом запросе ссылки. Редирект /s/<code>/ — обычная
+Django-вьюха без DRF: код ищется в LRU процесса, и на попадании ORM не
+трогается вовсе. Неизвестные коды тоже кешируются (ненадолго), чтобы
+перебор мусорных ссылок не превращался в запросы к БД.
+
+Запись LRU живёт SHORT_LINK_CACHE_TTL секунд: удаление рецепта сразу
+видно в обработавшем его процессе, в остальных — не позже чем через TTL.
+Сам редирект (302) не кешируется ни nginx, ни браузером.
+"""
+import string
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import Http404, HttpResponseRedirect
+
+from utils import metrics
+from .models import ShortLink
+
+ALPHABET = string.digits + string.ascii_lowercase + string.ascii_uppercase
+# через сколько секунд перепроверить код, которого не было в таблице
+MISSING_TTL = 30
+
+
+def encode(number: int) -> str:
+    if number == 0:
+        return ALPHABET[0]
+    code = []
+    while number:
+        number, rest = divmod(number, len(ALPHABET))
+        code.append(ALPHABET[rest])
+    return "".join(reversed(code))
+
+
+def link_for(recipe) -> str:
+    """Код короткой ссылки рецепта; создаёт строку при первом обращении."""
+    code = (
+        ShortLink.objects.filter(recipe=recipe)
+        .values_list("code", flat=True)
+        .first()
+    )
+    if code is not None:
+        return code
+    try:
+        with transaction.atomic():
+            return ShortLink.objects.create(recipe=recipe, code=encode(recipe.pk)).code
+    except IntegrityError:              # параллельный запрос успел первым
+        return ShortLink.objects.get(recipe=recipe).code
+
+
+class ShortLinkCache:
+    """LRU code → recipe_id (None — кода нет); общий на процесс."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, code: str) -> int | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(code)
+            if entry is not None and entry[1] > now:
+                self._data.move_to_end(code)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        recipe_id = (
+            ShortLink.objects.filter(code=code)
+            .values_list("recipe_id", flat=True)
+            .first()
+        )
+        with self._lock:
+            ttl = self.ttl if recipe_id is not None else MISSING_TTL
+            self._data[code] = (recipe_id, now + ttl)
+            self._data.move_to_end(code)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return recipe_id
+
+    def forget(self, code: str):
+        with self._lock:
+            self._data.pop(code, None)
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+short_links = ShortLinkCache(
+    maxsize=settings.SHORT_LINK_CACHE_SIZE, ttl=settings.SHORT_LINK_CACHE_TTL,
+)
+metrics.register("short_links", short_links.stats)
+
+
+def redirect(request, code):
+    """GET /s/<code>/ → страница рецепта во фронтенде."""
+    recipe_id = short_links.resolve(code)
+    if recipe_id is None:
+        raise Http404
+    response = HttpResponseRedirect(f"/recipes/{recipe_id}")
+    response["Cache-Control"] = "no-cache"
+    return response
@@ -0,0 +1,128 @@
+"""
+Поддержка производных данных в актуальном состоянии:
+Recipe.document (recipes/documents.py), ленты подписок (recipes/feed.py,
+через outbox — recipes/outbox.py),
+кеш коротких ссылок (recipes/shortlinks.py), теги общего кеша (utils/cache.py),
+снимок справочника ингредиентов (recipes/catalog.py).
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.models import Subscription
+from utils.cache import cache
+from . import catalog, feed, outbox  # noqa: F401 — feed: обработчики outbox
+from .documents import AUTHOR_FIELDS, rebuild_documents
+from .models import Ingredient, Recipe, RecipeChange, RecipeIngredient, ShortLink
+from .shortlinks import short_links
+
+
+def _touches(update_fields, fields) -> bool:
+    """save() без update_fields меняет всё; иначе — только перечисленное."""
+    return update_fields is None or bool(set(update_fields) & set(fields))
+
+
+def _cascades_from(origin, *models) -> bool:
+    """Удаление каскадом от удаления объекта (или QS) одной из моделей."""
+    if origin is None:
+        return False
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return issubclass(model, models)
+
+
+def _invalidate(*tags):
+    """
+    Сброс тегов кеша после коммита: до него параллельный запрос ещё
+    прочитал бы и закешировал старые данные уже под новым токеном.
+    """
+    if tags:
+        transaction.on_commit(lambda: cache.invalidate(*tags))
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, created, update_fields, **kwargs):
+    _invalidate(f"recipe:{instance.pk}")
+    # у рецепта в документе только автор
+    if _touches(update_fields, ("author", "author_id")):
+        rebuild_documents([instance.pk])
+    if created:
+        outbox.emit("feed.fan_out", recipe_id=instance.pk)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    _invalidate(f"recipe:{instance.pk}")
+    RecipeChange.objects.create(recipe_id=instance.pk)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def recipe_ingredient_changed(sender, instance, origin=None, **kwargs):
+    # каскад от удаления рецепта или его автора: post_delete приходит на
+    # каждую строку, пока рецепт ещё в базе, — но рецепт уходит целиком,
+    # пересобирать нечего, кеш и журнал сбросит recipe_deleted
+    if _cascades_from(origin, Recipe, get_user_model()):
+        return
+    _invalidate(f"recipe:{instance.recipe_id}")
+    rebuild_documents([instance.recipe_id])
+
+
+@receiver(post_save, sender=Ingredient)
+def ingredient_saved(sender, instance, created, update_fields, **kwargs):
+    _invalidate("ingredients")
+    catalog.schedule_publish()
+    if created or not _touches(update_fields, ("title", "measurement_unit")):
+        return
+    recipe_ids = list(
+        RecipeIngredient.objects
+        .filter(ingredient=instance)
+        .values_list("recipe_id", flat=True)
+    )
+    rebuild_documents(recipe_ids)
+    _invalidate(*(f"recipe:{pk}" for pk in recipe_ids))
+
+
+@receiver(post_delete, sender=Ingredient)
+def ingredient_deleted(sender, instance, **kwargs):
+    # рецепты с ним сбросит каскадное удаление RecipeIngredient
+    _invalidate("ingredients")
+    catalog.schedule_publish()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def author_saved(sender, instance, created, update_fields, **kwargs):
+    _invalidate(f"user:{instance.pk}")
+    # last_login, пароль, token_version и т.п. в документ не попадают
+    if created or not _touches(update_fields, AUTHOR_FIELDS):
+        return
+    recipe_ids = list(instance.recipes.values_list("id", flat=True))
+    rebuild_documents(recipe_ids)
+    _invalidate(*(f"recipe:{pk}" for pk in recipe_ids))
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_deleted(sender, instance, **kwargs):
+    # рецепты автора сбросит каскадное удаление Recipe
+    _invalidate(f"user:{instance.pk}")
+
+
+@receiver(post_save, sender=Subscription)
+def subscription_created(sender, instance, created, **kwargs):
+    if created:
+        outbox.emit("feed.backfill", follower_id=instance.follower_id,
+                    author_id=instance.author_id)
+
+
+@receiver(post_delete, sender=Subscription)
+def subscription_deleted(sender, instance, **kwargs):
+    outbox.emit("feed.drop", follower_id=instance.follower_id,
+                author_id=instance.author_id)
+
+
+@receiver(post_delete, sender=ShortLink)
+def short_link_deleted(sender, instance, **kwargs):
+    # только в этом процессе; в остальных запись истечёт через SHORT_LINK_CACHE_TTL
+    short_links.forget(instance.code)
@@ -0,0 +1,172 @@
+"""
+«Похожие рецепты»: ранжирование по коэффициенту Жаккара наборов ингредиентов.
+
+Считать Жаккара со всем каталогом на каждый запрос — O(N). Вместо этого
+у каждого рецепта есть MinHash-сигнатура из NUM_BANDS × ROWS_PER_BAND
+хешей, нарезанная на полосы (LSH). Полоса сворачивается в один bucket и
+хранится строкой RecipeSimilarityBand с индексом (band, bucket):
+
+* кандидаты — рецепты, совпавшие с исходным хотя бы в одной полосе;
+  число совпавших полос — оценка сходства, берём лучших MAX_CANDIDATES;
+* кандидаты переранжируются точным Жаккаром по RecipeIngredient.
+
+При 32 полосах по 2 хеша рецепт с J = 0.2 становится кандидатом с
+вероятностью ~0.73, с J = 0.3 — ~0.95. На синтетике в 1M рецептов
+(bench_similar_recipes) запрос укладывается в единицы миллисекунд.
+
+Сигнатуры считаются NumPy пачками (CSR: indptr + ингредиенты подряд).
+Индекс обновляется после пересборки документа рецепта (recipes/documents.py)
+событием outbox "similar.refresh" (recipes/outbox.py), вне запроса:
+переписываются только изменившиеся полосы. Полная перестройка —
+`manage.py rebuild_similarity_index`, замер на синтетике —
+`manage.py bench_similar_recipes`.
+"""
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Q
+
+from . import outbox
+from .models import RecipeIngredient, RecipeSimilarityBand
+
+NUM_BANDS      = 32
+ROWS_PER_BAND  = 2          # bucket = два 31-битных хеша в одном bigint
+NUM_HASHES     = NUM_BANDS * ROWS_PER_BAND
+MAX_CANDIDATES = 500
+
+PRIME = (1 << 31) - 1       # хеши h(x) = (a·x + b) mod p < 2**31
+
+# параметры хеш-функций фиксированы: смена — только с полной перестройкой
+_rng = np.random.default_rng(20240611)
+_A = _rng.integers(1, PRIME, NUM_HASHES, dtype=np.int64)
+_B = _rng.integers(0, PRIME, NUM_HASHES, dtype=np.int64)
+
+
+# ---------- сигнатуры ----------
+def minhash_signatures(indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """
+    MinHash-сигнатуры для пачки наборов в формате CSR: ингредиенты набора i —
+    indices[indptr[i]:indptr[i + 1]]. Возвращает (n, NUM_HASHES) int64;
+    у пустого набора все хеши равны PRIME.
+    """
+    n = len(indptr) - 1
+    signatures = np.full((n, NUM_HASHES), PRIME, dtype=np.int64)
+    if not len(indices):
+        return signatures
+    hashes = (np.asarray(indices, dtype=np.int64)[:, None] * _A + _B) % PRIME
+    non_empty = np.flatnonzero(np.diff(indptr) > 0)
+    # reduceat по началам непустых наборов: пустые дали бы чужой хеш
+    signatures[non_empty] = np.minimum.reduceat(hashes, indptr[non_empty], axis=0)
+    return signatures
+
+
+def band_buckets(signatures: np.ndarray) -> np.ndarray:
+    """(n, NUM_HASHES) → (n, NUM_BANDS) bucket-ов: пара хешей полосы в одном int64."""
+    bands = signatures.reshape(len(signatures), NUM_BANDS, ROWS_PER_BAND)
+    return (bands[:, :, 0] << 31) | bands[:, :, 1]
+
+
+def buckets_for_sets(sets) -> np.ndarray:
+    """Bucket-ы для списка наборов ингредиентов (итерируемых id)."""
+    sets = [sorted(s) for s in sets]
+    indptr = np.zeros(len(sets) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(s) for s in sets])
+    indices = np.fromiter((x for s in sets for x in s), dtype=np.int64, count=indptr[-1])
+    return band_buckets(minhash_signatures(indptr, indices))
+
+
+def jaccard(a: set, b: set) -> float:
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+
+# ---------- индекс в БД ----------
+def refresh_index(ingredient_sets: dict[int, list[int]], batch_size: int = 1000):
+    """
+    Обновляет полосы рецептов: recipe_id → id ингредиентов. Переписывает
+    только рецепты, у которых полосы изменились, так что пересборка
+    документа без смены ингредиентов (переименовали автора) индекс не трогает.
+    """
+    if not ingredient_sets:
+        return
+    recipe_ids = list(ingredient_sets)
+    buckets = buckets_for_sets(ingredient_sets[pk] for pk in recipe_ids)
+
+    wanted = {
+        # пустой набор не индексируем
+        pk: dict(enumerate(row)) if ingredient_sets[pk] else {}
+        for pk, row in zip(recipe_ids, buckets.tolist())
+    }
+    stored = {pk: {} for pk in recipe_ids}
+    for pk, band, bucket in (
+        RecipeSimilarityBand.objects
+        .filter(recipe_id__in=recipe_ids)
+        .values_list("recipe_id", "band", "bucket")
+    ):
+        stored[pk][band] = bucket
+
+    changed = [pk for pk in recipe_ids if wanted[pk] != stored[pk]]
+    if not changed:
+        return
+    with transaction.atomic():
+        RecipeSimilarityBand.objects.filter(recipe_id__in=changed).delete()
+        RecipeSimilarityBand.objects.bulk_create(
+            [
+                RecipeSimilarityBand(recipe_id=pk, band=band, bucket=bucket)
+                for pk in changed
+                for band, bucket in wanted[pk].items()
+            ],
+            batch_size=batch_size,
+        )
+
+
+@outbox.handler("similar.refresh")
+def refresh(recipe_ids):
+    """Полосы рецептов по их текущим ингредиентам (удалённые — без полос)."""
+    refresh_index(ingredient_sets(recipe_ids))
+
+
+def ingredient_sets(recipe_ids) -> dict[int, set[int]]:
+    sets = {pk: set() for pk in recipe_ids}
+    for recipe_id, ingredient_id in (
+        RecipeIngredient.objects
+        .filter(recipe_id__in=sets)
+        .values_list("recipe_id", "ingredient_id")
+    ):
+        sets[recipe_id].add(ingredient_id)
+    return sets
+
+
+def similar_recipes(recipe_id: int, limit: int) -> list[tuple[int, float]]:
+    """[(id рецепта, Жаккар)] по убыванию сходства; три запроса."""
+    bands = list(
+        RecipeSimilarityBand.objects
+        .filter(recipe_id=recipe_id)
+        .values_list("band", "bucket")
+    )
+    if not bands:
+        # ещё не проиндексирован — считаем сигнатуру на лету, без записи
+        own = ingredient_sets([recipe_id])[recipe_id]
+        if not own:
+            return []
+        bands = list(enumerate(buckets_for_sets([own])[0].tolist()))
+
+    match = Q()
+    for band, bucket in bands:
+        match |= Q(band=band, bucket=bucket)
+    candidates = list(
+        RecipeSimilarityBand.objects
+        .filter(match)
+        .exclude(recipe_id=recipe_id)
+        .values("recipe_id")
+        .annotate(shared=Count("id"))
+        .order_by("-shared", "recipe_id")
+        .values_list("recipe_id", flat=True)[:MAX_CANDIDATES]
+    )
+    if not candidates:
+        return []
+
+    sets = ingredient_sets([recipe_id, *candidates])
+    own = sets.pop(recipe_id)
+    scored = [(pk, jaccard(own, other)) for pk, other in sets.items()]
+    scored.sort(key=lambda item: (-item[1], item[0]))
+    return [item for item in scored if item[1] > 0][:limit]
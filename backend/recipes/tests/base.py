@@ -0,0 +1,57 @@
+"""Общие данные для тестов API: авторы, рецепты, избранное, подписки."""
+from rest_framework.test import APIClient
+
+from recipes.models import Favorite, Ingredient, Recipe, RecipeIngredient, ShoppingCart
+from users.models import Subscription, User
+from utils.tokens import issue_token
+
+
+class CatalogMixin:
+    """
+    setUpTestData: три автора по четыре рецепта, у каждого рецепта три
+    ингредиента; читатель (self.reader) держит часть рецептов в избранном
+    и корзине и подписан на двух авторов.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ingredients = [
+            Ingredient.objects.create(title=f"ингредиент {i}", measurement_unit="g")
+            for i in range(10)
+        ]
+        cls.authors = [
+            User.objects.create_user(
+                email=f"author{i}@example.com", username=f"author{i}",
+                password="pw12345!x", first_name="Имя", last_name="Фамилия",
+            )
+            for i in range(3)
+        ]
+        cls.reader = User.objects.create_user(
+            email="reader@example.com", username="reader",
+            password="pw12345!x", first_name="Имя", last_name="Фамилия",
+        )
+        cls.recipes = []
+        for i in range(12):
+            recipe = Recipe.objects.create(
+                author=cls.authors[i % 3], title=f"рецепт {i}",
+                description="текст", cooking_time=5 + i,
+            )
+            for j in range(3):
+                RecipeIngredient.objects.create(
+                    recipe=recipe, ingredient=cls.ingredients[(i + j) % 10],
+                    amount=f"{j + 1}.50",
+                )
+            cls.recipes.append(recipe)
+        for recipe in cls.recipes[:4]:
+            Favorite.objects.create(user=cls.reader, recipe=recipe)
+        for recipe in cls.recipes[2:6]:
+            ShoppingCart.objects.create(user=cls.reader, recipe=recipe)
+        Subscription.objects.create(follower=cls.reader, author=cls.authors[0])
+        Subscription.objects.create(follower=cls.reader, author=cls.authors[1])
+
+    def client_for(self, user=None) -> APIClient:
+        """Клиент с подписанным токеном пользователя; без user — анонимный."""
+        client = APIClient()
+        if user is not None:
+            client.credentials(HTTP_AUTHORIZATION=f"Token {issue_token(user)}")
+        return client
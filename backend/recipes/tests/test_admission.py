@@ -0,0 +1,103 @@
+"""Admission control (utils/admission.py): лимиты классов маршрутов и 503."""
+import asyncio
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from django.test.client import RequestFactory
+
+from utils import admission
+from utils.admission import RouteClass, get_route_class
+from .base import CatalogMixin
+
+
+class RouteClassTests(SimpleTestCase):
+
+    def test_queue_full_is_shed_immediately(self):
+        route = RouteClass("t", limit=1, queue=0, timeout=5)
+        self.assertTrue(route.acquire())
+        started = time.monotonic()
+        self.assertFalse(route.acquire())
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(route.stats()["shed_queue_full"], 1)
+
+    def test_wait_times_out(self):
+        route = RouteClass("t", limit=1, queue=1, timeout=0.05)
+        self.assertTrue(route.acquire())
+        self.assertFalse(route.acquire())
+        stats = route.stats()
+        self.assertEqual((stats["waited"], stats["shed_timeout"], stats["queued"]), (1, 1, 0))
+
+    def test_release_wakes_sync_waiter(self):
+        route = RouteClass("t", limit=1, queue=1, timeout=5)
+        self.assertTrue(route.acquire())
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(route.acquire()))
+        waiter.start()
+        while not route.queued:
+            time.sleep(0.001)
+        route.release()
+        waiter.join(5)
+        self.assertEqual(result, [True])
+        self.assertEqual(route.in_flight, 1)
+
+    def test_release_hands_slot_to_async_waiter(self):
+        route = RouteClass("t", limit=1, queue=1, timeout=5)
+
+        async def scenario():
+            self.assertTrue(await route.aacquire())
+            waiting = asyncio.create_task(route.aacquire())
+            while not route.queued:
+                await asyncio.sleep(0)
+            route.release()
+            return await waiting
+
+        self.assertTrue(asyncio.run(scenario()))
+        # слот передан напрямую — in_flight не опускался
+        self.assertEqual((route.in_flight, route.queued), (1, 0))
+
+    def test_async_wait_times_out(self):
+        route = RouteClass("t", limit=1, queue=1, timeout=0.05)
+
+        async def scenario():
+            await route.aacquire()
+            return await route.aacquire()
+
+        self.assertFalse(asyncio.run(scenario()))
+        self.assertEqual((route.in_flight, route.queued, route.stats()["shed_timeout"]), (1, 0, 1))
+
+
+class MiddlewareTests(CatalogMixin, TestCase):
+
+    def setUp(self):
+        self.heavy = RouteClass("heavy", limit=1, queue=0, retry_after=7)
+        patcher = mock.patch.dict(admission.route_classes, {"heavy": self.heavy})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_route_classes(self):
+        factory = RequestFactory()
+        for path, expected in (
+            ("/api/users/subscriptions/", "heavy"),
+            ("/api/recipes/download_shopping_cart/", "heavy"),
+            ("/api/recipes/", "default"),
+            ("/нет-такого/", "default"),
+        ):
+            with self.subTest(path=path):
+                self.assertEqual(get_route_class(factory.get(path)).name, expected)
+
+    def test_heavy_route_is_shed_with_retry_after(self):
+        client = self.client_for(self.reader)
+        self.assertTrue(self.heavy.acquire())              # слот занят «другим» запросом
+
+        response = client.get("/api/users/subscriptions/")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "7")
+        self.assertEqual(response["Cache-Control"], "no-store")
+        # другой класс не затронут
+        self.assertEqual(client.get("/api/recipes/").status_code, 200)
+
+        self.heavy.release()
+        self.assertEqual(client.get("/api/users/subscriptions/").status_code, 200)
+        self.assertEqual(self.heavy.in_flight, 0)
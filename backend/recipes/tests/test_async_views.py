@@ -0,0 +1,101 @@
+"""Async-обработчики (utils/asyncviews.py) отвечают так же, как sync-путь."""
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.test import AsyncClient, Client, RequestFactory, TestCase, override_settings
+
+from recipes.views import IngredientViewSet, RecipeViewSet
+from users.views import UserViewSet
+from utils.cache import cache
+from utils.tokens import issue_token
+from .base import CatalogMixin
+
+
+def _views(viewset, actions):
+    """(sync, async) варианты одного маршрута."""
+    with override_settings(ASYNC_VIEWS=False):
+        sync_view = viewset.as_view(actions)
+    with override_settings(ASYNC_VIEWS=True):
+        async_view = viewset.as_view(actions)
+    return sync_view, async_view
+
+
+class AsyncParityTests(CatalogMixin, TestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.headers = {
+            "anonymous": {},
+            "reader": {"HTTP_AUTHORIZATION": f"Token {issue_token(self.reader)}"},
+            "bad token": {"HTTP_AUTHORIZATION": "Token 1:forged"},
+        }
+
+    def _call(self, view, path, headers, **kwargs):
+        cache.clear_local()
+        cache.shared.clear()
+        request = self.factory.get(path, **headers)
+        if iscoroutinefunction(view):
+            view = async_to_sync(view)
+        response = view(request, **kwargs)
+        response.render()
+        return response
+
+    def assertParity(self, viewset, actions, paths, **kwargs):
+        sync_view, async_view = _views(viewset, actions)
+        self.assertFalse(iscoroutinefunction(sync_view))
+        self.assertTrue(iscoroutinefunction(async_view))
+        for path in paths:
+            for who, headers in self.headers.items():
+                with self.subTest(path=path, user=who):
+                    expected = self._call(sync_view, path, headers, **kwargs)
+                    actual = self._call(async_view, path, headers, **kwargs)
+                    self.assertEqual(actual.status_code, expected.status_code)
+                    self.assertEqual(actual.content, expected.content)
+                    self.assertEqual(actual.get("Content-Type"), expected.get("Content-Type"))
+
+    def test_recipe_list(self):
+        ids = ",".join(str(r.pk) for r in self.recipes[:3]) + ",999999"
+        self.assertParity(RecipeViewSet, {"get": "list"}, [
+            "/api/recipes/",
+            "/api/recipes/?limit=5&page=2",
+            "/api/recipes/?page=99",
+            f"/api/recipes/?author={self.authors[0].pk}",
+            "/api/recipes/?is_favorited=1&is_in_shopping_cart=1",
+            f"/api/recipes/?ids={ids}",
+            "/api/recipes/?fields=id,name,is_favorited",
+        ])
+
+    def test_recipe_retrieve(self):
+        for pk in (self.recipes[2].pk, 999999):
+            self.assertParity(RecipeViewSet, {"get": "retrieve"}, [
+                f"/api/recipes/{pk}/",
+                f"/api/recipes/{pk}/?omit=text",
+            ], pk=str(pk))
+
+    def test_ingredient_list(self):
+        self.assertParity(IngredientViewSet, {"get": "list"}, [
+            "/api/ingredients/",
+            "/api/ingredients/?name=ингредиент 1",
+        ])
+
+    def test_users_me(self):
+        self.assertParity(UserViewSet, {"get": "me"}, [
+            "/api/users/me/", "/api/users/me/?fields=id,email",
+        ])
+
+
+class AsgiClientTests(CatalogMixin, TestCase):
+    """Полный стек middleware: ASGI-ответ совпадает с WSGI-ответом."""
+
+    def setUp(self):
+        self.headers = {"Authorization": f"Token {issue_token(self.reader)}"}
+
+    def test_recipe_detail_and_list(self):
+        for path in (f"/api/recipes/{self.recipes[0].pk}/", "/api/recipes/?limit=3"):
+            with self.subTest(path=path):
+                cache.clear_local()
+                cache.shared.clear()
+                expected = Client().get(path, headers=self.headers)
+                cache.clear_local()
+                cache.shared.clear()
+                actual = async_to_sync(AsyncClient().get)(path, headers=self.headers)
+                self.assertEqual(actual.status_code, 200)
+                self.assertEqual(actual.content, expected.content)
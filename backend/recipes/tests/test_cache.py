@@ -0,0 +1,125 @@
+"""Двухуровневый кеш (utils/cache.py): теги и single-flight."""
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase
+
+from utils import cache as cache_module
+from utils.cache import MISSING, TieredCache, cache
+from .base import CatalogMixin
+
+
+class TieredCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        caches["default"].clear()
+        # два «воркера» над одним общим кешем
+        self.a = TieredCache(local_ttl=60)
+        self.b = TieredCache(local_ttl=0)
+
+    def test_local_then_shared_hits(self):
+        compute = mock.Mock(return_value={"x": 1})
+        self.assertEqual(self.a.get_or_set("k", compute, tags=["t"]), {"x": 1})
+        self.assertEqual(self.a.get_or_set("k", compute, tags=["t"]), {"x": 1})
+        self.assertEqual(self.b.get_or_set("k", compute, tags=["t"]), {"x": 1})
+        compute.assert_called_once()
+        self.assertEqual(self.a.stats()["local_hits"], 1)
+        self.assertEqual(self.b.stats()["shared_hits"], 1)
+
+    def test_invalidate_tag(self):
+        self.a.get_or_set("k1", lambda: 1, tags=["t", "u"])
+        self.a.get_or_set("k2", lambda: 2, tags=["u"])
+        self.a.get_or_set("k3", lambda: 3, tags=["v"])
+        self.b.invalidate("u")
+
+        # общий кеш и LRU инвалидировавшего процесса — сразу
+        self.assertIs(self.b.get("k1"), MISSING)
+        self.assertIs(self.b.get("k2"), MISSING)
+        self.assertEqual(self.b.get("k3"), 3)
+        self.assertEqual(self.b.stats()["stale"], 2)
+        # LRU другого процесса — до истечения local_ttl
+        self.assertEqual(self.a.get("k1"), 1)
+        self.a.clear_local()
+        self.assertIs(self.a.get("k1"), MISSING)
+        self.assertEqual(self.a.get_or_set("k1", lambda: "new", tags=["t", "u"]), "new")
+
+    def test_invalidation_during_compute_is_not_lost(self):
+        def compute():
+            self.b.invalidate("t")      # запись изменилась, пока считали
+            return "old"
+
+        self.assertEqual(self.a.get_or_set("k", compute, tags=["t"]), "old")
+        self.assertIs(self.b.get("k"), MISSING)
+
+    def test_single_flight_in_process(self):
+        calls = []
+        started, release = threading.Event(), threading.Event()
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.a.get_or_set("k", compute)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        started.wait(5)
+        time.sleep(0.05)                # остальные дошли до замка ключа
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, ["value"] * 8)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.a.stats()["coalesced"], 7)
+        self.assertEqual(self.a._flights, {})
+
+    def test_failed_compute_lets_next_waiter_try(self):
+        with self.assertRaises(RuntimeError):
+            self.a.get_or_set("k", mock.Mock(side_effect=RuntimeError))
+        self.assertEqual(self.a.get_or_set("k", lambda: "ok"), "ok")
+        self.assertIsNone(caches["default"].get("lock:k"))
+
+    def test_waits_for_other_process(self):
+        caches["default"].add("lock:k", 1)      # считает другой воркер
+
+        def other_worker():
+            time.sleep(0.1)
+            self.b.shared.set("k", ("theirs", self.b._tag_tokens(["t"], create=True)))
+
+        threading.Thread(target=other_worker).start()
+        compute = mock.Mock(return_value="mine")
+        self.assertEqual(self.a.get_or_set("k", compute, tags=["t"]), "theirs")
+        compute.assert_not_called()
+
+    @mock.patch.object(cache_module, "FLIGHT_WAIT", 0.1)
+    def test_computes_itself_when_other_process_is_stuck(self):
+        caches["default"].add("lock:k", 1)
+        self.assertEqual(self.a.get_or_set("k", lambda: "mine"), "mine")
+
+
+class RecipeCacheInvalidationTests(CatalogMixin, TestCase):
+
+    def setUp(self):
+        cache.clear_local()
+        cache.shared.clear()
+
+    def test_ingredient_rename_reaches_cached_recipe(self):
+        recipe, ingredient = self.recipes[0], self.ingredients[0]
+        url = f"/api/recipes/{recipe.pk}/"
+        self.client.get(url)
+        with self.assertNumQueries(0):          # строка рецепта — из кеша
+            self.client.get(url)
+
+        ingredient.title = "переименован"
+        with self.captureOnCommitCallbacks(execute=True):
+            ingredient.save()
+
+        names = [item["name"] for item in self.client.get(url).json()["ingredients"]]
+        self.assertIn("переименован", names)
@@ -0,0 +1,61 @@
+"""Публикация снимка справочника (recipes/catalog.py) и его манифест."""
+import tempfile
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from recipes import catalog
+from recipes.models import Ingredient
+
+
+@mock.patch("recipes.catalog.publish")
+class SchedulePublishTests(TestCase):
+
+    def test_one_publish_per_transaction(self, publish):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                Ingredient.objects.create(title=f"ингредиент {i}", measurement_unit="g")
+        publish.assert_called_once()
+
+    def test_rolled_back_change_does_not_block_next_publish(self, publish):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Ingredient.objects.create(title="откат", measurement_unit="g")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        publish.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ingredient.objects.create(title="после отката", measurement_unit="g")
+        publish.assert_called_once()
+
+
+class SnapshotViewTests(TestCase):
+
+    def setUp(self):
+        override = override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+        override.enable()
+        self.addCleanup(override.disable)
+        Ingredient.objects.create(title="соль", measurement_unit="g")
+
+    @mock.patch("recipes.catalog.publish")
+    def test_missing_manifest_falls_back_to_list(self, publish):
+        response = self.client.get("/api/ingredients/snapshot/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            "version": None, "url": "http://testserver/api/ingredients/", "count": 1,
+        })
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        publish.assert_not_called()
+
+    def test_published_manifest(self):
+        current = catalog.publish()
+        response = self.client.get("/api/ingredients/snapshot/")
+        self.assertEqual(response.json(), {
+            "version": current["version"],
+            "url": f"http://testserver/media/catalog/{current['file']}",
+            "count": 1,
+        })
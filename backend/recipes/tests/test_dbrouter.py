@@ -0,0 +1,77 @@
+"""
+Чтения на реплику и read-your-writes (utils/dbrouter.py): default и
+реплика-зеркало "replica" из app/test_settings.py.
+"""
+import time
+from contextlib import contextmanager
+from unittest import mock
+
+from django.db import connections, router
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Recipe
+from utils.dbrouter import use_primary
+from .base import CatalogMixin
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], REPLICA_STICKY_SECONDS=5)
+class ReplicaRoutingTests(CatalogMixin, TransactionTestCase):
+    # зеркалу нужны закоммиченные данные — TestCase держал бы их в транзакции
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.setUpTestData()
+
+    @contextmanager
+    def capture(self):
+        with CaptureQueriesContext(connections["default"]) as primary, \
+                CaptureQueriesContext(connections["replica"]) as replica:
+            yield primary, replica
+
+    @staticmethod
+    def recipe_reads(queries):
+        return [q for q in queries if 'FROM "recipes_recipe"' in q["sql"]]
+
+    def assertReadsFrom(self, alias, client, url="/api/recipes/"):
+        with self.capture() as (primary, replica):
+            self.assertEqual(client.get(url).status_code, 200)
+        expected, other = (primary, replica) if alias == "default" else (replica, primary)
+        self.assertTrue(self.recipe_reads(expected.captured_queries), alias)
+        self.assertFalse(self.recipe_reads(other.captured_queries), alias)
+
+    def favorite(self, client, recipe):
+        response = client.post(f"/api/recipes/{recipe.pk}/favorite/")
+        self.assertEqual(response.status_code, 201)
+
+    def test_safe_reads_go_to_replica(self):
+        self.assertReadsFrom("replica", self.client_for())
+        self.assertReadsFrom("replica", self.client_for(self.reader))
+
+    def test_writes_go_to_primary(self):
+        with self.capture() as (primary, replica):
+            self.favorite(self.client_for(self.reader), self.recipes[8])
+        self.assertTrue(primary.captured_queries)
+        self.assertFalse(replica.captured_queries)
+
+    def test_use_primary(self):
+        self.assertEqual(router.db_for_read(Recipe), "replica")
+        with use_primary():
+            self.assertEqual(router.db_for_read(Recipe), "default")
+        self.assertEqual(router.db_for_read(Recipe), "replica")
+
+    def test_cookie_keeps_reads_on_primary(self):
+        client = self.client_for()
+        client.force_authenticate(self.reader)
+        self.favorite(client, self.recipes[8])
+        self.assertReadsFrom("default", client)
+        with mock.patch("time.time", return_value=time.time() + 6):
+            self.assertReadsFrom("replica", client)
+
+    def test_token_keeps_reads_on_primary_without_cookies(self):
+        self.favorite(self.client_for(self.reader), self.recipes[8])
+        # новый клиент — без cookie, тот же пользователь
+        self.assertReadsFrom("default", self.client_for(self.reader))
+        self.assertReadsFrom("replica", self.client_for(self.authors[0]))
+        with mock.patch("time.time", return_value=time.time() + 6):
+            self.assertReadsFrom("replica", self.client_for(self.reader))
@@ -0,0 +1,73 @@
+"""Лента подписок /api/recipes/feed/ (recipes/feed.py)."""
+from django.test import TestCase, override_settings
+
+from recipes import outbox
+from recipes.models import FeedEntry, FeedFanInAuthor, Recipe
+from .base import CatalogMixin
+
+
+class FeedTests(CatalogMixin, TestCase):
+
+    def setUp(self):
+        outbox.drain()                  # раскладка рецептов и дозаполнение подписок
+        self.client = self.client_for(self.reader)
+
+    def _expected(self):
+        return list(
+            Recipe.objects.filter(author__in=self.authors[:2])
+            .order_by("-created_at", "-id")
+            .values_list("id", flat=True)
+        )
+
+    def _read_all(self, limit):
+        ids, url, pages = [], f"/api/recipes/feed/?limit={limit}", 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertLessEqual(len(data["results"]), limit)
+            ids += [recipe["id"] for recipe in data["results"]]
+            url, pages = data["next"], pages + 1
+        return ids, pages
+
+    def test_keyset_pages(self):
+        ids, pages = self._read_all(limit=3)
+        self.assertEqual(ids, self._expected())
+        self.assertEqual(pages, 3)              # 8 рецептов по 3
+
+    def test_new_recipe_and_unsubscribe(self):
+        recipe = Recipe.objects.create(
+            author=self.authors[0], title="новый", description="текст", cooking_time=1,
+        )
+        outbox.drain()
+        self.assertEqual(self._read_all(limit=10)[0][0], recipe.pk)
+
+        self.client.delete(f"/api/users/{self.authors[0].pk}/subscribe/")
+        outbox.drain()
+        self.assertFalse(FeedEntry.objects.filter(user=self.reader, author=self.authors[0]).exists())
+        self.assertEqual(
+            self._read_all(limit=10)[0],
+            [pk for pk in self._expected() if pk not in {r.pk for r in self.authors[0].recipes.all()}],
+        )
+
+    @override_settings(FEED_FANOUT_MAX_FOLLOWERS=0)
+    def test_fan_in_author_is_merged(self):
+        # первый же рецепт переводит автора в fan-in: его строк в ленте больше нет
+        late = Recipe.objects.create(
+            author=self.authors[1], title="fan-in", description="текст", cooking_time=1,
+        )
+        outbox.drain()
+        self.assertTrue(FeedFanInAuthor.objects.filter(author=self.authors[1]).exists())
+        self.assertFalse(FeedEntry.objects.filter(recipe=late).exists())
+
+        expected = self._expected()
+        self.assertEqual(expected[0], late.pk)
+        for limit in (1, 2, 3, 10):
+            with self.subTest(limit=limit):
+                self.assertEqual(self._read_all(limit)[0], expected)
+
+    def test_bad_cursor(self):
+        self.assertEqual(self.client.get("/api/recipes/feed/?cursor=###").status_code, 400)
+
+    def test_anonymous(self):
+        self.assertEqual(self.client_for().get("/api/recipes/feed/").status_code, 401)
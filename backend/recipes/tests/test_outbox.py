@@ -0,0 +1,96 @@
+"""Outbox (recipes/outbox.py): выполнение, повторы, dead letter, inline."""
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from recipes import outbox
+from recipes.models import OutboxEvent
+
+calls = mock.Mock()
+
+
+@outbox.handler("test.call")
+def _call(**payload):
+    calls(**payload)
+
+
+@override_settings(OUTBOX_MAX_ATTEMPTS=3)
+class DrainTests(TestCase):
+
+    def setUp(self):
+        calls.reset_mock(side_effect=True)
+
+    def _make_available(self):
+        OutboxEvent.objects.update(available_at=timezone.now())
+
+    def test_done_event_is_deleted(self):
+        outbox.emit("test.call", value=1)
+        self.assertEqual(outbox.drain(), {"done": 1, "retried": 0, "dead": 0})
+        calls.assert_called_once_with(value=1)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_failed_event_is_retried_later(self):
+        calls.side_effect = RuntimeError("сбой")
+        outbox.emit("test.call", value=1)
+        with self.assertLogs("recipes.outbox", "ERROR"):
+            self.assertEqual(outbox.drain(), {"done": 0, "retried": 1, "dead": 0})
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.status, OutboxEvent.Status.PENDING)
+        self.assertEqual(event.attempts, 1)
+        self.assertEqual(event.last_error, "RuntimeError: сбой")
+        self.assertGreater(event.available_at, timezone.now())
+        # до available_at не берётся
+        self.assertEqual(outbox.drain(), {"done": 0, "retried": 0, "dead": 0})
+
+        calls.side_effect = None
+        self._make_available()
+        self.assertEqual(outbox.drain()["done"], 1)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_event_goes_dead_after_max_attempts(self):
+        calls.side_effect = RuntimeError("сбой")
+        outbox.emit("test.call", value=1)
+        results = []
+        for _ in range(3):
+            with self.assertLogs("recipes.outbox", "ERROR"):
+                results.append(outbox.drain())
+            self._make_available()
+        self.assertEqual([r["dead"] for r in results], [0, 0, 1])
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.status, OutboxEvent.Status.DEAD)
+        self.assertEqual(event.attempts, 3)
+        # dead не выполняется, пока не вернут в очередь
+        self.assertEqual(outbox.drain(), {"done": 0, "retried": 0, "dead": 0})
+
+        calls.side_effect = None
+        self.assertEqual(outbox.requeue_dead("test.call"), 1)
+        self.assertEqual(outbox.drain()["done"], 1)
+
+    def test_unknown_topic_is_rejected(self):
+        with self.assertRaises(LookupError):
+            outbox.emit("test.unknown")
+
+
+@override_settings(OUTBOX_INLINE=True, OUTBOX_MAX_ATTEMPTS=3)
+class InlineTests(TestCase):
+
+    def setUp(self):
+        calls.reset_mock(side_effect=True)
+
+    def test_runs_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            outbox.emit("test.call", value=1)
+            calls.assert_not_called()
+        calls.assert_called_once_with(value=1)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_failure_stays_queued_for_worker(self):
+        calls.side_effect = RuntimeError("сбой")
+        with self.assertLogs("recipes.outbox", "ERROR"):
+            with self.captureOnCommitCallbacks(execute=True):
+                outbox.emit("test.call", value=1)
+        event = OutboxEvent.objects.get()
+        self.assertEqual((event.status, event.attempts), (OutboxEvent.Status.PENDING, 1))
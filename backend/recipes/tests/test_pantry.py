@@ -0,0 +1,99 @@
+"""«Что приготовить» (recipes/pantry.py): индекс в памяти и его оверлей."""
+from django.test import TestCase, override_settings
+
+from recipes.models import RecipeIngredient
+from recipes.pantry import PantryIndex, pantry_index
+from .base import CatalogMixin
+
+
+def _brute_force(pantry, max_missing):
+    """То же по БД: [(id, недостающие)] в порядке поиска."""
+    sets = {}
+    for recipe_id, ingredient_id in RecipeIngredient.objects.values_list("recipe_id", "ingredient_id"):
+        sets.setdefault(recipe_id, set()).add(ingredient_id)
+    found = []
+    for recipe_id, ingredients in sets.items():
+        have = len(ingredients & pantry)
+        if have and len(ingredients) - have <= max_missing:
+            found.append((len(ingredients) - have, -have, -recipe_id, sorted(ingredients - pantry)))
+    return [(-neg_id, lacking) for _, _, neg_id, lacking in sorted(found)]
+
+
+@override_settings(PANTRY_INDEX_POLL_SECONDS=0)
+class PantryIndexTests(CatalogMixin, TestCase):
+
+    def setUp(self):
+        self.index = PantryIndex()
+        self.pantries = [
+            {i.pk for i in self.ingredients[:3]},
+            {i.pk for i in self.ingredients[2:7]},
+            {self.ingredients[9].pk},
+        ]
+
+    def _check(self):
+        for pantry in self.pantries:
+            for max_missing in (0, 1, 2):
+                with self.subTest(pantry=sorted(pantry), max_missing=max_missing):
+                    expected = _brute_force(pantry, max_missing)
+                    self.assertEqual(self.index.search(pantry, max_missing, 0, 100),
+                                     (len(expected), expected))
+
+    def test_matches_brute_force(self):
+        self._check()
+        # срез страницы
+        pantry = self.pantries[1]
+        expected = _brute_force(pantry, 2)
+        self.assertEqual(self.index.search(pantry, 2, 2, 3), (len(expected), expected[2:5]))
+
+    def test_overlay_after_recipe_change(self):
+        built = self.index.snapshot()
+        recipe, deleted = self.recipes[0], self.recipes[5].pk
+        # состав меняется через сигналы: документ и запись RecipeChange
+        RecipeIngredient.objects.filter(recipe=recipe, ingredient=self.ingredients[1]).delete()
+        RecipeIngredient.objects.create(recipe=recipe, ingredient=self.ingredients[7], amount="1")
+        self.recipes[5].delete()
+
+        self._check()
+        snapshot = self.index.snapshot()
+        self.assertEqual(snapshot.built_at, built.built_at)     # не перестраивали
+        self.assertEqual(
+            snapshot.overlay[recipe.pk],
+            {self.ingredients[0].pk, self.ingredients[2].pk, self.ingredients[7].pk},
+        )
+        self.assertEqual(snapshot.overlay[deleted], frozenset())
+
+    @override_settings(PANTRY_INDEX_MAX_AGE=-1)
+    def test_rebuild_when_old(self):
+        built = self.index.snapshot()
+        self.recipes[5].delete()
+        snapshot = self.index.snapshot()
+        self.assertNotEqual(snapshot.built_at, built.built_at)
+        self.assertEqual(snapshot.overlay, {})
+        self._check()
+
+
+class PantryViewTests(CatalogMixin, TestCase):
+
+    def setUp(self):
+        pantry_index._snapshot = None
+
+    def test_response(self):
+        pantry = [i.pk for i in self.ingredients[:3]]
+        response = self.client.get(
+            "/api/recipes/pantry/",
+            {"ingredients": ",".join(map(str, pantry)), "max_missing": 1, "limit": 2},
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        expected = _brute_force(set(pantry), 1)
+        self.assertEqual(data["count"], len(expected))
+        self.assertEqual(
+            [(item["id"], item["missing_ingredients"]) for item in data["results"]],
+            expected[:2],
+        )
+        self.assertIsNotNone(data["next"])
+
+    def test_validation(self):
+        for params in ({}, {"ingredients": "1", "max_missing": 9}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get("/api/recipes/pantry/", params).status_code, 400)
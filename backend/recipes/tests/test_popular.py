@@ -0,0 +1,73 @@
+"""Топы /api/recipes/popular/ (recipes/popular.py) по окнам."""
+import io
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from recipes.models import Favorite, ShoppingCart
+from recipes.popular import HISTORY_SENTINEL, leaderboards
+from .base import CatalogMixin
+
+
+class PopularTests(CatalogMixin, TestCase):
+
+    def setUp(self):
+        Favorite.objects.all().delete()
+        ShoppingCart.objects.all().delete()
+        now = timezone.now()
+        users = [*self.authors, self.reader]
+        self.r = r = self.recipes
+        self._add(Favorite, r[0], users[:2], now)
+        self._add(ShoppingCart, r[0], users[:1], now)
+        self._add(Favorite, r[1], users[:1], now)
+        self._add(Favorite, r[1], users[1:2], now - timedelta(days=3))
+        self._add(Favorite, r[2], users[:3], now - timedelta(days=10))
+        # добавлены до появления created_at (миграция 0009)
+        self._add(ShoppingCart, r[3], users, HISTORY_SENTINEL)
+
+    @staticmethod
+    def _add(model, recipe, users, created_at):
+        for user in users:
+            model.objects.create(user=user, recipe=recipe)
+        model.objects.filter(recipe=recipe, user__in=users).update(created_at=created_at)
+
+    def _refresh(self, *args):
+        call_command("refresh_popular_recipes", *args, stdout=io.StringIO())
+        leaderboards._data.clear()
+
+    def _top(self, window):
+        response = self.client.get("/api/recipes/popular/", {"window": window})
+        self.assertEqual(response.status_code, 200)
+        return [(item["id"], item["score"]) for item in response.json()["results"]]
+
+    def test_windows(self):
+        self._refresh("--full")
+        r = self.r
+        self.assertEqual(self._top("day"), [(r[0].pk, 3), (r[1].pk, 1)])
+        self.assertEqual(self._top("week"), [(r[0].pk, 3), (r[1].pk, 2)])
+        # равные очки — новее (больший id) выше
+        self.assertEqual(
+            self._top("all"),
+            [(r[3].pk, 4), (r[2].pk, 3), (r[0].pk, 3), (r[1].pk, 2)],
+        )
+
+    def test_incremental_refresh_keeps_old_hours(self):
+        self._refresh("--full")
+        r = self.r
+        Favorite.objects.filter(recipe=r[2]).delete()
+        Favorite.objects.create(user=self.reader, recipe=r[2])
+
+        self._refresh()
+        # последние часы пересчитаны, 10-дневные сводки и HISTORY_SENTINEL — нет
+        self.assertEqual(self._top("day"), [(r[0].pk, 3), (r[2].pk, 1), (r[1].pk, 1)])
+        self.assertIn((r[2].pk, 4), self._top("all"))
+        self.assertIn((r[3].pk, 4), self._top("all"))
+
+        self._refresh("--full")
+        self.assertIn((r[2].pk, 1), self._top("all"))
+        self.assertIn((r[3].pk, 4), self._top("all"))
+
+    def test_unknown_window(self):
+        self.assertEqual(self.client.get("/api/recipes/popular/?window=year").status_code, 400)
@@ -0,0 +1,68 @@
+"""
+Контракт RecipeReadProjection (recipes/projections.py): list и retrieve
+рецептов отдают те же байты, что RecipeReadSerializer с JSONRenderer.
+Проекция — ручная копия сериализатора; тест ловит их расхождение.
+"""
+from django.test import TestCase
+
+from recipes.models import Recipe
+from recipes.serializers import RecipeReadSerializer
+from utils.cache import cache
+from utils.renderers import JSONRenderer
+from .base import CatalogMixin
+
+
+class ProjectionParityTests(CatalogMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # картинка — только имя в storage: URL строится без файла
+        Recipe.objects.filter(pk=cls.recipes[0].pk).update(image="recipes/images/0.png")
+
+    def setUp(self):
+        cache.clear_local()
+        cache.shared.clear()
+
+    def serialized(self, response, recipes, many=False):
+        """Те же рецепты через сериализатор, в контексте того же запроса."""
+        return RecipeReadSerializer(
+            recipes, many=many, context={"request": response.wsgi_request}
+        ).data
+
+    def assertRetrieveMatches(self, client, recipe):
+        # первый запрос — промах кеша строки рецепта, второй — попадание
+        for attempt in ("miss", "hit"):
+            response = client.get(f"/api/recipes/{recipe.pk}/")
+            self.assertEqual(response.status_code, 200)
+            with self.subTest(recipe=recipe.pk, cache=attempt):
+                expected = self.serialized(response, Recipe.objects.get(pk=recipe.pk))
+                self.assertEqual(response.content, JSONRenderer().render(expected))
+
+    def assertListMatches(self, client):
+        response = client.get("/api/recipes/?limit=100")
+        self.assertEqual(response.status_code, 200)
+        ids = [item["id"] for item in response.data["results"]]
+        self.assertEqual(len(ids), len(self.recipes))
+        recipes = sorted(Recipe.objects.filter(pk__in=ids), key=lambda r: ids.index(r.pk))
+        expected = {**response.data, "results": self.serialized(response, recipes, many=True)}
+        self.assertEqual(response.content, JSONRenderer().render(expected))
+
+    def check(self, user):
+        client = self.client_for(user)
+        self.assertListMatches(client)
+        for recipe in self.recipes[:7]:
+            self.assertRetrieveMatches(client, recipe)
+
+    def test_anonymous(self):
+        self.check(None)
+
+    def test_reader_with_favorites_cart_and_subscriptions(self):
+        # recipes[:7]: в избранном и нет, в корзине и нет, авторы 0/1 — подписка, 2 — нет
+        self.check(self.reader)
+
+    def test_author_viewing_own_recipes(self):
+        self.check(self.authors[0])
+
+    def test_user_without_anything(self):
+        self.check(self.authors[2])
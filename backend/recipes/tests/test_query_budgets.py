@@ -0,0 +1,66 @@
+"""
+Бюджеты SQL-запросов (utils/querybudget.py) в режиме "raise": каждый
+размеченный action укладывается в свой @query_budget / query_budgets.
+"""
+from unittest import mock
+
+from django.test import TestCase
+
+from recipes.views import RecipeViewSet
+from utils.querybudget import QueryBudgetExceeded
+from .base import CatalogMixin
+
+
+class QueryBudgetTests(CatalogMixin, TestCase):
+
+    def public_urls(self):
+        recipe = self.recipes[0]
+        ingredient_ids = ",".join(str(i.pk) for i in self.ingredients[:5])
+        return [
+            "/api/recipes/",
+            f"/api/recipes/?author={self.authors[0].pk}",
+            f"/api/recipes/{recipe.pk}/",
+            f"/api/recipes/{recipe.pk}/similar/",
+            f"/api/recipes/pantry/?ingredients={ingredient_ids}",
+            "/api/recipes/popular/",
+            "/api/ingredients/",
+            "/api/ingredients/?name=ингредиент",
+            f"/api/ingredients/{self.ingredients[0].pk}/",
+            "/api/ingredients/snapshot/",
+            "/api/users/",
+            f"/api/users/{self.authors[0].pk}/",
+        ]
+
+    def private_urls(self):
+        return [
+            "/api/recipes/?is_favorited=1",
+            "/api/recipes/?is_in_shopping_cart=1",
+            "/api/recipes/feed/",
+            "/api/recipes/download_shopping_cart/",
+            "/api/users/me/",
+            "/api/users/subscriptions/",
+            "/api/users/subscriptions/?recipes_limit=2",
+        ]
+
+    def assertFitsBudget(self, client, url):
+        # сверх бюджета middleware бросает QueryBudgetExceeded
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        self.assertIn("X-Query-Count", response)
+
+    def test_anonymous(self):
+        client = self.client_for()
+        for url in self.public_urls():
+            with self.subTest(url=url):
+                self.assertFitsBudget(client, url)
+
+    def test_authenticated(self):
+        client = self.client_for(self.reader)
+        for url in self.public_urls() + self.private_urls():
+            with self.subTest(url=url):
+                self.assertFitsBudget(client, url)
+
+    def test_overrun_raises(self):
+        with mock.patch.dict(RecipeViewSet.query_budgets, {"list": 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client_for(self.reader).get("/api/recipes/")
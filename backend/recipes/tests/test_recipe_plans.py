@@ -0,0 +1,77 @@
+"""
+Планы запросов /api/recipes/ (RecipeViewSet.filter_by_params): фильтры
+избранного и корзины — полусоединения EXISTS, без дедупликации строк
+рецептов (DISTINCT), первая страница — из индекса по created_at.
+"""
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from recipes.models import Recipe
+from recipes.views import RecipeViewSet
+from .base import CatalogMixin
+
+PAGE_SIZE = 6
+
+# узлы плана, означающие дедупликацию строк
+DEDUPE_MARKERS = {
+    "postgresql": ("Unique", "HashAggregate", "GroupAggregate"),
+    "sqlite": ("FOR DISTINCT",),
+}
+
+
+class RecipePlanTests(CatalogMixin, TestCase):
+
+    def variants(self):
+        author = self.authors[0].pk
+        return (
+            {},
+            {"author": author},
+            {"is_favorited": "1"},
+            {"is_in_shopping_cart": "1"},
+            {"is_favorited": "1", "is_in_shopping_cart": "1"},
+            {"author": author, "is_favorited": "1", "is_in_shopping_cart": "1"},
+        )
+
+    def queryset(self, params):
+        qs = RecipeViewSet._with_user_flags(Recipe.objects.all(), self.reader)
+        return RecipeViewSet.filter_by_params(qs, params, self.reader)[:PAGE_SIZE]
+
+    def test_filters_are_semi_joins_without_dedupe(self):
+        markers = DEDUPE_MARKERS[connection.vendor]
+        for params in self.variants():
+            with self.subTest(**params):
+                qs = self.queryset(params)
+                sql = str(qs.query)
+                self.assertNotIn("DISTINCT", sql)
+                if "is_favorited" in params or "is_in_shopping_cart" in params:
+                    self.assertIn("EXISTS", sql)
+                plan = qs.explain()
+                for marker in markers:
+                    self.assertNotIn(marker, plan)
+
+    @skipUnless(connection.vendor == "postgresql", "Только для PostgreSQL.")
+    def test_postgres_plan_uses_indexes_and_semi_joins(self):
+        # в тестовой базе несколько строк: без этого планировщик выберет
+        # Seq Scan, и тест ничего не скажет об индексах
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+        for params, index in (
+            ({}, "recipe_created_idx"),
+            ({"author": self.authors[0].pk}, "recipe_author_created_idx"),
+        ):
+            with self.subTest(index=index):
+                self.assertIn(index, self.queryset(params).explain())
+
+        for params in self.variants():
+            if "is_favorited" not in params and "is_in_shopping_cart" not in params:
+                continue
+            with self.subTest(**params):
+                plan = self.queryset(params).explain(verbose=True)
+                # EXISTS развёрнут в полусоединение; по уникальному индексу
+                # (user, recipe) Postgres может свести его к Inner Unique join
+                self.assertTrue(
+                    "Semi Join" in plan or "Inner Unique: true" in plan, plan
+                )
@@ -0,0 +1,81 @@
+"""Начальные данные: import_ingredients и create_recipes пачками."""
+import io
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Ingredient, OutboxEvent, Recipe
+
+
+def _recipes(count: int) -> list:
+    return [
+        {
+            "title": f"рецепт {i}", "description": "текст", "cooking_time": 10,
+            "image": "users/recipes/x.png",
+            "ingredients": [
+                {"name": "соль", "measurement_unit": "g", "amount": 1},
+                {"name": f"ингредиент {i}", "measurement_unit": "g", "amount": 2},
+            ],
+        }
+        for i in range(count)
+    ]
+
+
+class CreateRecipesTests(TestCase):
+
+    def _run(self, data) -> int:
+        path = Path(tempfile.mkdtemp()) / "recipes.json"
+        path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        with CaptureQueriesContext(connection) as queries:
+            call_command("create_recipes", str(path), stdout=io.StringIO())
+        return len(queries)
+
+    def test_creates_recipes_with_documents(self):
+        Ingredient.objects.create(title="соль", measurement_unit="g")
+        self._run(_recipes(3))
+
+        self.assertEqual(Recipe.objects.count(), 3)
+        self.assertEqual(Ingredient.objects.filter(title="соль").count(), 1)
+        recipe = Recipe.objects.get(title="рецепт 1")
+        self.assertEqual(
+            [item["name"] for item in recipe.document["ingredients"]],
+            ["соль", "ингредиент 1"],
+        )
+        self.assertEqual(
+            OutboxEvent.objects.filter(topic="feed.fan_out").count(), 3
+        )
+
+    def test_query_count_does_not_grow_with_file(self):
+        self._run([])                      # автор-бот уже создан
+        small = self._run(_recipes(2))
+        Recipe.objects.all().delete()
+        # на рецепт — только его событие feed.fan_out в outbox
+        self.assertEqual(self._run(_recipes(20)), small + 18)
+
+    def test_existing_titles_are_skipped(self):
+        self._run(_recipes(2))
+        self._run(_recipes(3))
+        self.assertEqual(
+            sorted(Recipe.objects.values_list("title", flat=True)),
+            ["рецепт 0", "рецепт 1", "рецепт 2"],
+        )
+
+
+class ImportIngredientsTests(TestCase):
+
+    def test_skips_known_titles_case_insensitively(self):
+        Ingredient.objects.create(title="Соль", measurement_unit="g")
+        path = Path(tempfile.mkdtemp()) / "ingredients.csv"
+        path.write_text("соль,g\nсахар,g\nСахар,g\nмука,g\n", encoding="utf-8")
+        # SAVEPOINT, справочник, INSERT, RELEASE, снимок справочника
+        with self.assertNumQueries(5):
+            call_command("import_ingredients", path, stdout=io.StringIO())
+        self.assertEqual(
+            sorted(Ingredient.objects.values_list("title", flat=True)),
+            ["Соль", "мука", "сахар"],
+        )
@@ -0,0 +1,58 @@
+"""Короткие ссылки (recipes/shortlinks.py): выдача, редирект, удаление."""
+import time
+from unittest import mock
+
+from django.test import TestCase
+
+from recipes.models import ShortLink
+from recipes.shortlinks import encode, short_links
+from .base import CatalogMixin
+
+
+class ShortLinkTests(CatalogMixin, TestCase):
+
+    def setUp(self):
+        short_links._data.clear()
+        self.recipe = self.recipes[0]
+
+    def _code(self):
+        response = self.client_for().get(f"/api/recipes/{self.recipe.pk}/get-link/")
+        self.assertEqual(response.status_code, 200)
+        link = response.json()["short-link"]
+        self.assertTrue(link.startswith("http://testserver/s/"), link)
+        return link.rstrip("/").rsplit("/", 1)[1]
+
+    def test_round_trip(self):
+        code = self._code()
+        self.assertEqual(code, encode(self.recipe.pk))
+        self.assertEqual(self._code(), code)
+        self.assertEqual(ShortLink.objects.filter(recipe=self.recipe).count(), 1)
+
+        response = self.client.get(f"/s/{code}/")
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["Location"], f"/recipes/{self.recipe.pk}")
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        # повтор — из LRU процесса, без запросов к БД
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(f"/s/{code}").status_code, 302)
+
+    def test_unknown_code(self):
+        self.assertEqual(self.client.get("/s/zzzz/").status_code, 404)
+
+    def test_delete_in_this_process(self):
+        code = self._code()
+        self.client.get(f"/s/{code}/")
+        self.recipe.delete()
+        self.assertEqual(self.client.get(f"/s/{code}/").status_code, 404)
+
+    def test_delete_in_other_process_expires(self):
+        code = self._code()
+        self.client.get(f"/s/{code}/")
+        # другой воркер: сигнал удаления до его LRU не доходит
+        with mock.patch.object(short_links, "forget"):
+            self.recipe.delete()
+        self.assertEqual(self.client.get(f"/s/{code}/").status_code, 302)
+
+        later = time.monotonic() + short_links.ttl + 1
+        with mock.patch("recipes.shortlinks.time.monotonic", return_value=later):
+            self.assertEqual(self.client.get(f"/s/{code}/").status_code, 404)
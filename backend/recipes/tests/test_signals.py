@@ -0,0 +1,28 @@
+"""Пересборка документов рецептов (recipes/signals.py) при удалениях."""
+from unittest import mock
+
+from django.test import TestCase
+
+from recipes.models import Recipe
+from .base import CatalogMixin
+
+
+@mock.patch("recipes.signals.rebuild_documents")
+class CascadeDeleteTests(CatalogMixin, TestCase):
+
+    def test_recipe_delete_does_not_rebuild_its_document(self, rebuild):
+        response = self.client_for(self.authors[0]).delete(f"/api/recipes/{self.recipes[0].pk}/")
+        self.assertEqual(response.status_code, 204)
+        rebuild.assert_not_called()
+
+    def test_author_delete_does_not_rebuild_documents(self, rebuild):
+        self.authors[0].delete()
+        self.assertFalse(Recipe.objects.filter(author=self.authors[0].pk).exists())
+        rebuild.assert_not_called()
+
+    def test_ingredient_delete_rebuilds_recipes_that_stay(self, rebuild):
+        ingredient = self.ingredients[0]
+        using = set(Recipe.objects.filter(ingredients=ingredient).values_list("pk", flat=True))
+        ingredient.delete()
+        rebuilt = {pk for call in rebuild.call_args_list for pk in call.args[0]}
+        self.assertEqual(rebuilt, using)
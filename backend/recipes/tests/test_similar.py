@@ -0,0 +1,82 @@
+"""Похожие рецепты (recipes/similar.py): MinHash LSH против точного Жаккара."""
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from recipes import outbox
+from recipes.models import RecipeSimilarityBand
+from recipes.similar import (
+    NUM_BANDS, NUM_HASHES, PRIME, buckets_for_sets, ingredient_sets, jaccard,
+    minhash_signatures,
+)
+from .base import CatalogMixin
+
+
+def _signatures(sets):
+    indptr = np.zeros(len(sets) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(s) for s in sets])
+    indices = np.array([x for s in sets for x in sorted(s)], dtype=np.int64)
+    return minhash_signatures(indptr, indices)
+
+
+class MinHashTests(SimpleTestCase):
+
+    def test_agreement_estimates_jaccard(self):
+        rng = np.random.default_rng(1)
+        errors = []
+        for _ in range(300):
+            a = set(rng.choice(400, rng.integers(5, 30), replace=False).tolist())
+            b = set(rng.choice(400, rng.integers(5, 30), replace=False).tolist())
+            b |= set(list(a)[:rng.integers(0, len(a) + 1)])
+            sig = _signatures([a, b])
+            estimate = (sig[0] == sig[1]).sum() / NUM_HASHES
+            errors.append(abs(estimate - jaccard(a, b)))
+        # 64 хеша: стандартное отклонение оценки не больше 0.0625
+        self.assertLess(np.mean(errors), 0.06)
+        self.assertLess(max(errors), 0.3)
+
+    def test_edge_cases(self):
+        sig = _signatures([{1, 2, 3}, set(), {3, 2, 1}])
+        self.assertTrue((sig[1] == PRIME).all())
+        self.assertTrue((sig[0] == sig[2]).all())
+        buckets = buckets_for_sets([{1, 2, 3}, {3, 2, 1}, {7, 8, 9}])
+        self.assertEqual(buckets.shape, (3, NUM_BANDS))
+        self.assertTrue((buckets[0] == buckets[1]).all())
+        self.assertFalse((buckets[0] == buckets[2]).any())
+
+
+class SimilarViewTests(CatalogMixin, TestCase):
+
+    def setUp(self):
+        outbox.drain()                  # similar.refresh после сборки документов
+
+    def _similar(self, recipe):
+        response = self.client.get(f"/api/recipes/{recipe.pk}/similar/?limit=20")
+        self.assertEqual(response.status_code, 200)
+        return [(item["id"], item["similarity"]) for item in response.json()["results"]]
+
+    def _exact(self, recipe):
+        sets = ingredient_sets(r.pk for r in self.recipes)
+        own = sets.pop(recipe.pk)
+        return {pk: jaccard(own, other) for pk, other in sets.items()}
+
+    def test_scores_are_exact_and_close_recipes_found(self):
+        self.assertTrue(RecipeSimilarityBand.objects.exists())
+        for recipe in self.recipes:
+            with self.subTest(recipe=recipe.title):
+                exact = self._exact(recipe)
+                found = self._similar(recipe)
+                for pk, score in found:
+                    self.assertEqual(score, round(exact[pk], 4))
+                self.assertEqual(found, sorted(found, key=lambda item: (-item[1], item[0])))
+                # J ≥ 0.5: кандидат с вероятностью > 0.9999 — должен быть найден
+                close = {pk for pk, score in exact.items() if score >= 0.5}
+                self.assertLessEqual(close, {pk for pk, _ in found})
+
+    def test_unindexed_recipe_uses_signature_on_the_fly(self):
+        recipe = self.recipes[0]
+        indexed = self._similar(recipe)
+        RecipeSimilarityBand.objects.filter(recipe=recipe).delete()
+        self.assertEqual(self._similar(recipe), indexed)
+
+    def test_unknown_recipe(self):
+        self.assertEqual(self.client.get("/api/recipes/999999/similar/").status_code, 404)
@@ -0,0 +1,95 @@
+"""Дельта-синхронизация /api/sync/ (recipes/sync.py)."""
+import io
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from recipes import sync
+from recipes.models import Favorite, SyncChange, SyncState
+from .base import CatalogMixin
+
+
+class SyncTests(CatalogMixin, TestCase):
+
+    def setUp(self):
+        self.client = self.client_for(self.reader)
+
+    def _sync(self, since=None):
+        response = self.client.get("/api/sync/", {} if since is None else {"since": since})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "no-store")
+        return response.json()
+
+    def _ids(self, recipes):
+        return sorted(recipe.pk for recipe in recipes)
+
+    def test_without_since_returns_everything(self):
+        data = self._sync()
+        self.assertTrue(data["reset"])
+        self.assertEqual(sorted(data["favorites"]["inserted"]), self._ids(self.recipes[:4]))
+        self.assertEqual(sorted(data["shopping_cart"]["inserted"]), self._ids(self.recipes[2:6]))
+        self.assertEqual(
+            sorted(data["subscriptions"]["inserted"]),
+            sorted(author.pk for author in self.authors[:2]),
+        )
+
+    def test_delta_is_compacted(self):
+        version = self._sync()["version"]
+        added, removed, flapped = self.recipes[8], self.recipes[0], self.recipes[9]
+        self.client.post(f"/api/recipes/{added.pk}/favorite/")
+        self.client.delete(f"/api/recipes/{removed.pk}/favorite/")
+        # добавили и убрали после since — в ответе нет
+        self.client.post(f"/api/recipes/{flapped.pk}/shopping_cart/")
+        self.client.delete(f"/api/recipes/{flapped.pk}/shopping_cart/")
+        self.client.post(f"/api/users/{self.authors[2].pk}/subscribe/")
+
+        data = self._sync(version)
+        self.assertFalse(data["reset"])
+        self.assertFalse(data["has_more"])
+        self.assertEqual(data["version"], version + 5)
+        self.assertEqual(data["favorites"], {"inserted": [added.pk], "deleted": [removed.pk]})
+        self.assertEqual(data["shopping_cart"], {"inserted": [], "deleted": []})
+        self.assertEqual(data["subscriptions"], {"inserted": [self.authors[2].pk], "deleted": []})
+        # с новой версией — пусто
+        self.assertEqual(self._sync(data["version"])["favorites"], {"inserted": [], "deleted": []})
+
+    def test_versions_are_consecutive(self):
+        for recipe in self.recipes[6:9]:
+            self.client.post(f"/api/recipes/{recipe.pk}/favorite/")
+        self.assertEqual(
+            list(SyncChange.objects.filter(user=self.reader).values_list("version", flat=True)
+                 .order_by("version")),
+            [1, 2, 3],
+        )
+        self.assertEqual(SyncState.objects.get(user=self.reader).version, 3)
+
+    @override_settings(SYNC_PAGE_SIZE=2)
+    def test_has_more(self):
+        for recipe in self.recipes[6:9]:
+            sync.record(self.reader.pk, Favorite, recipe.pk)
+
+        first = self._sync(0)
+        self.assertTrue(first["has_more"])
+        self.assertEqual(first["version"], 2)
+        self.assertEqual(first["favorites"]["inserted"], self._ids(self.recipes[6:8]))
+
+        rest = self._sync(first["version"])
+        self.assertFalse(rest["has_more"])
+        self.assertEqual(rest["version"], 3)
+        self.assertEqual(rest["favorites"]["inserted"], [self.recipes[8].pk])
+
+    def test_reset_after_prune_or_from_future(self):
+        for recipe in self.recipes[6:8]:
+            sync.record(self.reader.pk, Favorite, recipe.pk)
+        self.assertFalse(self._sync(0)["reset"])
+        self.assertTrue(self._sync(3)["reset"])
+
+        call_command("prune_sync_changes", "--older-than", "0", stdout=io.StringIO())
+        self.assertEqual(SyncState.objects.get(user=self.reader).floor, 2)
+        self.assertFalse(SyncChange.objects.exists())
+        self.assertTrue(self._sync(1)["reset"])
+        self.assertFalse(self._sync(2)["reset"])
+
+    def test_invalid_since(self):
+        response = self.client.get("/api/sync/", {"since": "-1"})
+        self.assertEqual(response.status_code, 400)
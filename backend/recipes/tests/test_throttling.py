@@ -0,0 +1,112 @@
+"""Лимиты частоты (utils/throttling.py): GCRA-вёдра и заголовки ответа."""
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from utils import throttling
+from utils.throttling import PROBES, SharedBuckets, parse_rate
+from .base import CatalogMixin
+
+
+class SharedBucketsTests(SimpleTestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkstemp(prefix="throttle-")[1]
+        self.now = 1_000_000.0
+        patcher = mock.patch("utils.throttling.time.time", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("30/min"), (30, 60))
+        self.assertEqual(parse_rate("5/hour"), (5, 3600))
+
+    def test_burst_then_refill(self):
+        buckets = SharedBuckets(self.path, 64)
+        # ёмкость 3 за 60 с: жетон возвращается раз в 20 с
+        results = [buckets.take("k", 3, 60) for _ in range(3)]
+        self.assertEqual([r[:2] for r in results], [(True, 2), (True, 1), (True, 0)])
+        self.assertEqual([r[3] for r in results], [20, 40, 60])
+
+        allowed, remaining, wait, reset = buckets.take("k", 3, 60)
+        self.assertEqual((allowed, remaining, wait, reset), (False, 0, 20, 60))
+
+        self.now += 20
+        self.assertEqual(buckets.take("k", 3, 60)[:2], (True, 0))
+        self.now += 60
+        self.assertEqual(buckets.take("k", 3, 60)[:2], (True, 2))
+        self.assertEqual(buckets.stats()["throttled"], 1)
+
+    def test_keys_are_independent(self):
+        buckets = SharedBuckets(self.path, 64)
+        self.assertTrue(buckets.take("a", 1, 60)[0])
+        self.assertFalse(buckets.take("a", 1, 60)[0])
+        self.assertTrue(buckets.take("b", 1, 60)[0])
+
+    def test_shared_between_processes(self):
+        # две таблицы над одним файлом — как два воркера gunicorn
+        first, second = SharedBuckets(self.path, 64), SharedBuckets(self.path, 64)
+        self.assertTrue(first.take("k", 2, 60)[0])
+        self.assertEqual(second.take("k", 2, 60)[:2], (True, 0))
+        self.assertFalse(first.take("k", 2, 60)[0])
+
+    def test_full_window_evicts_oldest(self):
+        buckets = SharedBuckets(self.path, PROBES)
+        for n in range(PROBES):
+            self.now += 1
+            buckets.take(f"k{n}", 1, 600)
+        self.now += 1
+        self.assertTrue(buckets.take("new", 1, 600)[0])
+        self.assertEqual(buckets.stats()["evictions"], 1)
+        # вытеснено ведро k0 — оно снова полное
+        self.assertTrue(buckets.take("k0", 1, 600)[0])
+
+
+LOGIN_RATE = {
+    **settings.REST_FRAMEWORK,
+    "DEFAULT_THROTTLE_RATES": {**settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"], "login": "3/min"},
+}
+
+
+@override_settings(REST_FRAMEWORK=LOGIN_RATE)
+class ThrottleResponseTests(CatalogMixin, TestCase):
+
+    def setUp(self):
+        buckets = SharedBuckets(tempfile.mkstemp(prefix="throttle-")[1], 1024)
+        patcher = mock.patch.object(throttling, "buckets", buckets)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def login(self, **headers):
+        return self.client_for(None).post(
+            "/api/auth/token/login/",
+            {"email": self.reader.email, "password": "неверный"}, format="json", **headers,
+        )
+
+    def test_headers_and_429(self):
+        for remaining in (2, 1, 0):
+            response = self.login()
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response["X-RateLimit-Limit"], "3")
+            self.assertEqual(response["X-RateLimit-Remaining"], str(remaining))
+            # до полного ведра — по 20 с на взятый жетон (±1 на округление)
+            reset = 20 * (3 - remaining)
+            self.assertIn(response["X-RateLimit-Reset"], {str(reset), str(reset - 1)})
+
+        response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["X-RateLimit-Remaining"], "0")
+        self.assertIn(response["Retry-After"], {"19", "20"})
+
+    def test_anonymous_bucket_is_per_ip(self):
+        for _ in range(3):
+            self.login()
+        self.assertEqual(self.login().status_code, 429)
+        self.assertEqual(self.login(HTTP_X_FORWARDED_FOR="10.0.0.2").status_code, 400)
+
+    def test_unthrottled_scope_has_no_headers(self):
+        response = self.client_for(self.reader).get("/api/recipes/")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-RateLimit-Limit", response)
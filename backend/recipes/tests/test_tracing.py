@@ -0,0 +1,51 @@
+"""Экспортёр span-ов (utils/tracing.py): запись в фоновом потоке."""
+import json
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from utils.tracing import JsonlSpanExporter
+
+
+class JsonlSpanExporterTests(SimpleTestCase):
+
+    def setUp(self):
+        self.path = Path(tempfile.mkdtemp()) / "spans" / "trace.jsonl"
+        self.exporter = JsonlSpanExporter(self.path)
+
+    def _lines(self):
+        return [json.loads(line) for line in self.path.read_text().splitlines()]
+
+    def test_writes_spans_in_order(self):
+        self.exporter.export([{"name": "a"}, {"name": "b"}])
+        self.exporter.export([])
+        self.exporter.export([{"name": "c"}])
+        self.exporter.flush()
+        self.assertEqual([s["name"] for s in self._lines()], ["a", "b", "c"])
+
+    def test_export_does_not_wait_for_disk(self):
+        release = threading.Event()
+        real_open = Path.open
+
+        def slow_open(path, *args, **kwargs):
+            release.wait(5)
+            return real_open(path, *args, **kwargs)
+
+        with mock.patch.object(Path, "open", slow_open):
+            self.exporter.export([{"name": "a"}])
+            self.exporter.export([{"name": "b"}])
+            self.assertFalse(self.path.exists())
+            release.set()
+            self.exporter.flush()
+        self.assertEqual([s["name"] for s in self._lines()], ["a", "b"])
+
+    def test_new_writer_after_fork(self):
+        self.exporter.export([{"name": "родитель"}])
+        self.exporter.flush()
+        with mock.patch("utils.tracing.os.getpid", return_value=-1):
+            self.exporter.export([{"name": "воркер"}])
+            self.exporter.flush()
+        self.assertEqual([s["name"] for s in self._lines()], ["родитель", "воркер"])
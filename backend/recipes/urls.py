@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from .views import RecipeViewSet, IngredientViewSet
+from .views import RecipeViewSet, IngredientViewSet, SyncView
 
 router = DefaultRouter()
 router.register(r'recipes', RecipeViewSet, basename='recipes') # /api/
 router.register(r'ingredients', IngredientViewSet, basename='ingredients') # /api/
 
-urlpatterns = router.urls
\ No newline at end of file
+urlpatterns = router.urls + [
+    path('sync/', SyncView.as_view()), # /api/sync/
+]
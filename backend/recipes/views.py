@@ -1,21 +1,44 @@
 # stdlib
+import hashlib
+
+from django.conf import settings
 from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.http import Http404
 from django.utils.text import slugify
 from django.shortcuts import HttpResponse
 
 # 3rd-party
 from rest_framework import viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny, IsAuthenticated, BasePermission, SAFE_METHODS
 from django_filters.rest_framework import DjangoFilterBackend
 
 # local
-from .models import Recipe, Ingredient, ShoppingCart, Favorite
+from .models import Recipe, Ingredient, ShoppingCart, Favorite, PopularRecipe
+from . import sync
+from .catalog import manifest as catalog_manifest, snapshot_url
+from .feed import decode_cursor, encode_cursor, feed_page
 from .filters import IngredientFilter
+from .pantry import pantry_index
+from .popular import leaderboards
+from .shortlinks import link_for
+from .similar import similar_recipes
+from .projections import COLUMNS, FLAG_VALUES, RECIPE_FIELDS, RecipeReadProjection
 from recipes.serializers import RecipeReadSerializer, RecipeMinified, RecipeWriteSerializer, IngredientSerializer
+from utils.admission import admission_class
+from utils.asyncviews import AsyncActionsMixin
+from utils.cache import cache
+from utils.fieldsets import requested_fields
 from utils.helpers import generate_ingredient_list
+from utils.multiget import multi_get_response, requested_ids
 from utils.pagination import CustomPage
+from utils.querybudget import query_budget
+from utils.tracing import traced
 
 
 def _handle_add_remove(request, model, recipe, error_exists, error_missing):
@@ -25,13 +48,18 @@ def _handle_add_remove(request, model, recipe, error_exists, error_missing):
         try:
             with transaction.atomic():
                 obj, created = model.objects.get_or_create(user=user, recipe=recipe)
+                if created:
+                    sync.record(user.pk, model, recipe.pk)
             if not created:
                 return Response({"errors": error_exists}, status=400)
         except IntegrityError:
             return Response({"errors": "Ошибка при добавлении."}, status=409)
         return Response(RecipeMinified(recipe, context={"request": request}).data, status=201)
 
-    deleted, _ = model.objects.filter(user=user, recipe=recipe).delete()
+    with transaction.atomic():
+        deleted, _ = model.objects.filter(user=user, recipe=recipe).delete()
+        if deleted:
+            sync.record(user.pk, model, recipe.pk, deleted=True)
     if deleted:
         return Response(status=204)
     return Response({"errors": error_missing}, status=400)
@@ -58,10 +86,18 @@ class IsAuthorOrReadOnly(BasePermission):
         return obj.author == request.user
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(AsyncActionsMixin, viewsets.ModelViewSet):
     # serializer_class  = RecipeReadSerializer
+    async_actions     = ("list", "retrieve")
     pagination_class  = CustomPage
     http_method_names = ["get", "post", "patch", "delete"]
+    # бюджеты SQL-запросов на action (см. utils.querybudget)
+    query_budgets     = {"list": 4, "retrieve": 3}
+    # лимиты частоты на action (см. utils.throttling)
+    throttle_scopes   = {
+        "favorite": "favorite", "shopping_cart": "shopping_cart",
+        "create": "recipe_write", "partial_update": "recipe_write",
+    }
 
     # 1️⃣  Читаем-/пишем разные сериализаторы
     def get_serializer_class(self):
@@ -74,21 +110,34 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
     def get_permissions(self):
         # безопасные действия + кастомный get_link — доступны всем
-        if self.action in ("list", "retrieve", "get_link"):
+        if self.action in ("list", "retrieve", "get_link", "similar", "pantry", "popular"):
             return [AllowAny()]
         
-        elif self.action in ("shopping_cart", "favorite"):
+        elif self.action in ("shopping_cart", "favorite", "feed"):
             return [IsAuthenticated()]
 
         # все остальные (POST/PATCH/DELETE) — только автору/аутентифицированному
         return [IsAuthorOrReadOnly()]
 
 
+    @traced("RecipeViewSet.get_queryset")
     def get_queryset(self):
         qs     = Recipe.objects.all()
         user   = self.request.user
-        params = self.request.query_params
+        if self.action in ("list", "retrieve"):
+            qs = self._with_user_flags(qs, user, self.requested_fields())
+        return self.filter_by_params(qs, self.request.query_params, user)
+
+    FILTER_PARAMS = ("author", "is_favorited", "is_in_shopping_cart")
 
+    @staticmethod
+    def filter_by_params(qs, params, user):
+        """
+        Фильтры author / is_favorited / is_in_shopping_cart, в любом сочетании.
+        Избранное и корзина — полусоединение через EXISTS: строки рецептов
+        не размножаются, и DISTINCT (сортировка/хеш по всем колонкам перед
+        LIMIT) не нужен.
+        """
         author_id     = params.get("author")
         is_favorited  = params.get("is_favorited") in ("1", "true", "True")
         is_in_cart    = params.get("is_in_shopping_cart") in ("1", "true", "True")
@@ -97,24 +146,284 @@ class RecipeViewSet(viewsets.ModelViewSet):
         if author_id:
             qs = qs.filter(author_id=author_id)
 
-        # избранное
-        if is_favorited:
-            return qs.filter(favorited_by__user=user).distinct().order_by("-created_at") \
-                     if user.is_authenticated else Recipe.objects.none()
+        # избранное / корзина — только свои
+        for enabled, model in ((is_favorited, Favorite), (is_in_cart, ShoppingCart)):
+            if not enabled:
+                continue
+            if not user.is_authenticated:
+                return qs.none()
+            qs = qs.filter(
+                Exists(model.objects.filter(user=user, recipe=OuterRef("pk")))
+            )
+
+        return qs.order_by("-created_at")
+
+
+    # 2️⃣  list / retrieve — быстрый путь без моделей (recipes/projections.py)
+    def requested_fields(self):
+        """?fields= / ?omit= (utils/fieldsets.py), разбираются один раз на запрос."""
+        if not hasattr(self, "_requested_fields"):
+            self._requested_fields = requested_fields(self.request, RECIPE_FIELDS)
+        return self._requested_fields
+
+    def list(self, request, *args, **kwargs):
+        projection = RecipeReadProjection(request, self.requested_fields())
+        queryset = self.filter_queryset(self.get_queryset())
+
+        ids = requested_ids(request)          # ?ids=1,2,3 — без пагинации
+        if ids is not None:
+            rows = list(projection.rows(queryset.filter(pk__in=ids)))
+            row_ids = [row["id"] for row in rows]
+            return multi_get_response(ids, dict(zip(row_ids, projection.render(rows))))
+
+        page = self.paginate_queryset(projection.rows(queryset))
+        if page is None:
+            return Response(projection.render(projection.rows(queryset)))
+        return self.get_paginated_response(projection.render(page))
+
+    def retrieve(self, request, *args, **kwargs):
+        # get_object() здесь не нужен: retrieve доступен всем (AllowAny),
+        # проверять объектные права не на чем
+        pk = self._detail_pk(kwargs)
+        projection = RecipeReadProjection(request, self.requested_fields())
+        if self._detail_filtered():
+            data = projection.render(projection.rows(self.get_queryset().filter(pk=pk)))
+            if not data:
+                raise Http404
+            return Response(data[0])
+
+        # общая для всех часть — из кеша (utils/cache.py), флаги пользователя
+        # сверху; на промахе флаги читаются тем же запросом, что и строка
+        queryset, flags = self._detail_query(pk)
+        user_flags = {}
+        row = cache.get_or_set(
+            f"recipe:{pk}:row", lambda: self._load_row(queryset, flags, user_flags),
+            tags=[f"recipe:{pk}"],
+        )
+        if row is None:
+            raise Http404
+        if flags and not user_flags:
+            user_flags = queryset.values(*flags).first() or {}
+        return Response(projection.render([{**row, **user_flags}])[0])
+
+    def _detail_pk(self, kwargs) -> int:
+        try:
+            return int(kwargs["pk"])
+        except (TypeError, ValueError):
+            raise Http404
+
+    def _detail_filtered(self) -> bool:
+        """С фильтрами ответ зависит от пользователя — мимо кеша."""
+        return any(name in self.request.query_params for name in self.FILTER_PARAMS)
+
+    def _detail_query(self, pk):
+        """(QS рецепта с флагами пользователя, имена запрошенных флагов)."""
+        fields, user = self.requested_fields(), self.request.user
+        flags = [flag for flag in FLAG_VALUES if flag in fields] if user.is_authenticated else []
+        return self._with_user_flags(Recipe.objects.filter(pk=pk), user, fields), flags
+
+    @staticmethod
+    def _load_row(queryset, flags, user_flags):
+        """Строка рецепта для кеша; флаги из неё — в user_flags."""
+        row = queryset.values("id", *set(COLUMNS.values()), *flags).first()
+        if row is not None:
+            user_flags.update((flag, row.pop(flag)) for flag in flags)
+        return row
 
-        # корзина
-        if is_in_cart:
-            return qs.filter(in_shopping_carts__user=user).distinct().order_by("-created_at") \
-                     if user.is_authenticated else Recipe.objects.none()
 
-        return qs.distinct().order_by("-created_at")
+    # 3️⃣  async-варианты list / retrieve для ASGI (utils/asyncviews.py):
+    # тот же ответ и те же запросы, но через async ORM, без потока на запрос
+    async def alist(self, request, *args, **kwargs):
+        projection = RecipeReadProjection(request, self.requested_fields())
+        queryset = self.filter_queryset(self.get_queryset())
+
+        ids = requested_ids(request)
+        if ids is not None:
+            rows = [row async for row in projection.rows(queryset.filter(pk__in=ids))]
+            row_ids = [row["id"] for row in rows]
+            return multi_get_response(ids, dict(zip(row_ids, await projection.arender(rows))))
+
+        page = await self.paginator.apaginate_queryset(projection.rows(queryset), request, self)
+        if page is None:
+            rows = [row async for row in projection.rows(queryset)]
+            return Response(await projection.arender(rows))
+        return self.get_paginated_response(await projection.arender(page))
+
+    async def aretrieve(self, request, *args, **kwargs):
+        pk = self._detail_pk(kwargs)
+        projection = RecipeReadProjection(request, self.requested_fields())
+        if self._detail_filtered():
+            rows = [row async for row in projection.rows(self.get_queryset().filter(pk=pk))]
+            if not rows:
+                raise Http404
+            return Response((await projection.arender(rows))[0])
+
+        queryset, flags = self._detail_query(pk)
+        user_flags = {}
+        row = await cache.aget_or_set(
+            f"recipe:{pk}:row", lambda: self._load_row(queryset, flags, user_flags),
+            tags=[f"recipe:{pk}"],
+        )
+        if row is None:
+            raise Http404
+        if flags and not user_flags:
+            user_flags = await queryset.values(*flags).afirst() or {}
+        return Response((await projection.arender([{**row, **user_flags}]))[0])
+
+
+    def _render_by_id(self, ids) -> dict:
+        """
+        id → рецепт в формате RecipeReadSerializer (с флагами и ?fields=).
+        Для действий, которые сами решают, какие рецепты и в каком порядке
+        отдать: лента, похожие, кладовая, топ.
+        """
+        fields = self.requested_fields()
+        projection = RecipeReadProjection(self.request, fields)
+        queryset = self._with_user_flags(
+            Recipe.objects.filter(pk__in=ids), self.request.user, fields
+        )
+        rows = list(projection.rows(queryset))
+        return dict(zip([row["id"] for row in rows], projection.render(rows)))
+
+    @staticmethod
+    def _with_user_flags(qs, user, fields=RECIPE_FIELDS):
+        """
+        Флаги «в избранном» / «в корзине» — EXISTS-подзапросами, а не по строке.
+        Подзапрос добавляется, только если флаг есть в `fields`.
+        """
+        if not user.is_authenticated:
+            return qs
+        flags = {
+            "is_favorited": Favorite,
+            "is_in_shopping_cart": ShoppingCart,
+        }
+        return qs.annotate(**{
+            flag: Exists(model.objects.filter(user=user, recipe=OuterRef("pk")))
+            for flag, model in flags.items()
+            if flag in fields
+        })
+
+
+    @admission_class("heavy")
+    @query_budget(6)
+    @action(detail=False, methods=["get"], url_path="feed", permission_classes=[IsAuthenticated])
+    def feed(self, request):
+        """
+        GET /api/recipes/feed/?limit=10&cursor=… — свежие рецепты авторов,
+        на которых подписан пользователь (recipes/feed.py).
+        """
+        limit  = self.paginator.get_page_size(request)
+        cursor = decode_cursor(request.query_params.get("cursor"))
+        ids, next_key = feed_page(request.user, cursor, limit)
+
+        by_id = self._render_by_id(ids)
+
+        next_url = None
+        if next_key is not None:
+            next_url = replace_query_param(
+                request.build_absolute_uri(), "cursor", encode_cursor(*next_key)
+            )
+        return Response({
+            "next": next_url,
+            # рецепт могли удалить между запросами — просто пропускаем
+            "results": [by_id[pk] for pk in ids if pk in by_id],
+        })
+
+
+    @query_budget(6)
+    @action(detail=True, methods=["get"], url_path="similar", permission_classes=[AllowAny])
+    def similar(self, request, pk=None):
+        """
+        GET /api/recipes/{id}/similar/?limit=6 — рецепты с похожим набором
+        ингредиентов, по убыванию коэффициента Жаккара (recipes/similar.py).
+        """
+        try:
+            recipe_id = int(pk)
+        except (TypeError, ValueError):
+            raise Http404
+        ranked = similar_recipes(recipe_id, self.paginator.get_page_size(request))
+        if not ranked and not Recipe.objects.filter(pk=recipe_id).exists():
+            raise Http404
+
+        by_id = self._render_by_id([pk for pk, _ in ranked])
+        return Response({
+            "results": [
+                {**by_id[pk], "similarity": round(score, 4)}
+                for pk, score in ranked if pk in by_id
+            ],
+        })
+
+
+    @admission_class("heavy")
+    @query_budget(6)
+    @action(detail=False, methods=["get"], url_path="pantry", permission_classes=[AllowAny])
+    def pantry(self, request):
+        """
+        GET /api/recipes/pantry/?ingredients=1,5,9&max_missing=2 — что можно
+        приготовить из этих ингредиентов: сначала рецепты, для которых есть
+        всё, потом с 1–2 недостающими (recipes/pantry.py).
+        """
+        pantry = requested_ids(
+            request, "ingredients", max_ids=settings.PANTRY_MAX_INGREDIENTS
+        )
+        if pantry is None:
+            raise ValidationError({"ingredients": ["Обязательный параметр."]})
+        try:
+            max_missing = int(request.query_params.get("max_missing", 2))
+            page_number = int(request.query_params.get("page", 1))
+        except ValueError:
+            raise ValidationError({"detail": ["max_missing и page — целые числа."]})
+        if not 0 <= max_missing <= 5:
+            raise ValidationError({"max_missing": ["От 0 до 5."]})
+        if page_number < 1:
+            raise NotFound("Неверная страница.")
+
+        limit = self.paginator.get_page_size(request)
+        offset = (page_number - 1) * limit
+        count, found = pantry_index.search(pantry, max_missing, offset, limit)
+        if not found and page_number > 1:
+            raise NotFound("Неверная страница.")
+
+        by_id = self._render_by_id([pk for pk, _ in found])
+
+        url = request.build_absolute_uri()
+        return Response({
+            "count": count,
+            "next": replace_query_param(url, "page", page_number + 1)
+                    if offset + limit < count else None,
+            "previous": replace_query_param(url, "page", page_number - 1)
+                        if page_number > 1 else None,
+            "results": [
+                {**by_id[pk], "missing_ingredients": lacking}
+                for pk, lacking in found if pk in by_id
+            ],
+        })
+
+
+    @query_budget(4)
+    @action(detail=False, methods=["get"], url_path="popular", permission_classes=[AllowAny])
+    def popular(self, request):
+        """
+        GET /api/recipes/popular/?window=day|week|all&limit=10 — топ по
+        добавлениям в избранное и корзину (recipes/popular.py).
+        """
+        window = request.query_params.get("window", PopularRecipe.Window.WEEK)
+        if window not in PopularRecipe.Window.values:
+            raise ValidationError({"window": [f"Одно из: {', '.join(PopularRecipe.Window.values)}."]})
+        top = leaderboards.get(window)[:self.paginator.get_page_size(request)]
+
+        by_id = self._render_by_id([pk for pk, _ in top])
+        return Response({
+            "window": window,
+            "results": [{**by_id[pk], "score": score} for pk, score in top if pk in by_id],
+        })
 
 
     @action(detail=True, methods=['get'], url_path='get-link', permission_classes=[AllowAny])
     def get_link(self, request, pk=None):
         recipe = self.get_object()
-        link = f"https://example.com/recipes/{recipe.pk}/"
-        return Response({"short-link": link})
+        code = link_for(recipe)
+        return Response({"short-link": request.build_absolute_uri(f"/s/{code}/")})
 
 
     @action(
@@ -149,6 +458,8 @@ class RecipeViewSet(viewsets.ModelViewSet):
             error_missing="Этого рецепта нет в корзине."
         )
     
+    @admission_class("heavy")
+    @query_budget(3)
     @action(
         detail=False,                       # ⬅️ весь список, а не конкретный рецепт
         methods=["get"],
@@ -169,10 +480,75 @@ class RecipeViewSet(viewsets.ModelViewSet):
         response["Content-Disposition"] = f'attachment; filename="{filename}"'
         return response
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(AsyncActionsMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = [AllowAny]
+    query_budgets = {"list": 2, "retrieve": 2, "snapshot": 1}
+    async_actions = ("list",)
 
     filter_backends = [DjangoFilterBackend]
-    filterset_class = IngredientFilter
\ No newline at end of file
+    filterset_class = IngredientFilter
+
+    def list(self, request, *args, **kwargs):
+        # справочник меняется редко: ответ на каждый ?name= — из кеша
+        return Response(cache.get_or_set(
+            self._list_key(request), self._list_data, tags=["ingredients"]
+        ))
+
+    async def alist(self, request, *args, **kwargs):
+        return Response(await cache.aget_or_set(
+            self._list_key(request), self._list_data, tags=["ingredients"]
+        ))
+
+    @staticmethod
+    def _list_key(request) -> str:
+        name = request.query_params.get("name", "")
+        return "ingredients:list:" + hashlib.md5(name.encode()).hexdigest()
+
+    def _list_data(self) -> list:
+        return list(self.get_serializer(
+            self.filter_queryset(self.get_queryset()), many=True
+        ).data)
+
+    @action(detail=False, methods=["get"], url_path="snapshot")
+    def snapshot(self, request):
+        """
+        GET /api/ingredients/snapshot/ — ссылка на статический снимок всего
+        справочника (recipes/catalog.py). Сам файл отдаёт nginx.
+        Снимок ещё не опубликован — ссылка на обычный список.
+        """
+        current = catalog_manifest.get()
+        if current is None:
+            response = Response({
+                "version": None,
+                "url": request.build_absolute_uri("/api/ingredients/"),
+                "count": Ingredient.objects.count(),
+            })
+            response["Cache-Control"] = "no-cache"
+            return response
+        response = Response({
+            "version": current["version"],
+            "url": request.build_absolute_uri(snapshot_url(current["file"])),
+            "count": current["count"],
+        })
+        response["Cache-Control"] = "public, max-age=60"
+        return response
+
+
+class SyncView(APIView):
+    """
+    GET /api/sync/?since=<версия> — что изменилось в избранном, корзине
+    и подписках после версии (recipes/sync.py). Без since — полный состав.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        since = request.query_params.get("since")
+        if since is not None:
+            if not since.isdigit():
+                raise ValidationError({"since": ["Ожидается неотрицательное целое число."]})
+            since = int(since)
+        response = Response(sync.changes(request.user.pk, since))
+        response["Cache-Control"] = "no-store"
+        return response
@@ -1,7 +1,11 @@
-from django.urls import path, include
+from django.urls import path, include, re_path
+
+from .views import TokenCreateView, TokenDestroyView
 
 # api/auth/
 urlpatterns = [
+    # /token/login/ и /logout/ — djoser-совместимые, но с подписанными токенами
+    re_path(r"^token/login/?$", TokenCreateView.as_view(), name="login"),
+    re_path(r"^token/logout/?$", TokenDestroyView.as_view(), name="logout"),
     path("", include("djoser.urls")),               # регистрация, активация,
-    path("", include("djoser.urls.authtoken")),     # /token/login/ и /logout/
-]
\ No newline at end of file
+]
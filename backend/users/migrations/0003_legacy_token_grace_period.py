@@ -0,0 +1,22 @@
+from django.db import migrations
+from django.utils import timezone
+
+
+def start_grace_period(apps, schema_editor):
+    # старые ключи authtoken_token живут SIGNED_TOKEN_MAX_AGE с переезда
+    # на подписанные токены (utils/authentication.py), а не с выпуска:
+    # иначе давно выданные ключи истекли бы все разом при деплое
+    Token = apps.get_model("authtoken", "Token")
+    Token.objects.update(created=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_token_version'),
+        ('authtoken', '0004_alter_tokenproxy_options'),
+    ]
+
+    operations = [
+        migrations.RunPython(start_grace_period, migrations.RunPython.noop),
+    ]
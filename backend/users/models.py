@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.utils import timezone
 from app import settings
+from utils.tokens import revoke_tokens, token_versions
 
 # Create your models here.
 
@@ -64,6 +65,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_active   = models.BooleanField(default=True)
     is_staff    = models.BooleanField(default=False)
     date_joined = models.DateTimeField(default=timezone.now)
+    # поколение подписанных токенов: +1 на logout / смену пароля (save)
+    token_version = models.PositiveIntegerField(default=0, editable=False)
 
     # «подписки, за кем я слежу»
     following = models.ManyToManyField(
@@ -79,4 +82,24 @@ class User(AbstractBaseUser, PermissionsMixin):
     objects = UserManager()
 
     def __str__(self):
-        return self.email
\ No newline at end of file
+        return self.email
+
+    def save(self, *args, **kwargs):
+        # смена пароля отзывает выданные токены — откуда бы ни пришла:
+        # API, админка, shell (set_password запоминает сырой пароль в _password)
+        password_changed = not self._state.adding and self._password is not None
+        super().save(*args, **kwargs)
+
+        if password_changed:
+            revoke_tokens(self)
+        else:
+            # права и is_active этот воркер увидит сразу, остальные — через TTL
+            token_versions.forget(self.pk)
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # пользователь из подписанного токена приходит «частичным»:
+        # первое обращение к отложенному полю догружает их все одним запросом
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = deferred
+        return super().refresh_from_db(using, fields, from_queryset)
\ No newline at end of file
@@ -1,10 +1,10 @@
-from django.db.models import QuerySet
+from django.db.models import Count, Prefetch, QuerySet
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from djoser.serializers import UserCreateSerializer as BaseCreate
 
-from utils.mixins import ImageMixin
+from utils.mixins import ImageMixin, SparseFieldsetMixin
 from .models import User, Subscription
 
 
@@ -13,11 +13,26 @@ class SubscriptionMixin(serializers.Serializer):
     """Добавляет поле `is_subscribed` и общую реализацию."""
     is_subscribed = serializers.SerializerMethodField(read_only=True)
 
+    def _following_ids(self, user) -> set[int]:
+        """
+        Id авторов, на которых подписан user.
+        Кешируется в общем context — один запрос на всю сериализацию,
+        а не по запросу на каждую строку.
+        """
+        cache = self.context.setdefault("_following_ids", {})
+        if user.pk not in cache:
+            cache[user.pk] = set(
+                Subscription.objects
+                .filter(follower=user)
+                .values_list("author_id", flat=True)
+            )
+        return cache[user.pk]
+
     def _is_following(self, user, obj) -> bool:
         return (
             user.is_authenticated
             and user != obj
-            and Subscription.objects.filter(follower=user, author=obj).exists()
+            and obj.pk in self._following_ids(user)
         )
 
     def get_is_subscribed(self, obj) -> bool:      # noqa: D401
@@ -28,7 +43,9 @@ class SubscriptionMixin(serializers.Serializer):
 
 
 # ────────────────────────────── serializers ─────────────────────────
-class UserSerializer(ImageMixin, SubscriptionMixin, serializers.ModelSerializer):
+class UserSerializer(
+    SparseFieldsetMixin, ImageMixin, SubscriptionMixin, serializers.ModelSerializer
+):
     """Базовый сериализатор с общими полями и логикой подписки."""
 
     class Meta:
@@ -98,9 +115,7 @@ class SubscriptionSerializer(serializers.ModelSerializer):
     """`Subscription` + агрегированные рецепты автора."""
 
     author = UserShortSerializer(read_only=True)
-    recipes_count = serializers.IntegerField(
-        source="author.recipes.count", read_only=True
-    )
+    recipes_count = serializers.SerializerMethodField()
     recipes = serializers.SerializerMethodField()
     
 
@@ -109,17 +124,47 @@ class SubscriptionSerializer(serializers.ModelSerializer):
         fields = ("id", "author", "recipes_count", "recipes")
 
     # ─────────── вспом. методы ───────────
-    def _limited_recipes(self, qs: QuerySet) -> QuerySet:
+    @staticmethod
+    def _limit_recipes(request, qs: QuerySet) -> QuerySet:
         """
         Возвращает QS c учётом query-param ?recipes_limit=N.
         """
-        limit = self.context.get("request").query_params.get("recipes_limit")
+        limit = request.query_params.get("recipes_limit")
         return qs[: int(limit)] if (limit and limit.isdigit()) else qs
 
+    def _limited_recipes(self, qs: QuerySet) -> QuerySet:
+        return self._limit_recipes(self.context.get("request"), qs)
+
+    @classmethod
+    def optimize_queryset(cls, qs: QuerySet, request) -> QuerySet:
+        """
+        Подготавливает QS подписок для списка: автор через JOIN,
+        число рецептов — аннотацией, сами рецепты — одним prefetch.
+        """
+        from recipes.models import Recipe
+
+        recipes_qs = cls._limit_recipes(request, Recipe.objects.order_by("-id"))
+        return (
+            qs.select_related("author")
+            .annotate(recipes_count=Count("author__recipes", distinct=True))
+            .prefetch_related(
+                Prefetch("author__recipes", queryset=recipes_qs,
+                         to_attr="limited_recipes")
+            )
+        )
+
+    def get_recipes_count(self, obj) -> int:
+        if hasattr(obj, "recipes_count"):
+            return obj.recipes_count
+        return obj.author.recipes.count()
+
     def get_recipes(self, obj) -> list[dict]:
         from recipes.serializers import RecipeMinified
 
-        qs = self._limited_recipes(obj.author.recipes.order_by("-id"))
+        if hasattr(obj.author, "limited_recipes"):
+            qs = obj.author.limited_recipes
+        else:
+            qs = self._limited_recipes(obj.author.recipes.order_by("-id"))
         return RecipeMinified(qs, many=True, context=self.context).data
 
     # ─────────── плоское представление ───────────
@@ -0,0 +1,65 @@
+"""Подписанные токены (utils/authentication.py): права и отзыв."""
+from datetime import timedelta
+
+from django.core import signing
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from django.test import TestCase
+
+from users.models import User
+from utils.tokens import TOKEN_SALT, issue_token
+
+
+class SignedTokenTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="staff@example.com", username="staff", password="pw12345!x",
+            first_name="Имя", last_name="Фамилия", is_staff=True,
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {issue_token(self.user)}")
+
+    def test_token_carries_no_permissions(self):
+        payload = signing.TimestampSigner(salt=TOKEN_SALT).unsign_object(issue_token(self.user))
+        self.assertEqual(set(payload), {"id", "ver"})
+
+    def test_demotion_applies_to_issued_token(self):
+        self.assertEqual(self.client.get("/api/metrics/").status_code, 200)
+        self.user.is_staff = False
+        self.user.save()
+        self.assertEqual(self.client.get("/api/metrics/").status_code, 403)
+
+    def test_deactivation_applies_to_issued_token(self):
+        self.assertEqual(self.client.get("/api/users/me/").status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get("/api/users/me/").status_code, 401)
+
+    def test_password_change_outside_api_revokes_tokens(self):
+        self.user.set_password("new-pw12345!x")
+        self.user.save()
+        self.assertEqual(self.client.get("/api/users/me/").status_code, 401)
+
+
+class LegacyTokenTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="old@example.com", username="old", password="pw12345!x",
+            first_name="Имя", last_name="Фамилия",
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_fresh_key_works(self):
+        self.assertEqual(self.client.get("/api/users/me/").status_code, 200)
+
+    def test_expired_key_is_rejected_and_deleted(self):
+        with self.settings(SIGNED_TOKEN_MAX_AGE=60):
+            Token.objects.filter(pk=self.token.pk).update(
+                created=self.token.created - timedelta(seconds=61)
+            )
+            self.assertEqual(self.client.get("/api/users/me/").status_code, 401)
+        self.assertFalse(Token.objects.filter(pk=self.token.pk).exists())
@@ -1,10 +1,23 @@
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.db import transaction
+from django.http import Http404
+from djoser import views as djoser_views
 from rest_framework import viewsets, serializers
+from rest_framework.authtoken.models import Token
 from rest_framework.decorators import action
-from rest_framework.parsers import JSONParser
 from rest_framework.permissions import AllowAny, IsAuthenticated, BasePermission, SAFE_METHODS
 from rest_framework.response import Response
 
+from recipes import sync
+from utils.admission import admission_class
+from utils.asyncviews import AsyncActionsMixin
+from utils.tokens import issue_token, revoke_tokens
+from utils.cache import cache
+from utils.fieldsets import requested_fields
+from utils.multiget import multi_get_response, requested_ids
 from utils.pagination import CustomPage
+from utils.renderers import JSONParser
+from utils.querybudget import query_budget
 from utils.fields import Base64ImageField
 from .models import User, Subscription
 from .serializers import (
@@ -33,7 +46,10 @@ def handle_subscribe(request, author, model, err_exist, err_absent):
         if model.objects.filter(follower=follower, author=author).exists():
             return Response({"errors": err_exist}, status=400)
 
-        sub = model.objects.create(follower=follower, author=author)  # ← sub
+        # событие outbox для ленты (recipes/signals.py) — в той же транзакции
+        with transaction.atomic():
+            sub = model.objects.create(follower=follower, author=author)  # ← sub
+            sync.record(follower.pk, model, author.pk)
 
         serializer = SubscriptionSerializer(
             sub,                                   # передаём подписку
@@ -46,10 +62,39 @@ def handle_subscribe(request, author, model, err_exist, err_absent):
     if not qs.exists():
         return Response({"errors": err_absent}, status=400)
 
-    qs.delete()
+    with transaction.atomic():
+        if qs.delete()[0]:
+            sync.record(follower.pk, model, author.pk, deleted=True)
     return Response(status=204)
 
 
+# ──────────────────────────── auth token -------------------------------------
+class TokenCreateView(djoser_views.TokenCreateView):
+    """POST /api/auth/token/login/ — выдаёт подписанный токен."""
+    # отозванный токен в заголовке не должен мешать войти заново
+    authentication_classes = []
+    throttle_scope = "login"
+
+    def _action(self, serializer):
+        user = serializer.user
+        # переезд: старый ключ из authtoken_token больше не нужен
+        Token.objects.filter(user=user).delete()
+        user_logged_in.send(sender=user.__class__, request=self.request, user=user)
+        return Response({"auth_token": issue_token(user)}, status=200)
+
+
+class TokenDestroyView(djoser_views.TokenDestroyView):
+    """POST /api/auth/token/logout/ — отзывает все токены пользователя."""
+
+    def post(self, request):
+        revoke_tokens(request.user)
+        Token.objects.filter(user=request.user).delete()
+        user_logged_out.send(
+            sender=request.user.__class__, request=request, user=request.user
+        )
+        return Response(status=204)
+
+
 # ──────────────────────────── permissions ------------------------------------
 class IsAuthorOrReadOnly(BasePermission):
     """SAFE методы — всем; модификация — только автору."""
@@ -61,12 +106,20 @@ class IsAuthorOrReadOnly(BasePermission):
 
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(AsyncActionsMixin, viewsets.ModelViewSet):
     """ /api/users """
 
     queryset           = User.objects.all().order_by("date_joined")
     serializer_class   = UserSerializer
     pagination_class   = CustomPage
+    query_budgets      = {"list": 4, "retrieve": 3, "me": 2}
+    # действия, где работают ?fields= / ?omit= (utils/fieldsets.py)
+    sparse_actions     = ("list", "retrieve", "me")
+    async_actions      = ("me",)
+    # лимиты частоты на action (см. utils.throttling)
+    throttle_scopes    = {
+        "create": "signup", "set_password": "password", "subscribe": "subscribe",
+    }
 
 
     # --- сериализаторы -------------------------------------------------------
@@ -77,6 +130,29 @@ class UserViewSet(viewsets.ModelViewSet):
             return UserSerializer
 
 
+    # --- разреженные наборы полей ---------------------------------------------
+    def requested_fields(self):
+        if not hasattr(self, "_requested_fields"):
+            self._requested_fields = requested_fields(
+                self.request, UserSerializer.Meta.fields
+            )
+        return self._requested_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in self.sparse_actions:
+            context["fields"] = self.requested_fields()
+        return context
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.action == "list":
+            # читаем только колонки запрошенных полей (is_subscribed — не колонка)
+            concrete = {f.name for f in User._meta.concrete_fields}
+            qs = qs.only(*(n for n in self.requested_fields() if n in concrete))
+        return qs
+
+
     # --- права доступа -------------------------------------------------------
     def get_permissions(self):
         # список пользователей и регистрация — публично
@@ -86,10 +162,63 @@ class UserViewSet(viewsets.ModelViewSet):
         return [IsAuthenticated()]
 
 
+    # --- list: обычная страница или мульти-запрос ?ids= ----------------------
+    def list(self, request, *args, **kwargs):
+        ids = requested_ids(request)
+        if ids is None:
+            return super().list(request, *args, **kwargs)
+        users = list(self.filter_queryset(self.get_queryset()).filter(pk__in=ids))
+        data = self.get_serializer(users, many=True).data
+        return multi_get_response(
+            ids, {user.pk: item for user, item in zip(users, data)}
+        )
+
+
+    # --- профиль: retrieve / me — из кеша (utils/cache.py) -------------------
+    @staticmethod
+    def cached_profile(pk):
+        """
+        Пользователь только с полями профиля (без пароля — кеш общий),
+        None — такого нет. is_subscribed считается уже по запросу.
+        """
+        return cache.get_or_set(*UserViewSet._profile_entry(pk))
+
+    @staticmethod
+    async def acached_profile(pk):
+        return await cache.aget_or_set(*UserViewSet._profile_entry(pk))
+
+    @staticmethod
+    def _profile_entry(pk):
+        """(ключ, загрузка, теги) профиля для cache.get_or_set."""
+        concrete = {f.name for f in User._meta.concrete_fields}
+        return (
+            f"user:{pk}:profile",
+            lambda: User.objects.only(
+                *(n for n in UserSerializer.Meta.fields if n in concrete)
+            ).filter(pk=pk).first(),
+            [f"user:{pk}"],
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            user = self.cached_profile(int(kwargs["pk"]))
+        except (TypeError, ValueError):
+            raise Http404
+        if user is None:
+            raise Http404
+        return Response(self.get_serializer(user).data)
+
+
     # --- actions      --------------------------------------------------------
     @action(detail=False, methods=["get"], url_path="me")
     def me(self, request):
-        return Response(self.get_serializer(request.user).data)
+        user = self.cached_profile(request.user.pk) or request.user
+        return Response(self.get_serializer(user).data)
+
+    async def ame(self, request):
+        # is_subscribed на себя всегда False — сериализация без БД
+        user = await self.acached_profile(request.user.pk) or request.user
+        return Response(self.get_serializer(user).data)
     
 
     @action(
@@ -110,6 +239,7 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
 
         request.user.set_password(serializer.validated_data["new_password"])
+        # старые токены отзывает User.save
         request.user.save(update_fields=["password"])
 
         return Response(status=204)
@@ -163,10 +293,16 @@ class UserViewSet(viewsets.ModelViewSet):
         
 
     # --- /users/subscriptions/ ---
+    @admission_class("heavy")
+    @query_budget(6)
     @action(
         detail=False, methods=["get"], url_path="subscriptions",
         permission_classes=[IsAuthenticated]
     )
     def subscriptions(self, request):
-        qs = Subscription.objects.filter(follower=request.user).select_related("author")
+        qs = SubscriptionSerializer.optimize_queryset(
+            # Meta.ordering не применяется к запросам с GROUP BY — задаём явно
+            Subscription.objects.filter(follower=request.user).order_by("-created_at"),
+            request,
+        )
         return make_paginated_response(self, qs, SubscriptionSerializer)
\ No newline at end of file
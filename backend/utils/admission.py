@@ -0,0 +1,227 @@
+# utils/admission.py
+"""
+Admission control: ограничение одновременных запросов по классам маршрутов.
+
+Дорогие action-ы (скачивание корзины, подписки, лента) при всплеске
+нагрузки не должны забирать воркер у дешёвых. Каждый маршрут относится к
+классу, у класса в воркере не больше `limit` запросов одновременно:
+
+    class UserViewSet(viewsets.ModelViewSet):
+        admission_classes = {"subscriptions": "heavy"}
+
+        @admission_class("heavy")
+        @action(...)
+        def download_shopping_cart(self, request): ...
+
+Всё, что не размечено, — класс "default". Сверх лимита запрос ждёт в
+очереди (не длиннее `queue`) до `timeout` секунд; не дождался или очередь
+полна — сразу 503 с Retry-After, а не растущая без предела задержка.
+
+Классы и лимиты — settings.ADMISSION_CLASSES (пусто — выключено), лимиты
+на воркер. Счётчики отказов — в /api/metrics/ под именем "admission".
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+from django.urls import Resolver404, resolve
+
+from . import metrics
+
+DEFAULT_CLASS = "default"
+
+
+def admission_class(name: str):
+    """Декоратор: относит action вьюсета к классу маршрутов."""
+    def decorator(func):
+        func.admission_class = name
+        return func
+    return decorator
+
+
+class RouteClass:
+    """
+    Лимит одновременных запросов одного класса с очередью ожидания.
+
+    Sync-запросы ждут на Condition, async — на future в своём event loop;
+    освободившийся слот async-ожидающему передаётся напрямую (in_flight не
+    меняется), sync-ожидающие разбирают его сами. Один воркер работает
+    в одном режиме, поэтому release() из того же цикла, что и ожидание.
+    """
+
+    def __init__(self, name, limit, queue=None, timeout=1.0, retry_after=1):
+        self.name = name
+        self.limit = limit
+        self.queue = limit * 4 if queue is None else queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.queued = 0
+        self._lock = threading.Lock()
+        self._free = threading.Condition(self._lock)
+        self._waiters: deque = deque()
+        self._counts = dict.fromkeys(("admitted", "waited", "shed_timeout", "shed_queue_full"), 0)
+
+    # ---------- sync ----------
+    def acquire(self) -> bool:
+        with self._lock:
+            admitted = self._admit_now()
+            if admitted is not None:
+                return admitted
+            self.queued += 1
+            self._counts["waited"] += 1
+            deadline = time.monotonic() + self.timeout
+            try:
+                while self.in_flight >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counts["shed_timeout"] += 1
+                        return False
+                    self._free.wait(remaining)
+                self.in_flight += 1
+                self._counts["admitted"] += 1
+                return True
+            finally:
+                self.queued -= 1
+
+    # ---------- async ----------
+    async def aacquire(self) -> bool:
+        with self._lock:
+            admitted = self._admit_now()
+            if admitted is not None:
+                return admitted
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            self.queued += 1
+            self._counts["waited"] += 1
+
+        try:
+            await asyncio.wait((waiter,), timeout=self.timeout)
+        except asyncio.CancelledError:
+            # клиент ушёл, пока ждал; слот, если уже передан, — вернуть
+            if not self._leave(waiter):
+                self.release()
+            raise
+        if self._leave(waiter):
+            with self._lock:
+                self._counts["shed_timeout"] += 1
+            return False
+        return True
+
+    def _leave(self, waiter) -> bool:
+        """Убирает ожидающего из очереди; False — слот ему уже передан."""
+        with self._lock:
+            if waiter.done():
+                return False
+            self._waiters.remove(waiter)
+            self.queued -= 1
+            waiter.cancel()
+            return True
+
+    # ---------- общее ----------
+    def _admit_now(self):
+        """Под замком: True — слот свободен, False — очередь полна, None — ждать."""
+        if self.in_flight < self.limit and not self.queued:
+            self.in_flight += 1
+            self._counts["admitted"] += 1
+            return True
+        if self.queued >= self.queue:
+            self._counts["shed_queue_full"] += 1
+            return False
+        return None
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                self.queued -= 1
+                if not waiter.done():
+                    waiter.set_result(True)
+                    self._counts["admitted"] += 1
+                    return
+            self.in_flight -= 1
+            self._free.notify()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit, "in_flight": self.in_flight,
+            "queued": self.queued, **self._counts,
+        }
+
+
+route_classes = {
+    name: RouteClass(name, **options)
+    for name, options in getattr(settings, "ADMISSION_CLASSES", {}).items()
+}
+metrics.register("admission", lambda: {
+    name: route.stats() for name, route in route_classes.items()
+})
+
+
+def get_route_class(request):
+    """RouteClass для маршрута запроса; None — маршрут без лимита."""
+    try:
+        match = resolve(request.path_info, getattr(request, "urlconf", None))
+    except Resolver404:
+        return route_classes.get(DEFAULT_CLASS)
+
+    name = DEFAULT_CLASS
+    view_cls = getattr(match.func, "cls", None)
+    actions = getattr(match.func, "actions", None)
+    action = actions.get(request.method.lower()) if actions else None
+    if view_cls is not None and action is not None:
+        handler = getattr(view_cls, action, None)
+        name = getattr(handler, "admission_class", None) or getattr(
+            view_cls, "admission_classes", {}
+        ).get(action, DEFAULT_CLASS)
+    return route_classes.get(name, route_classes.get(DEFAULT_CLASS))
+
+
+class AdmissionControlMiddleware:
+    """Пускает запрос, если у его класса есть слот; иначе 503."""
+
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        route = get_route_class(request) if route_classes else None
+        if route is None:
+            return self.get_response(request)
+        if not route.acquire():
+            return self._shed(route)
+        try:
+            return self.get_response(request)
+        finally:
+            route.release()
+
+    async def __acall__(self, request):
+        route = get_route_class(request) if route_classes else None
+        if route is None:
+            return await self.get_response(request)
+        if not await route.aacquire():
+            return self._shed(route)
+        try:
+            return await self.get_response(request)
+        finally:
+            route.release()
+
+    @staticmethod
+    def _shed(route):
+        response = JsonResponse(
+            {"detail": "Сервер перегружен, повторите запрос позже."}, status=503,
+            json_dumps_params={"ensure_ascii": False},
+        )
+        response["Retry-After"] = str(route.retry_after)
+        response["Cache-Control"] = "no-store"
+        return response
@@ -0,0 +1,110 @@
+# utils/asyncviews.py
+"""
+Async-путь для горячих read-only action-ов вьюсетов DRF под ASGI.
+
+DRF синхронный: под ASGI каждая его вьюха уходит в поток через
+sync_to_async, и на каждый запрос приходится переход «цикл → поток →
+цикл». Миксин даёт выбранным action-ам настоящий async-обработчик:
+
+    class RecipeViewSet(AsyncActionsMixin, viewsets.ModelViewSet):
+        async_actions = ("list", "retrieve")
+
+        async def alist(self, request, *args, **kwargs): ...
+
+Маршрут с таким action-ом получает async-вьюху, которая повторяет
+APIView.dispatch: аутентификация — через aauthenticate() аутентификатора
+(если есть, иначе в потоке), права и согласование формата — как в DRF
+(без БД), обработчик — a<action>, рендеринг — сразу в цикле. Остальные
+методы того же маршрута (POST на /recipes/) идут прежней sync-вьюхой.
+
+Внутри a<action> к БД — только через async ORM (aget, afirst, async for)
+или явный sync_to_async: синхронный запрос из цикла Django запрещает.
+
+ASYNC_VIEWS=False выключает всё — вьюсеты целиком sync, как раньше.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.decorators import classonlymethod
+from rest_framework import exceptions
+
+
+class AsyncActionsMixin:
+    """Async-обработчики a<action> для action-ов из async_actions."""
+
+    async_actions: tuple = ()
+
+    @classonlymethod
+    def as_view(cls, actions=None, **initkwargs):
+        sync_view = super().as_view(actions, **initkwargs)
+        if not settings.ASYNC_VIEWS or not set(actions.values()) & set(cls.async_actions):
+            return sync_view
+        thread_view = sync_to_async(sync_view)
+
+        async def view(request, *args, **kwargs):
+            method = request.method.lower()
+            action = actions.get(method) or (actions.get("get") if method == "head" else None)
+            if action not in cls.async_actions:
+                return await thread_view(request, *args, **kwargs)
+
+            self = cls(**initkwargs)
+            self.action_map = actions
+            for name, handler in actions.items():
+                setattr(self, name, getattr(self, handler))
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, *args, **kwargs)
+
+        # cls / actions / csrf_exempt нужны роутеру, CSRF и utils.querybudget
+        functools.update_wrapper(view, sync_view)
+        del view.__wrapped__
+        return view
+
+    async def adispatch(self, request, *args, **kwargs):
+        """APIView.dispatch для async-обработчика."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.aperform_authentication(request)
+            self.initial(request, *args, **kwargs)
+            response = await getattr(self, f"a{self.action}")(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        response = self.finalize_response(request, response, *args, **kwargs)
+        response.render()
+
+        # под ASGI Django вызвал бы render() ещё раз через sync_to_async —
+        # лишний переход в поток ради готового ответа; под WSGI (manage.py
+        # runserver, тестовый клиент) render() зовётся синхронно — не трогаем
+        if isinstance(request._request, ASGIRequest):
+            async def rendered():
+                return response
+            response.render = rendered
+        self.response = response
+        return response
+
+    async def aperform_authentication(self, request):
+        """Request._authenticate, но аутентификаторы — без блокировки цикла."""
+        for authenticator in request.authenticators:
+            aauthenticate = getattr(authenticator, "aauthenticate", None)
+            try:
+                if aauthenticate is not None:
+                    user_auth = await aauthenticate(request)
+                else:
+                    user_auth = await sync_to_async(authenticator.authenticate)(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+            if user_auth is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth
+                return
+        request._not_authenticated()
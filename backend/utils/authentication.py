@@ -0,0 +1,110 @@
+# utils/authentication.py
+"""
+Аутентификация API.
+
+SignedTokenAuthentication — подписанные токены с истечением срока:
+в токене только id пользователя и его «поколение токенов», поэтому
+проверка не ходит в таблицу authtoken_token. Отзыв (logout, смена
+пароля) — это инкремент User.token_version.
+
+Права (is_active, is_staff, is_superuser) в токен не зашиты: они
+читаются вместе с версией из небольшого кеша процесса с коротким TTL.
+Деактивация или снятие прав в админке действует не позже чем через
+SIGNED_TOKEN_REVOCATION_TTL секунд, а не через срок жизни токена.
+
+Старые 40-символьные ключи из authtoken_token работают через обычный
+TokenAuthentication до перелогина, но не дольше SIGNED_TOKEN_MAX_AGE
+с момента выпуска (users/migrations/0003 отсчитывает его от переезда);
+просроченный ключ удаляется.
+
+Выпуск, отзыв и кеш версий — в utils/tokens.py (без DRF: им пользуются
+модели и маршрутизатор БД).
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import authentication, exceptions
+
+from .tokens import AUTH_USER_FIELDS, TOKEN_SALT, token_versions
+from .tracing import span
+
+
+class TokenAuthentication(authentication.TokenAuthentication):
+    """
+    Стандартная токен-аутентификация DRF + span на поиск токена в БД
+    и срок жизни: ключ старше SIGNED_TOKEN_MAX_AGE удаляется.
+    """
+
+    def authenticate_credentials(self, key):
+        with span("auth.token_lookup"):
+            user, token = super().authenticate_credentials(key)
+        age = (timezone.now() - token.created).total_seconds()
+        if age > settings.SIGNED_TOKEN_MAX_AGE:
+            token.delete()
+            raise exceptions.AuthenticationFailed("Срок действия токена истёк.")
+        return user, token
+
+
+class SignedTokenAuthentication(TokenAuthentication):
+    """`Authorization: Token <подписанный токен>` без запроса к БД."""
+
+    def authenticate_credentials(self, key):
+        # старый ключ из authtoken_token — без «:»
+        if ":" not in key:
+            return super().authenticate_credentials(key)
+
+        with span("auth.token_verify"):
+            payload = self._unsign(key)
+            return self._user(payload, token_versions.get(payload["id"])), key
+
+    async def aauthenticate(self, request):
+        """
+        authenticate() для async-вьюх: версия токена — через async ORM,
+        старые ключи authtoken_token — через поток, как раньше.
+        """
+        # разбор заголовка и сообщения — как в TokenAuthentication.authenticate
+        auth = authentication.get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) == 1:
+            raise exceptions.AuthenticationFailed(
+                _("Invalid token header. No credentials provided."))
+        if len(auth) > 2:
+            raise exceptions.AuthenticationFailed(
+                _("Invalid token header. Token string should not contain spaces."))
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                _("Invalid token header. Token string should not contain invalid characters."))
+
+        if ":" not in key:
+            return await sync_to_async(super().authenticate_credentials)(key)
+        with span("auth.token_verify"):
+            payload = self._unsign(key)
+            return self._user(payload, await token_versions.aget(payload["id"])), key
+
+    @staticmethod
+    def _unsign(key) -> dict:
+        try:
+            return signing.TimestampSigner(salt=TOKEN_SALT).unsign_object(
+                key, max_age=settings.SIGNED_TOKEN_MAX_AGE
+            )
+        except signing.SignatureExpired:
+            raise exceptions.AuthenticationFailed("Срок действия токена истёк.")
+        except signing.BadSignature:
+            raise exceptions.AuthenticationFailed("Недействительный токен.")
+
+    @staticmethod
+    def _user(payload, row):
+        if row is None or row[0] != payload["ver"]:
+            raise exceptions.AuthenticationFailed("Токен отозван.")
+        # «частичный» пользователь: остальные поля догрузятся при обращении
+        # (from_db ждёт значения в порядке concrete_fields модели)
+        values = dict(zip(AUTH_USER_FIELDS, row), id=payload["id"], is_active=True)
+        User = get_user_model()
+        names = [f.attname for f in User._meta.concrete_fields if f.attname in values]
+        return User.from_db(User.objects.db, names, [values[name] for name in names])
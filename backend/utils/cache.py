@@ -0,0 +1,261 @@
+# utils/cache.py
+"""
+Двухуровневый кеш с инвалидацией по тегам.
+
+    from utils.cache import cache
+
+    data = cache.get_or_set(
+        f"recipe:{pk}:row", lambda: load(pk), tags=[f"recipe:{pk}"]
+    )
+    cache.invalidate(f"recipe:{pk}")
+
+Уровни:
+
+1. LRU процесса (CACHE_LOCAL_MAXSIZE записей) — без сериализации и сети,
+   запись живёт не дольше CACHE_LOCAL_TTL секунд;
+2. общий кеш Django (settings.CACHES["default"]: Redis или файлы) — один на
+   все воркеры, запись живёт CACHE_TIMEOUT секунд.
+
+Теги версионируются: в общем кеше лежит `tag:<имя>` → токен, запись помнит
+токены своих тегов на момент вычисления. invalidate() выдаёт тегу новый
+токен — все записи с ним становятся промахами, перебирать ключи не нужно.
+Токены читаются до вычисления, поэтому запись, посчитанная параллельно с
+инвалидацией, сразу считается устаревшей.
+
+Сброс тега виден в общем кеше сразу, в LRU своего процесса — тоже; LRU
+других воркеров может отдавать старое значение до CACHE_LOCAL_TTL секунд
+(как кеш версий токенов в utils/authentication.py).
+
+Single-flight: одновременные промахи по одному ключу в процессе ждут
+одного вычисления (замок на ключ), между процессами — флаг `lock:<ключ>`
+в общем кеше: проигравшие ждут до FLIGHT_WAIT секунд, пока победитель
+положит значение, потом считают сами.
+
+Значения отдаются как есть, без копирования: изменять их нельзя.
+Счётчики — в /api/metrics/ под именем "cache".
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics
+from .tracing import span
+
+MISSING = object()
+
+# сколько проигравший single-flight ждёт чужого вычисления, и как часто смотрит
+FLIGHT_WAIT = 2.0
+FLIGHT_POLL = 0.05
+
+
+class TieredCache:
+    def __init__(self, alias="default", local_maxsize=10_000, local_ttl=5.0, timeout=300):
+        self.alias = alias
+        self.local_maxsize = local_maxsize
+        self.local_ttl = local_ttl
+        self.timeout = timeout
+        # ключ → (значение, {тег: токен}, истекает)
+        self._local: OrderedDict = OrderedDict()
+        # тег → последний известный процессу токен (для проверки LRU)
+        self._tags: dict = {}
+        self._flights: dict = {}
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(
+            ("local_hits", "shared_hits", "misses", "stale", "evictions",
+             "coalesced", "invalidations"), 0,
+        )
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    # ---------- чтение ----------
+    def get_or_set(self, key: str, compute, tags=(), timeout=None):
+        """Значение по ключу; на промахе — compute() (один на ключ)."""
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+
+        with self._flight(key) as first:
+            if not first:
+                # ждали соседний поток — он уже положил значение
+                value = self.get(key, count=False)
+                if value is not MISSING:
+                    self._count("coalesced")
+                    return value
+            return self._compute(key, compute, tags, timeout)
+
+    def get(self, key: str, count=True):
+        value = self.get_local(key, count)
+        if value is not MISSING:
+            return value
+
+        with span("cache.get", key=key):
+            entry = self.shared.get(key)
+            if entry is not None:
+                value, versions = entry
+                current = self._tag_tokens(versions)
+                if current == versions:
+                    self._remember(key, value, versions)
+                    if count:
+                        self._count("shared_hits")
+                    return value
+                if count:
+                    self._count("stale")
+        if count:
+            self._count("misses")
+        return MISSING
+
+    def get_local(self, key: str, count=True):
+        """
+        Только LRU процесса — без I/O, можно звать прямо из event loop
+        (async-вьюхи, utils/asyncviews.py). Промах — MISSING.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return MISSING
+            value, versions, expires = entry
+            if expires > now and all(
+                self._tags.get(tag) == token for tag, token in versions.items()
+            ):
+                self._local.move_to_end(key)
+                if count:
+                    self._counts["local_hits"] += 1
+                return value
+            del self._local[key]
+        return MISSING
+
+    async def aget_or_set(self, key: str, compute, tags=(), timeout=None):
+        """
+        get_or_set для async-вьюх: попадание в LRU — без переходов в поток,
+        промах — обычный get_or_set в потоке (общий кеш и compute синхронные).
+        """
+        value = self.get_local(key)
+        if value is not MISSING:
+            return value
+        return await sync_to_async(self.get_or_set)(key, compute, tags, timeout)
+
+    def _compute(self, key, compute, tags, timeout):
+        lock_key = f"lock:{key}"
+        owner = self.shared.add(lock_key, 1, timeout=FLIGHT_WAIT * 5)
+        if not owner:
+            # считает другой воркер: ждём его результата
+            deadline = time.monotonic() + FLIGHT_WAIT
+            while time.monotonic() < deadline:
+                time.sleep(FLIGHT_POLL)
+                value = self.get(key, count=False)
+                if value is not MISSING:
+                    self._count("coalesced")
+                    return value
+        try:
+            # токены — до вычисления: инвалидация во время compute() не потеряется
+            versions = self._tag_tokens(tags, create=True)
+            value = compute()
+            self.shared.set(key, (value, versions), timeout or self.timeout)
+            self._remember(key, value, versions)
+            return value
+        finally:
+            if owner:
+                self.shared.delete(lock_key)
+
+    # ---------- инвалидация ----------
+    def invalidate(self, *tags: str):
+        """Сбрасывает все записи с любым из тегов (во всех воркерах)."""
+        if not tags:
+            return
+        tokens = {f"tag:{tag}": time.time_ns() for tag in tags}
+        self.shared.set_many(tokens, timeout=None)
+        with self._lock:
+            for tag in tags:
+                self._tags[tag] = tokens[f"tag:{tag}"]
+            self._counts["invalidations"] += len(tags)
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+            self._tags.clear()
+
+    # ---------- служебное ----------
+    def _tag_tokens(self, tags, create=False) -> dict:
+        """Текущие токены тегов из общего кеша; create — завести недостающие."""
+        tags = list(tags)
+        if not tags:
+            return {}
+        stored = self.shared.get_many([f"tag:{tag}" for tag in tags])
+        tokens = {tag: stored.get(f"tag:{tag}") for tag in tags}
+        if create:
+            # без токена запись пережила бы вытеснение тега из общего кеша
+            for tag in tags:
+                if tokens[tag] is None:
+                    token = time.time_ns()
+                    if not self.shared.add(f"tag:{tag}", token, timeout=None):
+                        token = self.shared.get(f"tag:{tag}")
+                    tokens[tag] = token
+        with self._lock:
+            self._tags.update(tokens)
+        return tokens
+
+    def _remember(self, key, value, versions):
+        with self._lock:
+            self._local[key] = (value, versions, time.monotonic() + self.local_ttl)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_maxsize:
+                self._local.popitem(last=False)
+                self._counts["evictions"] += 1
+
+    def _flight(self, key):
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+            flight.waiters += 1
+        return _FlightGuard(self, key, flight)
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def stats(self) -> dict:
+        return {"local_size": len(self._local), **self._counts}
+
+
+class _Flight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.waiters = 0
+        self.done = False
+
+
+class _FlightGuard:
+    """with-блок single-flight: as → True, если вычисляет этот поток."""
+
+    def __init__(self, cache, key, flight):
+        self.cache, self.key, self.flight = cache, key, flight
+
+    def __enter__(self) -> bool:
+        self.flight.lock.acquire()
+        return not self.flight.done
+
+    def __exit__(self, *exc):
+        flight = self.flight
+        # при исключении следующий ожидающий попробует сам
+        flight.done = exc[0] is None
+        flight.lock.release()
+        with self.cache._lock:
+            flight.waiters -= 1
+            if not flight.waiters:
+                self.cache._flights.pop(self.key, None)
+
+
+cache = TieredCache(
+    local_maxsize=settings.CACHE_LOCAL_MAXSIZE,
+    local_ttl=settings.CACHE_LOCAL_TTL,
+    timeout=settings.CACHE_TIMEOUT,
+)
+metrics.register("cache", cache.stats)
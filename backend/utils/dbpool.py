@@ -0,0 +1,45 @@
+# utils/dbpool.py
+"""
+Метрики пула соединений psycopg 3 (DATABASES[...]["OPTIONS"]["pool"]).
+
+Пул у Django свой на каждый процесс, поэтому и счётчики — на воркер.
+"""
+from django.db import connections
+
+from . import metrics
+
+
+def pool_stats() -> dict:
+    """alias → счётчики пула; для алиасов без пула — mode=persistent."""
+    stats = {}
+    for conn in connections.all():
+        pool = getattr(conn, "pool", None)
+        if pool is None:
+            stats[conn.alias] = {
+                "mode": "persistent",
+                "conn_max_age": conn.settings_dict["CONN_MAX_AGE"],
+            }
+            continue
+
+        raw = pool.get_stats()
+        stats[conn.alias] = {
+            "mode": "pool",
+            "max_size": raw.get("pool_max", 0),
+            "size": raw.get("pool_size", 0),
+            "available": raw.get("pool_available", 0),
+            # выдачи соединения из пула
+            "checkouts": raw.get("requests_num", 0),
+            # выдачи, которым пришлось ждать свободное соединение
+            "waits": raw.get("requests_queued", 0),
+            "wait_ms": raw.get("requests_wait_ms", 0),
+            # не дождались за OPTIONS.pool.timeout → PoolTimeout
+            "timeouts": raw.get("requests_errors", 0),
+            "waiting_now": raw.get("requests_waiting", 0),
+            "connections_opened": raw.get("connections_num", 0),
+            "connections_lost": raw.get("connections_lost", 0),
+            "connections_errors": raw.get("connections_errors", 0),
+        }
+    return stats
+
+
+metrics.register("db_pool", pool_stats)
@@ -0,0 +1,132 @@
+# utils/dbrouter.py
+"""
+Маршрутизация чтений на реплики Postgres.
+
+* запись — всегда в default (primary);
+* чтение в безопасных запросах (GET/HEAD/OPTIONS) — на случайную реплику
+  из settings.DATABASE_REPLICAS;
+* read-your-writes: после успешного POST/PATCH/PUT/DELETE клиент
+  REPLICA_STICKY_SECONDS читает из primary, чтобы не увидеть реплику,
+  отстающую от собственной записи. Клиент помечается подписанной cookie
+  и — если запрос с подписанным токеном — флагом `dbrouter:primary:<id>`
+  в общем кеше: API-клиенты с токеном cookie обычно не хранят.
+
+Без настроенных реплик роутер всегда отвечает default.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+from .tokens import signed_token_user_id
+
+STICKY_COOKIE = "db_primary"
+STICKY_SALT = "utils.dbrouter.sticky"
+STICKY_KEY = "dbrouter:primary:{}"
+
+_pinned_to_primary: ContextVar[bool] = ContextVar("pinned_to_primary", default=False)
+
+
+@contextmanager
+def use_primary():
+    """Все чтения внутри блока — из primary."""
+    token = _pinned_to_primary.set(True)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+class ReplicaRouter:
+    """DATABASE_ROUTERS: чтения → реплики, запись и миграции → default."""
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, "DATABASE_REPLICAS", ())
+        if not replicas or _pinned_to_primary.get():
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # реплики — копии одной и той же базы
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """Закрепляет запрос за primary: для записи и недавно писавших клиентов."""
+
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.sticky_seconds = getattr(settings, "REPLICA_STICKY_SECONDS", 5)
+
+    def _has_cookie(self, request) -> bool:
+        return request.get_signed_cookie(
+            STICKY_COOKIE, default=None,
+            salt=STICKY_SALT, max_age=self.sticky_seconds,
+        ) is not None
+
+    @staticmethod
+    def _user_key(request):
+        """Ключ флага в общем кеше; None — без реплик или без подписанного токена."""
+        if not getattr(settings, "DATABASE_REPLICAS", ()):
+            return None
+        user_id = signed_token_user_id(request)
+        return None if user_id is None else STICKY_KEY.format(user_id)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        is_write = request.method not in SAFE_METHODS
+        user_key = self._user_key(request)
+        pinned = is_write or self._has_cookie(request) or (
+            user_key is not None and caches["default"].get(user_key) is not None
+        )
+        token = _pinned_to_primary.set(pinned)
+        try:
+            response = self.get_response(request)
+        finally:
+            _pinned_to_primary.reset(token)
+        if self._wrote(response, is_write) and user_key is not None:
+            caches["default"].set(user_key, 1, self.sticky_seconds)
+        return response
+
+    async def __acall__(self, request):
+        # contextvar копируется в потоки sync_to_async вместе с контекстом
+        is_write = request.method not in SAFE_METHODS
+        user_key = self._user_key(request)
+        pinned = is_write or self._has_cookie(request) or (
+            user_key is not None and await caches["default"].aget(user_key) is not None
+        )
+        token = _pinned_to_primary.set(pinned)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _pinned_to_primary.reset(token)
+        if self._wrote(response, is_write) and user_key is not None:
+            await caches["default"].aset(user_key, 1, self.sticky_seconds)
+        return response
+
+    def _wrote(self, response, is_write) -> bool:
+        """Успешная запись: ставит cookie; True — пометить и пользователя."""
+        if not is_write or response.status_code >= 400:
+            return False
+        response.set_signed_cookie(
+            STICKY_COOKIE, "1", salt=STICKY_SALT,
+            max_age=self.sticky_seconds, httponly=True, samesite="Lax",
+        )
+        return True
@@ -6,6 +6,8 @@ import uuid
 from django.core.files.base import ContentFile
 from rest_framework import serializers
 
+from .tracing import span
+
 
 class Base64ImageField(serializers.ImageField):
     """
@@ -32,16 +34,18 @@ class Base64ImageField(serializers.ImageField):
             if not data:
                 raise serializers.ValidationError("Пустая строка base64.")
 
-            # 3️⃣  Пробуем декодировать
-            try:
-                decoded_file = base64.b64decode(data, validate=True)
-            except (TypeError, ValueError, binascii.Error):
-                raise serializers.ValidationError("Невалидное изображение — не удалось декодировать base64.")
-
-            # 4️⃣  Определяем формат (imghdr смотрит по сигнатуре байтов)
-            file_format = imghdr.what(None, decoded_file)
-            if file_format == "jpg":
-                file_format = "jpeg"
+            with span("image.decode") as attrs:
+                # 3️⃣  Пробуем декодировать
+                try:
+                    decoded_file = base64.b64decode(data, validate=True)
+                except (TypeError, ValueError, binascii.Error):
+                    raise serializers.ValidationError("Невалидное изображение — не удалось декодировать base64.")
+
+                # 4️⃣  Определяем формат (imghdr смотрит по сигнатуре байтов)
+                file_format = imghdr.what(None, decoded_file)
+                if file_format == "jpg":
+                    file_format = "jpeg"
+                attrs.update(size=len(decoded_file), format=file_format)
             if file_format not in self.ALLOWED_TYPES:
                 raise serializers.ValidationError(f"Неподдерживаемый тип изображения: {file_format}")
 
@@ -52,6 +56,7 @@ class Base64ImageField(serializers.ImageField):
             data = ContentFile(decoded_file, name=file_name)
 
             # 7️⃣  Передаём «вверх» в стандартный ImageField для финальной валидации
-            return super().to_internal_value(data)
+            with span("image.verify"):
+                return super().to_internal_value(data)
 
         raise serializers.ValidationError("Неверный тип данных — ожидается файл либо строка base64.")
\ No newline at end of file
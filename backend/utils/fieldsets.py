@@ -0,0 +1,50 @@
+"""
+Разреженные наборы полей: ?fields=id,name и ?omit=text,ingredients.
+
+    GET /api/recipes/?fields=id,name,image
+    GET /api/users/?omit=is_subscribed
+
+fields оставляет только перечисленное, omit выкидывает перечисленное;
+вместе — сначала fields, потом omit. Порядок ключей в ответе остаётся
+порядком полей сериализатора, а не порядком в параметре. Неизвестное
+имя поля — 400, чтобы опечатка не превращалась молча в пустой ответ.
+
+Представления используют результат не только для фильтрации ключей, но
+и чтобы не строить ненужное: не аннотировать флаги, не ходить за
+подписками, не читать тяжёлые колонки.
+"""
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = "fields"
+OMIT_PARAM   = "omit"
+
+
+def _split(value: str) -> list[str]:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def requested_fields(request, available) -> tuple[str, ...]:
+    """
+    Поля из `available`, которые нужно отдать, в исходном порядке.
+    Без параметров — все `available`.
+    """
+    available = tuple(available)
+    params = request.query_params
+    wanted, omitted = set(available), set()
+    errors = {}
+
+    for param in (FIELDS_PARAM, OMIT_PARAM):
+        if param not in params:
+            continue
+        names = _split(params[param])
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            errors[param] = [f"Неизвестные поля: {', '.join(unknown)}."]
+        elif param == FIELDS_PARAM:
+            wanted = set(names)
+        else:
+            omitted = set(names)
+
+    if errors:
+        raise ValidationError(errors)
+    return tuple(name for name in available if name in wanted - omitted)
@@ -0,0 +1,24 @@
+# utils/metrics.py
+"""
+Счётчики процесса для мониторинга.
+
+Подсистемы регистрируют функцию-источник:
+
+    metrics.register("db_pool", pool_stats)
+
+а GET /api/metrics/ (только staff, app/views.py) отдаёт {имя: источник()}
+текущего воркера. Значения — накопительные с момента старта процесса.
+Модуль без DRF: регистрируются и модули, которые грузит сам DRF
+(utils/throttling.py).
+"""
+_sources = {}
+
+
+def register(name: str, source):
+    """Регистрирует источник метрик: callable без аргументов → dict."""
+    _sources[name] = source
+
+
+def collect() -> dict:
+    return {name: source() for name, source in _sources.items()}
+
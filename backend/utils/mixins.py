@@ -1,8 +1,55 @@
 from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
 
+from . import tracing
 from .fields import Base64ImageField
 
 class ImageMixin(serializers.Serializer):
     """Поле `avatar` для чтения/записи base64-картинки."""
     avatar = Base64ImageField(required=False, allow_null=True)
 
+
+
+class TracedRepresentationMixin(serializers.Serializer):
+    """
+    Разворачивает to_representation по полям, чтобы в трассировке был
+    отдельный span на каждое поле. Без активной трассы — обычный путь DRF.
+    """
+
+    def to_representation(self, instance):
+        if not tracing.is_enabled():
+            return super().to_representation(instance)
+
+        with tracing.span(f"serialize.{type(self).__name__}", pk=instance.pk):
+            ret = {}
+            for field in self._readable_fields:
+                with tracing.span(f"field.{field.field_name}"):
+                    try:
+                        attribute = field.get_attribute(instance)
+                    except SkipField:
+                        continue
+                    check_for_none = (
+                        attribute.pk if isinstance(attribute, PKOnlyObject)
+                        else attribute
+                    )
+                    ret[field.field_name] = (
+                        None if check_for_none is None
+                        else field.to_representation(attribute)
+                    )
+            return ret
+
+
+class SparseFieldsetMixin(serializers.Serializer):
+    """
+    Оставляет только поля из context["fields"] (см. utils/fieldsets.py).
+    Нет ключа в контексте — сериализатор целиком, как обычно.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        wanted = self.context.get("fields")
+        if wanted is None:
+            return
+        for name in set(self.fields) - set(wanted):
+            self.fields.pop(name)
@@ -0,0 +1,52 @@
+"""
+Мульти-запрос по списку id: GET /api/recipes/?ids=3,1,2
+
+Вместо N запросов /api/recipes/{id}/ клиент получает всё одним ответом
+за постоянное число SQL-запросов. Ответ не пагинируется:
+
+    {"count": 2, "results": [{...id 3...}, null, {...id 2...}], "missing": [1]}
+
+results идут в порядке ids (повторы схлопываются), на месте
+ненайденного — null, сами такие id — в missing. Ненайденным считается и
+то, что отсекли остальные фильтры запроса (author, is_favorited, …).
+"""
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+IDS_PARAM = "ids"
+
+
+def requested_ids(request, param: str = IDS_PARAM, max_ids: int | None = None) -> list[int] | None:
+    """
+    id из ?ids= (или другого параметра) без повторов, в исходном порядке;
+    None — параметра нет. Лимит по умолчанию — MULTI_GET_MAX_IDS.
+    """
+    if param not in request.query_params:
+        return None
+    max_ids = max_ids or settings.MULTI_GET_MAX_IDS
+
+    ids = []
+    for chunk in request.query_params[param].split(","):
+        chunk = chunk.strip()
+        if not chunk:
+            continue
+        if not chunk.isdigit():
+            raise ValidationError({param: [f"Некорректный id: {chunk}."]})
+        ids.append(int(chunk))
+    ids = list(dict.fromkeys(ids))
+
+    if not ids:
+        raise ValidationError({param: ["Пустой список id."]})
+    if len(ids) > max_ids:
+        raise ValidationError({param: [f"Не больше {max_ids} id за запрос."]})
+    return ids
+
+
+def multi_get_response(ids, found: dict) -> Response:
+    """Ответ мульти-запроса; found — id → готовое представление."""
+    return Response({
+        "count": len(found),
+        "results": [found.get(pk) for pk in ids],
+        "missing": [pk for pk in ids if pk not in found],
+    })
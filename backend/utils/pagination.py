@@ -1,3 +1,5 @@
+from django.core.paginator import InvalidPage
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 
 # ──────────────────────────── pagination -------------------------------------
@@ -5,4 +7,29 @@ class CustomPage(PageNumberPagination):
     page_size = 6
     page_size_query_param = "limit"
     max_page_size = 100
-    page_query_param = "page"
\ No newline at end of file
+    page_query_param = "page"
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset для async-вьюх (utils/asyncviews.py): COUNT и
+        страница — через async ORM, дальше get_paginated_response как обычно.
+        """
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()      # cached_property
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+        self.page.object_list = [item async for item in self.page.object_list]
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        return list(self.page)
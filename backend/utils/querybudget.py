@@ -0,0 +1,166 @@
+# utils/querybudget.py
+"""
+Детектор N+1 для режима разработки/тестов.
+
+Middleware собирает все SQL-запросы одного HTTP-запроса, группирует их
+по «форме» (литералы заменены на ?) и сравнивает количество с бюджетом,
+объявленным на action вьюсета:
+
+    class RecipeViewSet(viewsets.ModelViewSet):
+        query_budgets = {"list": 6, "retrieve": 5}
+
+        @query_budget(3)
+        @action(...)
+        def download_shopping_cart(self, request): ...
+
+Режим задаётся настройкой QUERY_BUDGET_MODE: "off", "warn" или "raise".
+"""
+import logging
+import re
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "warn", "raise")
+
+# литералы и списки параметров → «?», чтобы одинаковые запросы склеивались
+_STRING_RE  = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE  = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACES_RE  = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Action выполнил больше запросов, чем разрешено его бюджетом."""
+
+
+def query_budget(limit: int):
+    """Декоратор: объявляет бюджет запросов для action вьюсета."""
+    def decorator(func):
+        func.query_budget = limit
+        return func
+    return decorator
+
+
+def normalize_sql(sql: str) -> str:
+    """Приводит SQL к «форме» без конкретных значений."""
+    shape = _STRING_RE.sub("?", sql)
+    shape = shape.replace("%s", "?")
+    shape = _NUMBER_RE.sub("?", shape)
+    shape = _IN_LIST_RE.sub("(...)", shape)
+    return _SPACES_RE.sub(" ", shape).strip()
+
+
+class QueryCollector:
+    """execute_wrapper, который складывает формы запросов в Counter."""
+
+    def __init__(self):
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.shapes[normalize_sql(sql)] += 1
+        return execute(sql, params, many, context)
+
+    @property
+    def total(self) -> int:
+        return sum(self.shapes.values())
+
+    def repeated(self, threshold: int = 2) -> list[tuple[str, int]]:
+        """Формы, выполненные threshold и более раз (признак N+1)."""
+        return [
+            (shape, count) for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+
+def get_view_budget(request):
+    """Возвращает (имя action, бюджет) для вьюсета текущего запроса."""
+    match = getattr(request, "resolver_match", None)
+    view_cls = getattr(match.func, "cls", None) if match else None
+    actions = getattr(match.func, "actions", None) if match else None
+    if view_cls is None or not actions:
+        return None, None
+
+    action = actions.get(request.method.lower())
+    if action is None:
+        return None, None
+
+    handler = getattr(view_cls, action, None)
+    budget = getattr(handler, "query_budget", None)
+    if budget is None:
+        budget = getattr(view_cls, "query_budgets", {}).get(action)
+    return f"{view_cls.__name__}.{action}", budget
+
+
+def _wrap_connections(stack, wrapper):
+    for conn in connections.all():
+        stack.enter_context(conn.execute_wrapper(wrapper))
+
+
+class QueryBudgetMiddleware:
+    """Считает SQL на запрос и сверяет с бюджетом action."""
+
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.mode = getattr(settings, "QUERY_BUDGET_MODE", "off")
+        if self.mode not in MODES:
+            raise ValueError(f"QUERY_BUDGET_MODE должен быть одним из {MODES}")
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if self.mode == "off":
+            return self.get_response(request)
+
+        collector = QueryCollector()
+        with ExitStack() as stack:
+            _wrap_connections(stack, collector)
+            response = self.get_response(request)
+        return self._finish(request, response, collector)
+
+    async def __acall__(self, request):
+        if self.mode == "off":
+            return await self.get_response(request)
+
+        # соединения у каждого потока свои: обёртки ставим в том потоке,
+        # где async ORM выполнит запросы этого HTTP-запроса
+        collector = QueryCollector()
+        stack = ExitStack()
+        await sync_to_async(_wrap_connections)(stack, collector)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self._finish(request, response, collector)
+
+    def _finish(self, request, response, collector):
+        response["X-Query-Count"] = str(collector.total)
+        self._check(request, collector)
+        return response
+
+    def _check(self, request, collector):
+        view_name, budget = get_view_budget(request)
+        if budget is None or collector.total <= budget:
+            return
+
+        lines = [
+            f"{view_name}: {collector.total} SQL-запросов при бюджете {budget} "
+            f"({request.method} {request.path})"
+        ]
+        for shape, count in collector.repeated():
+            lines.append(f"  ×{count}  {shape[:200]}")
+        message = "\n".join(lines)
+
+        if self.mode == "raise":
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
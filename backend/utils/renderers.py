@@ -0,0 +1,64 @@
+# utils/renderers.py
+"""
+JSON-рендерер и парсер API на orjson.
+
+Вывод байт-в-байт совпадает со стандартным JSONRenderer DRF (компактный
+UTF-8, экранирование U+2028/U+2029); всё, что orjson не умеет сам —
+Decimal, lazy-строки, datetime в формате DRF, — отдаётся штатному
+rest_framework.utils.encoders.JSONEncoder. Отступы (browsable API)
+и ensure_ascii обрабатывает стандартный путь DRF.
+"""
+import orjson
+from django.conf import settings
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.utils.encoders import JSONEncoder
+
+from .tracing import span
+
+# datetime — через encoder DRF (миллисекунды, «Z» вместо +00:00)
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+_LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+
+
+_default = JSONEncoder().default
+
+
+def dumps(data) -> bytes:
+    content = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+    # как и DRF, экранируем разделители строк, недопустимые в JS
+    for raw, escaped in _LINE_SEPARATORS:
+        if raw in content:
+            content = content.replace(raw, escaped)
+    return content
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """JSONRenderer на orjson; время кодирования видно в трассировке."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with span("render.json") as attrs:
+            indent = self.get_indent(accepted_media_type, renderer_context or {})
+            if data is None or indent is not None or self.ensure_ascii or not self.compact:
+                content = super().render(data, accepted_media_type, renderer_context)
+            else:
+                content = dumps(data)
+            attrs["http.response_content_length"] = len(content)
+            return content
+
+
+class JSONParser(parsers.JSONParser):
+    """JSONParser на orjson (тело в UTF-8; иначе — стандартный путь)."""
+    renderer_class = JSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if encoding.lower().replace("-", "") != "utf8" or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
@@ -0,0 +1,173 @@
+# utils/throttling.py
+"""
+Ограничение частоты запросов: token bucket в общей памяти воркеров.
+
+Лимиты — на action, как query_budgets:
+
+    class RecipeViewSet(viewsets.ModelViewSet):
+        throttle_scopes = {"favorite": "favorite", "create": "recipe_write"}
+
+    class TokenCreateView(APIView):
+        throttle_scope = "login"
+
+Ставки — REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] в формате DRF
+("30/min": ёмкость 30, пополнение 30 в минуту). Без ставки scope не
+ограничен. Ключ ведра — пользователь, для анонимных — IP (get_ident,
+с учётом NUM_PROXIES).
+
+Вёдра — в таблице фиксированного размера в разделяемой памяти
+(mmap файла THROTTLE_SHM_PATH, обычно в /dev/shm): её видят все воркеры
+gunicorn одного хоста, проверка — O(1): хеш ключа → окно из PROBES
+ячеек, одна запись. Ячейка хранит не число жетонов, а «теоретическое
+время прибытия» (GCRA) — одно число, без отдельного таймера пополнения.
+Между процессами ячейки защищает fcntl-блокировка диапазона, внутри
+процесса — threading.Lock.
+
+Общий кеш (utils/cache.py) для этого не подходит: файловый бэкенд не
+умеет атомарных операций. Лимиты — на хост: за балансировщиком с k
+хостами клиент получит до k× ставки.
+
+Ответ несёт X-RateLimit-Limit / -Remaining / -Reset (секунд до полного
+ведра), отказ — 429 с Retry-After.
+"""
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from . import metrics
+
+# отпечаток ключа (0 — пустая ячейка) и время, когда ведро снова полное
+SLOT = struct.Struct("<Qd")
+PROBES = 4
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """"30/min" → (30, 60)."""
+    count, period = rate.split("/")
+    return int(count), PERIODS[period[0]]
+
+
+class SharedBuckets:
+    """Таблица GCRA-вёдер в разделяемой памяти."""
+
+    def __init__(self, path, slots):
+        self.path = path
+        self.slots = slots
+        self._map = None
+        self._fd = None
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(("allowed", "throttled", "evictions"), 0)
+
+    def _open(self):
+        # лениво: таблица нужна только процессам, которые обслуживают запросы
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = self.slots * SLOT.size
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        self._map = mmap.mmap(fd, size)
+        self._fd = fd
+
+    def take(self, key: str, count: int, period: float):
+        """
+        Берёт жетон из ведра key (ёмкость count, пополнение за period).
+        → (разрешено, осталось жетонов, ждать секунд, секунд до полного).
+        """
+        interval = period / count
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        fingerprint = int.from_bytes(digest, "little") or 1
+        first = fingerprint % self.slots
+
+        with self._lock:
+            if self._map is None:
+                self._open()
+            # окно ячеек — последние PROBES перед концом таблицы не заворачиваются
+            first = min(first, self.slots - PROBES)
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, PROBES * SLOT.size, first * SLOT.size)
+            try:
+                now = time.time()
+                slot, tat = self._find(first, fingerprint, now)
+                new_tat = max(tat, now) + interval
+                if new_tat - now > period:
+                    self._counts["throttled"] += 1
+                    return False, 0, new_tat - now - period, tat - now
+                SLOT.pack_into(self._map, slot * SLOT.size, fingerprint, new_tat)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, PROBES * SLOT.size, first * SLOT.size)
+            self._counts["allowed"] += 1
+        remaining = int((period - (new_tat - now)) / interval)
+        return True, remaining, 0.0, new_tat - now
+
+    def _find(self, first, fingerprint, now):
+        """Ячейка ключа в окне; нет — свободная, полная или самая старая."""
+        free = oldest = None
+        oldest_tat = math.inf
+        for slot in range(first, first + PROBES):
+            stored, tat = SLOT.unpack_from(self._map, slot * SLOT.size)
+            if stored == fingerprint:
+                return slot, tat
+            if free is None and (not stored or tat <= now):
+                free = slot                 # полное ведро = пустая ячейка
+            if tat < oldest_tat:
+                oldest, oldest_tat = slot, tat
+        if free is not None:
+            return free, now
+        # окно занято активными вёдрами — вытесняем ближайшее к полному
+        self._counts["evictions"] += 1
+        return oldest, now
+
+    def stats(self) -> dict:
+        return {"slots": self.slots, **self._counts}
+
+
+buckets = SharedBuckets(settings.THROTTLE_SHM_PATH, settings.THROTTLE_SLOTS)
+metrics.register("throttle", buckets.stats)
+
+
+def get_scope(view):
+    """throttle_scope вьюхи или throttle_scopes[action] вьюсета."""
+    scope = getattr(view, "throttle_scope", None)
+    if scope is None:
+        scope = getattr(view, "throttle_scopes", {}).get(getattr(view, "action", None))
+    return scope
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Throttle DRF поверх SharedBuckets: пользователь или IP на scope."""
+
+    def __init__(self):
+        self.rates = api_settings.DEFAULT_THROTTLE_RATES
+        self.retry_after = None
+
+    def allow_request(self, request, view):
+        scope = get_scope(view)
+        rate = self.rates.get(scope) if scope else None
+        if rate is None:
+            return True
+
+        count, period = parse_rate(rate)
+        if request.user and request.user.is_authenticated:
+            ident = f"user:{request.user.pk}"
+        else:
+            ident = f"ip:{self.get_ident(request)}"
+        allowed, remaining, wait, reset = buckets.take(f"{scope}:{ident}", count, period)
+
+        # finalize_response допишет их и в ответ, и в 429
+        view.headers["X-RateLimit-Limit"] = str(count)
+        view.headers["X-RateLimit-Remaining"] = str(remaining)
+        view.headers["X-RateLimit-Reset"] = str(math.ceil(reset))
+        self.retry_after = wait
+        return allowed
+
+    def wait(self):
+        return self.retry_after
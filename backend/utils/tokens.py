@@ -0,0 +1,118 @@
+# utils/tokens.py
+"""
+Подписанные токены API: выпуск, отзыв и кеш версий.
+
+Токен — {"id", "ver"}, подписанный TimestampSigner; отзыв — инкремент
+User.token_version. Проверку в запросе делает
+utils.authentication.SignedTokenAuthentication; здесь — то, что нужно и
+без DRF: модели (users/models.py), маршрутизатор БД (utils/dbrouter.py).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F
+
+TOKEN_SALT = "users.auth-token"
+
+# поля пользователя, которые читаем вместе с версией токена — хватает
+# для прав и фильтров; is_active не нужен: неактивные не находятся вовсе
+AUTH_USER_FIELDS = ("token_version", "email", "username", "is_staff", "is_superuser")
+
+
+class TokenVersionCache:
+    """
+    LRU user_id → (token_version, email, username, is_staff, is_superuser)
+    с TTL; общий на процесс.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 10_000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> tuple | None:
+        hit, row = self._cached(user_id)
+        if hit:
+            return row
+        # промах: одна выборка по PK; неактивный/удалённый пользователь → None.
+        # Только из primary: отстающая реплика «воскресила» бы отозванный токен
+        row = self._query(user_id).first()
+        self._store(user_id, row)
+        return row
+
+    async def aget(self, user_id: int) -> tuple | None:
+        """get() для async-вьюх (utils/asyncviews.py)."""
+        hit, row = self._cached(user_id)
+        if hit:
+            return row
+        row = await self._query(user_id).afirst()
+        self._store(user_id, row)
+        return row
+
+    def _cached(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._data.move_to_end(user_id)
+                return True, entry[0]
+        return False, None
+
+    @staticmethod
+    def _query(user_id):
+        return (
+            get_user_model().objects.using(DEFAULT_DB_ALIAS)
+            .filter(pk=user_id, is_active=True)
+            .values_list(*AUTH_USER_FIELDS)
+        )
+
+    def _store(self, user_id, row):
+        with self._lock:
+            self._data[user_id] = (row, time.monotonic() + self.ttl)
+            self._data.move_to_end(user_id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def forget(self, user_id: int):
+        with self._lock:
+            self._data.pop(user_id, None)
+
+
+token_versions = TokenVersionCache(ttl=settings.SIGNED_TOKEN_REVOCATION_TTL)
+
+
+def issue_token(user) -> str:
+    """Выпускает подписанный токен для пользователя."""
+    payload = {"id": user.pk, "ver": user.token_version}
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign_object(payload)
+
+
+def signed_token_user_id(request) -> int | None:
+    """
+    id пользователя из подписанного токена в заголовке — только подпись
+    и срок, без БД и проверки отзыва. Для маршрутизации (utils/dbrouter.py),
+    не для аутентификации.
+    """
+    auth = request.headers.get("Authorization", "").split()
+    if len(auth) != 2 or auth[0].lower() != "token" or ":" not in auth[1]:
+        return None
+    try:
+        return signing.TimestampSigner(salt=TOKEN_SALT).unsign_object(
+            auth[1], max_age=settings.SIGNED_TOKEN_MAX_AGE
+        )["id"]
+    except signing.BadSignature:
+        return None
+
+
+def revoke_tokens(user):
+    """Отзывает все выданные пользователю подписанные токены."""
+    get_user_model().objects.filter(pk=user.pk).update(
+        token_version=F("token_version") + 1
+    )
+    token_versions.forget(user.pk)
@@ -0,0 +1,273 @@
+# utils/tracing.py
+"""
+Лёгкая трассировка запросов без внешних зависимостей.
+
+Каждый HTTP-запрос — это trace из вложенных span-ов:
+    http.request
+      ├─ auth.token_lookup
+      ├─ view.get_queryset
+      ├─ db.query                (на каждый SQL)
+      ├─ serialize.RecipeReadSerializer
+      │    └─ field.<имя поля>
+      ├─ render.json
+      └─ image.decode / image.verify   (Base64ImageField)
+
+Span-ы отдаются экспортёру одной пачкой в конце запроса и пишутся в
+JSONL-файл (по строке на span, поля в духе OTLP) фоновым потоком:
+запрос и цикл событий под ASGI на диск не ждут. Идентификатор трассы берётся
+из заголовка X-Request-ID, который проставляет nginx.
+
+Включается настройкой TRACING_EXPORT_PATH; без неё все обёртки — no-op.
+"""
+import atexit
+import functools
+import hashlib
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_HEX32_RE = re.compile(r"^[0-9a-f]{32}$")
+
+# (trace_id, список законченных span-ов) текущего запроса
+_current_trace: ContextVar = ContextVar("current_trace", default=None)
+# span_id ближайшего открытого span-а — родитель для следующего
+_current_span_id: ContextVar = ContextVar("current_span_id", default=None)
+
+
+def is_enabled() -> bool:
+    return _current_trace.get() is not None
+
+
+def trace_id_from_header(value: str | None) -> str:
+    """
+    nginx $request_id — уже 32 hex-символа, как trace_id в OTLP.
+    Всё прочее приводим к этому формату хешем, пустое — генерируем.
+    """
+    if not value:
+        return uuid.uuid4().hex
+    value = value.strip().lower().replace("-", "")
+    if _HEX32_RE.match(value):
+        return value
+    return hashlib.sha256(value.encode()).hexdigest()[:32]
+
+
+# ──────────────────────────── spans ───────────────────────────────
+@contextmanager
+def span(name: str, **attributes):
+    """Открывает вложенный span; вне трассируемого запроса ничего не делает."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield attributes
+        return
+
+    trace_id, spans = trace
+    span_id = uuid.uuid4().hex[:16]
+    parent_id = _current_span_id.get()
+    token = _current_span_id.set(span_id)
+    start = time.time_ns()
+    status = "OK"
+    try:
+        yield attributes          # вызывающий может дописать атрибуты
+    except BaseException as exc:
+        status = "ERROR"
+        attributes["exception.type"] = type(exc).__name__
+        raise
+    finally:
+        _current_span_id.reset(token)
+        spans.append({
+            "trace_id": trace_id,
+            "span_id": span_id,
+            "parent_span_id": parent_id,
+            "name": name,
+            "start_time_unix_nano": start,
+            "end_time_unix_nano": time.time_ns(),
+            "status": status,
+            "attributes": attributes,
+        })
+
+
+def traced(name: str):
+    """Декоратор: оборачивает вызов функции/метода в span."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not is_enabled():
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _db_span(execute, sql, params, many, context):
+    with span("db.query", **{
+        "db.system": context["connection"].vendor,
+        "db.name": context["connection"].alias,
+        "db.statement": sql,
+        "db.many": many,
+    }):
+        return execute(sql, params, many, context)
+
+
+# ──────────────────────────── exporter ────────────────────────────
+class JsonlSpanExporter:
+    """
+    Дописывает span-ы в JSONL-файл. export() только кладёт список в
+    очередь; сериализация и запись — в потоке-писателе, всё накопленное
+    к этому моменту одним write. Поток запускается при первой выгрузке в
+    процессе: потоки мастера gunicorn (preload_app) в воркеры не переходят.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def export(self, spans: list[dict]):
+        if not spans:
+            return
+        self._ensure_writer()
+        self._queue.put(spans)
+
+    def flush(self, timeout: float = 5.0):
+        """Ждёт записи всего выгруженного до вызова (тесты, выход процесса)."""
+        if self._pid != os.getpid():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _ensure_writer(self):
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            # после fork очередь родителя никто не читает
+            self._queue = queue.SimpleQueue()
+            threading.Thread(
+                target=self._write_loop, args=(self._queue,),
+                name="span-exporter", daemon=True,
+            ).start()
+            atexit.register(self.flush)
+            self._pid = pid
+
+    def _write_loop(self, pending: queue.SimpleQueue):
+        while True:
+            batch = [pending.get()]
+            while True:
+                try:
+                    batch.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            payload = "".join(
+                json.dumps(s, ensure_ascii=False, default=str) + "\n"
+                for item in batch if isinstance(item, list) for s in item
+            )
+            if payload:
+                try:
+                    with self.path.open("a", encoding="utf-8") as fp:
+                        fp.write(payload)
+                except OSError:
+                    logger.exception("tracing: не удалось записать %s", self.path)
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+
+# ──────────────────────────── middleware ──────────────────────────
+class TracingMiddleware:
+    """Корневой span запроса + span на каждый SQL; выгрузка в экспортёр."""
+
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        path = getattr(settings, "TRACING_EXPORT_PATH", None)
+        self.exporter = JsonlSpanExporter(path) if path else None
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if self.exporter is None:
+            return self.get_response(request)
+
+        trace_id, spans, trace_token = self._start(request)
+        try:
+            with span("http.request", **self._attributes(request)) as attrs, ExitStack() as stack:
+                _wrap_connections(stack)
+                response = self.get_response(request)
+                self._finish_attributes(request, response, attrs)
+        finally:
+            _current_trace.reset(trace_token)
+            self.exporter.export(spans)
+
+        response["X-Request-ID"] = trace_id
+        return response
+
+    async def __acall__(self, request):
+        if self.exporter is None:
+            return await self.get_response(request)
+
+        trace_id, spans, trace_token = self._start(request)
+        try:
+            with span("http.request", **self._attributes(request)) as attrs:
+                # обёртки — в потоке, где async ORM выполняет запросы
+                stack = ExitStack()
+                await sync_to_async(_wrap_connections)(stack)
+                try:
+                    response = await self.get_response(request)
+                finally:
+                    await sync_to_async(stack.close)()
+                self._finish_attributes(request, response, attrs)
+        finally:
+            _current_trace.reset(trace_token)
+            self.exporter.export(spans)
+
+        response["X-Request-ID"] = trace_id
+        return response
+
+    @staticmethod
+    def _start(request):
+        trace_id = trace_id_from_header(request.headers.get("X-Request-ID"))
+        spans: list[dict] = []
+        return trace_id, spans, _current_trace.set((trace_id, spans))
+
+    @staticmethod
+    def _attributes(request) -> dict:
+        return {
+            "http.method": request.method,
+            "http.target": request.get_full_path(),
+        }
+
+    @staticmethod
+    def _finish_attributes(request, response, attrs):
+        attrs["http.status_code"] = response.status_code
+        match = getattr(request, "resolver_match", None)
+        if match:
+            attrs["http.route"] = match.route
+
+
+def _wrap_connections(stack):
+    for conn in connections.all():
+        stack.enter_context(conn.execute_wrapper(_db_span))